@@ -0,0 +1,276 @@
+"""Benchmarks for the client hot paths.
+
+The benchmarks reuse the factories and mock server from ``tests``, which
+are not part of the installed package, so they only run from the root of a
+source checkout::
+
+    python -m benchmarks                  # run, record, compare to baseline
+    python -m benchmarks --save-baseline  # run and make this the baseline
+    python -m benchmarks --quick          # fewer rounds, for a smoke test
+
+Every run is appended to ``benchmarks/history.jsonl`` (ignored by git) with the
+versions of python, pydantic and niquests, so results can be compared over
+time. A run fails (exit code 1) when any benchmark is slower than the
+baseline by more than ``--threshold``. Rate limiter overshoot is scheduling
+jitter of a few milliseconds, which a relative threshold would flag at
+random, so it instead fails when it is more than ``--jitter-tolerance``
+seconds later than the baseline.
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from collections.abc import Awaitable, Callable
+from datetime import UTC, datetime
+from importlib.metadata import version
+from pathlib import Path
+from typing import Any
+
+from aio_space_traders import model
+from aio_space_traders.api import SpaceTradersApi
+from aio_space_traders.utils import AsyncRateLimit
+from polyfactory.factories.pydantic_factory import ModelFactory
+
+try:
+    from tests import factories
+    from tests.mock_server import MockSpaceTradersServer
+except ModuleNotFoundError as error:
+    raise SystemExit(
+        "python -m benchmarks needs the tests package; run it from the repository root",
+    ) from error
+
+HERE = Path(__file__).parent
+HISTORY = HERE / "history.jsonl"
+BASELINE = HERE / "baseline.json"
+# Results that are jitter in seconds, compared with an absolute tolerance
+JITTER_SUFFIX = ".overshoot"
+
+
+class CannedResponse:
+    """Stands in for a niquests response so only decode/validate is timed."""
+
+    ok = True
+    status_code = 200
+
+    def __init__(self, content: bytes) -> None:
+        self.content = content
+
+    def json(self) -> Any:
+        return json.loads(self.content)
+
+
+class CannedSession:
+    def __init__(self, content: bytes) -> None:
+        self.response = CannedResponse(content)
+        self.headers: dict[str, str] = {}
+
+    async def request(self, *args: Any, **kwargs: Any) -> CannedResponse:
+        return self.response
+
+    async def close(self) -> None:
+        pass
+
+
+def unlimited() -> AsyncRateLimit:
+    return AsyncRateLimit(per_second_limit=10**9, per_minute_limit=10**9)
+
+
+async def timed(
+    operation: Callable[[], Awaitable[Any]],
+    iterations: int,
+    rounds: int,
+) -> float:
+    """Best of ``rounds`` mean seconds per iteration."""
+    results = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            await operation()
+        results.append((time.perf_counter() - start) / iterations)
+    return min(results)
+
+
+async def bench_request_parsing(rounds: int) -> dict[str, float]:
+    ModelFactory.seed_random(0)
+    payloads = {
+        "list_ships_20": model.ListShipsResponse(
+            data=factories.ShipFactory.batch(20),
+            meta=model.PaginationMetadata(total=20, page=1, limit=20),
+        ),
+        "list_waypoints_20": model.ListWaypointsInSystemResponse(
+            data=factories.WaypointFactory.batch(20),
+            meta=model.PaginationMetadata(total=20, page=1, limit=20),
+        ),
+    }
+    results = {}
+    for name, payload in payloads.items():
+        content = payload.model_dump_json(by_alias=True).encode()
+        api = SpaceTradersApi(rate_limiter=unlimited())
+        await api.close()
+        api.session = CannedSession(content)
+        response_model = type(payload)
+        results[f"request_parse.{name}"] = await timed(
+            lambda: api._request(response_model, "GET", "/"),
+            iterations=200,
+            rounds=rounds,
+        )
+    return results
+
+
+async def bench_rate_limiter(rounds: int) -> dict[str, float]:
+    results = {}
+    for waiters in (1, 100, 10_000):
+        limiter = unlimited()
+
+        async def acquire_all() -> None:
+            await asyncio.gather(*(limiter.acquire() for _ in range(waiters)))
+
+        iterations = max(1, 1000 // waiters)
+        seconds = await timed(acquire_all, iterations=iterations, rounds=rounds)
+        results[f"rate_limiter.acquire_{waiters}_waiters"] = seconds / waiters
+
+    # A real limit, where the cost is how late waiters get through
+    per_second = 50
+    waiters = 2 * per_second
+    overshoots = []
+    for _ in range(rounds):
+        limiter = AsyncRateLimit(per_second_limit=per_second, per_minute_limit=10**9)
+        start = time.perf_counter()
+        await asyncio.gather(*(limiter.acquire() for _ in range(waiters)))
+        # The second batch can't go before a second has passed
+        overshoots.append(time.perf_counter() - start - 1)
+    results[f"rate_limiter.limited_{per_second}_per_second.overshoot"] = min(overshoots)
+    return results
+
+
+async def bench_end_to_end(rounds: int) -> dict[str, float]:
+    results = {}
+    server = MockSpaceTradersServer(
+        ship_count=20,
+        per_second_limit=10**9,
+        burst_limit=10**9,
+    )
+    async with server:
+        async with SpaceTradersApi(
+            "token",
+            base_url=server.url,
+            rate_limiter=unlimited(),
+        ) as api:
+            for concurrency in (1, 10):
+                latencies: list[float] = []
+
+                async def worker(index: int) -> None:
+                    for request in range(20):
+                        start = time.perf_counter()
+                        await api.get_ship(f"MOCK-{(index + request) % 20 + 1}")
+                        latencies.append(time.perf_counter() - start)
+
+                async def batch() -> None:
+                    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+
+                seconds = await timed(batch, iterations=1, rounds=rounds)
+                prefix = f"end_to_end.get_ship_c{concurrency}"
+                results[f"{prefix}.per_request"] = seconds / (20 * concurrency)
+                results[f"{prefix}.p50_latency"] = statistics.median(latencies)
+    return results
+
+
+async def run(rounds: int) -> dict[str, float]:
+    results = {}
+    results.update(await bench_request_parsing(rounds))
+    results.update(await bench_rate_limiter(rounds))
+    results.update(await bench_end_to_end(rounds))
+    return results
+
+
+def environment() -> dict[str, str]:
+    try:
+        revision = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        revision = "unknown"
+    return {
+        "timestamp": datetime.now(UTC).isoformat(),
+        "revision": revision,
+        "python": platform.python_version(),
+        "pydantic": version("pydantic"),
+        "niquests": version("niquests"),
+        "machine": platform.machine(),
+    }
+
+
+def compare(
+    results: dict[str, float],
+    baseline: dict[str, float],
+    threshold: float,
+    jitter_tolerance: float,
+) -> list[str]:
+    regressions = []
+    for name, seconds in sorted(results.items()):
+        before = baseline.get(name)
+        jitter = name.endswith(JITTER_SUFFIX)
+        if before is None:
+            change = ""
+        elif jitter:
+            change = f"{(seconds - before) * 1e3:+7.1f}ms"
+        else:
+            change = f"{(seconds / before - 1) * 100:+7.1f}%"
+        print(f"{name:<48} {seconds * 1e6:>12.2f} us {change}")
+        if before is None:
+            continue
+        allowed = before + jitter_tolerance if jitter else before * (1 + threshold)
+        if seconds > allowed:
+            regressions.append(name)
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--quick", action="store_true", help="run a single round")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="allowed slowdown against the baseline (default 0.2 = 20%%)",
+    )
+    parser.add_argument(
+        "--jitter-tolerance",
+        type=float,
+        default=0.05,
+        help="seconds overshoot may grow over the baseline (default 0.05)",
+    )
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--no-record", action="store_true")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(1 if args.quick else args.rounds))
+    entry = {**environment(), "results": results}
+    if not args.no_record:
+        with HISTORY.open("a") as history:
+            history.write(json.dumps(entry) + "\n")
+
+    baseline = json.loads(BASELINE.read_text())["results"] if BASELINE.exists() else {}
+    regressions = compare(results, baseline, args.threshold, args.jitter_tolerance)
+    if args.save_baseline:
+        BASELINE.write_text(json.dumps(entry, indent=2) + "\n")
+        return 0
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) beyond the allowed tolerance:")
+        for name in regressions:
+            print(f"  {name}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,229 @@
+import asyncio
+from collections.abc import Awaitable, Callable
+from datetime import UTC, datetime
+from typing import Any
+
+from aio_space_traders import model, utils
+from aio_space_traders.api import SpaceTradersApi
+from aio_space_traders.errors import ShipNotDockedError, ShipNotInOrbitError
+
+
+class ShipActions:
+    """Ship actions that dock or orbit only when the ship needs it.
+
+    The last ``ShipNav`` seen for every ship is tracked through a response
+    hook, so any call made through the api (including ones made outside of
+    this class) keeps the status current. A dock or orbit request is only
+    sent when the known status doesn't match what the action needs. If the
+    tracked status turns out to be stale the server error is used to
+    correct it and the action is retried once.
+    """
+
+    def __init__(self, api: SpaceTradersApi) -> None:
+        self.api = api
+        self.navs: dict[str, model.ShipNav] = {}
+        api.add_response_hook(self.observe)
+
+    def observe(self, method: str, url: str, response: Any) -> None:
+        for ship_symbol, component in utils.iter_ship_state(url, response):
+            if isinstance(component, model.ShipNav):
+                self.navs[ship_symbol] = component
+
+    def forget(self, ship_symbol: str) -> None:
+        self.navs.pop(ship_symbol, None)
+
+    def status(self, ship_symbol: str) -> model.ShipNavStatus | None:
+        """Last known nav status, or None if the ship hasn't been seen."""
+        nav = self.navs.get(ship_symbol)
+        if nav is None:
+            return None
+        # Ships drop into orbit at their destination once the route completes
+        if (
+            nav.status == model.ShipNavStatus.IN_TRANSIT
+            and nav.route.arrival <= datetime.now(UTC)
+        ):
+            return model.ShipNavStatus.IN_ORBIT
+        return nav.status
+
+    async def wait_for_arrival(self, ship_symbol: str) -> None:
+        nav = self.navs.get(ship_symbol)
+        if nav is None or nav.status != model.ShipNavStatus.IN_TRANSIT:
+            return
+        remaining = (nav.route.arrival - datetime.now(UTC)).total_seconds()
+        if remaining > 0:
+            await asyncio.sleep(remaining)
+
+    async def ensure_docked(self, ship_symbol: str) -> None:
+        await self.wait_for_arrival(ship_symbol)
+        if self.status(ship_symbol) != model.ShipNavStatus.DOCKED:
+            await self.api.dock_ship(ship_symbol)
+
+    async def ensure_in_orbit(self, ship_symbol: str) -> None:
+        await self.wait_for_arrival(ship_symbol)
+        if self.status(ship_symbol) != model.ShipNavStatus.IN_ORBIT:
+            await self.api.orbit_ship(ship_symbol)
+
+    async def _docked[T](self, ship_symbol: str, action: Callable[[], Awaitable[T]]) -> T:
+        await self.ensure_docked(ship_symbol)
+        try:
+            return await action()
+        except ShipNotDockedError:
+            self.forget(ship_symbol)
+            await self.ensure_docked(ship_symbol)
+            return await action()
+
+    async def _in_orbit[T](
+        self,
+        ship_symbol: str,
+        action: Callable[[], Awaitable[T]],
+    ) -> T:
+        await self.ensure_in_orbit(ship_symbol)
+        try:
+            return await action()
+        except ShipNotInOrbitError:
+            self.forget(ship_symbol)
+            await self.ensure_in_orbit(ship_symbol)
+            return await action()
+
+    # Actions that need the ship docked
+
+    async def refuel(
+        self,
+        ship_symbol: str,
+        refuel_object: model.RefuelObject,
+    ) -> model.RefuelShipResponse:
+        return await self._docked(
+            ship_symbol,
+            lambda: self.api.refuel_ship(ship_symbol, refuel_object),
+        )
+
+    async def sell(
+        self,
+        ship_symbol: str,
+        cargo_to_sell: model.SellCargoObject,
+    ) -> model.SellCargoResponse:
+        return await self._docked(
+            ship_symbol,
+            lambda: self.api.sell_cargo(ship_symbol, cargo_to_sell),
+        )
+
+    async def purchase(
+        self,
+        ship_symbol: str,
+        purchase_object: model.PurchaseCargoObject,
+    ) -> model.PurchaseCargoResponse:
+        return await self._docked(
+            ship_symbol,
+            lambda: self.api.purchase_cargo(ship_symbol, purchase_object),
+        )
+
+    async def repair(self, ship_symbol: str) -> model.RepairShipResponse:
+        return await self._docked(
+            ship_symbol,
+            lambda: self.api.repair_ship(ship_symbol),
+        )
+
+    async def deliver_contract(
+        self,
+        contract_id: str,
+        ship_symbol: str,
+        trade_symbol: str,
+        units: int,
+    ) -> model.DeliverCargoToContractResponse:
+        return await self._docked(
+            ship_symbol,
+            lambda: self.api.deliver_cargo_to_contract(
+                contract_id,
+                ship_symbol,
+                trade_symbol,
+                units,
+            ),
+        )
+
+    async def negotiate_contract(
+        self,
+        ship_symbol: str,
+    ) -> model.NegotiateContractResponse:
+        return await self._docked(
+            ship_symbol,
+            lambda: self.api.negotiate_contract(ship_symbol),
+        )
+
+    async def supply_construction(
+        self,
+        system_symbol: str,
+        waypoint_symbol: str,
+        data: model.SupplyConstructionSiteObject,
+    ) -> model.SupplyConstructionSiteResponse:
+        return await self._docked(
+            data.ship_symbol,
+            lambda: self.api.supply_construction_site(
+                system_symbol,
+                waypoint_symbol,
+                data,
+            ),
+        )
+
+    # Actions that need the ship in orbit
+
+    async def extract(
+        self,
+        ship_symbol: str,
+        survey: model.Survey | None = None,
+    ) -> model.ExtractResourcesResponse:
+        return await self._in_orbit(
+            ship_symbol,
+            lambda: self.api.extract_resources(ship_symbol, survey),
+        )
+
+    async def extract_with_survey(
+        self,
+        ship_symbol: str,
+        survey: model.Survey,
+    ) -> model.ExtractResourcesWithSurveyResponse:
+        return await self._in_orbit(
+            ship_symbol,
+            lambda: self.api.extract_resources_with_survey(ship_symbol, survey),
+        )
+
+    async def siphon(self, ship_symbol: str) -> model.SiphonGasResponse:
+        return await self._in_orbit(
+            ship_symbol,
+            lambda: self.api.siphon_resources(ship_symbol),
+        )
+
+    async def survey(self, ship_symbol: str) -> model.CreateSurveyResponse:
+        return await self._in_orbit(
+            ship_symbol,
+            lambda: self.api.create_survey(ship_symbol),
+        )
+
+    async def navigate(
+        self,
+        ship_symbol: str,
+        waypoint_symbol: str,
+    ) -> model.NavigateShipResponse:
+        return await self._in_orbit(
+            ship_symbol,
+            lambda: self.api.navigate_ship(ship_symbol, waypoint_symbol),
+        )
+
+    async def warp(
+        self,
+        ship_symbol: str,
+        waypoint_symbol: str,
+    ) -> model.WarpShipResponse:
+        return await self._in_orbit(
+            ship_symbol,
+            lambda: self.api.warp_ship(ship_symbol, waypoint_symbol),
+        )
+
+    async def jump(
+        self,
+        ship_symbol: str,
+        waypoint_symbol: str,
+    ) -> model.JumpShipResponse:
+        return await self._in_orbit(
+            ship_symbol,
+            lambda: self.api.jump_ship(ship_symbol, waypoint_symbol),
+        )
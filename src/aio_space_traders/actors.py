@@ -0,0 +1,212 @@
+import asyncio
+from collections.abc import Awaitable, Callable
+
+from aio_space_traders.scheduler import EventScheduler
+
+type Command[T] = Callable[[], Awaitable[T]]
+
+
+class ShipActor:
+    """Runs commands for a single ship one at a time.
+
+    Commands wait in a bounded mailbox; submitting to a full mailbox waits
+    for room, which pushes back on whatever is producing work for the ship.
+    The worker task only exists while the mailbox has work in it.
+
+    Cancelling the future returned by ``submit`` (or the task awaiting
+    ``call``) drops the command if it hasn't started yet and cancels it if
+    it is in flight.
+    """
+
+    def __init__(
+        self,
+        ship_symbol: str,
+        mailbox_size: int = 16,
+        scheduler: EventScheduler | None = None,
+    ) -> None:
+        self.ship_symbol = ship_symbol
+        self.scheduler = scheduler
+        self._mailbox: asyncio.Queue[tuple[Command, asyncio.Future]] = asyncio.Queue(
+            mailbox_size,
+        )
+        self._worker: asyncio.Task[None] | None = None
+        self._current: asyncio.Task | None = None
+
+    @property
+    def pending(self) -> int:
+        """Number of commands waiting in the mailbox."""
+        return self._mailbox.qsize()
+
+    @property
+    def busy(self) -> bool:
+        return self._current is not None
+
+    async def submit[T](self, command: Command[T]) -> asyncio.Future[T]:
+        """Queues a command, waiting for mailbox space if it is full."""
+        future = asyncio.get_running_loop().create_future()
+        await self._mailbox.put((command, future))
+        self._ensure_worker()
+        return future
+
+    def submit_nowait[T](self, command: Command[T]) -> asyncio.Future[T]:
+        """Queues a command, raising ``asyncio.QueueFull`` if the mailbox is full."""
+        future = asyncio.get_running_loop().create_future()
+        self._mailbox.put_nowait((command, future))
+        self._ensure_worker()
+        return future
+
+    async def call[T](
+        self,
+        method: Callable[..., Awaitable[T]],
+        *args,
+        **kwargs,
+    ) -> T:
+        """Runs ``method(ship_symbol, *args, **kwargs)`` and returns its result."""
+        future = await self.submit(
+            lambda: method(self.ship_symbol, *args, **kwargs),
+        )
+        return await future
+
+    async def call_when_ready[T](
+        self,
+        method: Callable[..., Awaitable[T]],
+        *args,
+        **kwargs,
+    ) -> T:
+        """Like ``call``, but waits for the scheduler to report the ship ready.
+
+        The wait happens inside the mailbox, so commands queued behind this
+        one also wait for the ship to arrive and come off cooldown.
+        """
+
+        async def command() -> T:
+            if self.scheduler is not None:
+                await self.scheduler.wait_ready(self.ship_symbol)
+            return await method(self.ship_symbol, *args, **kwargs)
+
+        future = await self.submit(command)
+        return await future
+
+    def cancel_pending(self) -> int:
+        """Cancels every queued command that hasn't started yet."""
+        cancelled = 0
+        while not self._mailbox.empty():
+            _, future = self._mailbox.get_nowait()
+            if future.cancel():
+                cancelled += 1
+        return cancelled
+
+    async def close(self) -> None:
+        """Cancels queued and in-flight commands and stops the worker."""
+        self.cancel_pending()
+        if self._worker is not None:
+            self._worker.cancel()
+            await asyncio.gather(self._worker, return_exceptions=True)
+            self._worker = None
+
+    def _ensure_worker(self) -> None:
+        if self._worker is None:
+            self._worker = asyncio.create_task(
+                self._run(),
+                name=f"ship-actor-{self.ship_symbol}",
+            )
+
+    async def _run(self) -> None:
+        try:
+            while not self._mailbox.empty():
+                command, future = self._mailbox.get_nowait()
+                if future.done():
+                    continue
+                await self._execute(command, future)
+        finally:
+            self._current = None
+            self._worker = None
+
+    async def _execute(self, command: Command, future: asyncio.Future) -> None:
+        task = asyncio.ensure_future(command())
+        self._current = task
+
+        def cancel_task(fut: asyncio.Future) -> None:
+            if fut.cancelled():
+                task.cancel()
+
+        future.add_done_callback(cancel_task)
+        try:
+            # `wait` doesn't raise when the command itself is cancelled, which
+            # keeps that apart from the worker being cancelled.
+            await asyncio.wait([task])
+        except asyncio.CancelledError:
+            task.cancel()
+            future.cancel()
+            raise
+        finally:
+            future.remove_done_callback(cancel_task)
+            self._current = None
+
+        if future.done():
+            return
+        if task.cancelled():
+            future.cancel()
+        elif (exc := task.exception()) is not None:
+            future.set_exception(exc)
+        else:
+            future.set_result(task.result())
+
+
+class ActorRuntime:
+    """Owns one ``ShipActor`` per ship symbol.
+
+    Commands for the same ship run in order, commands for different ships
+    run concurrently::
+
+        runtime = ActorRuntime(scheduler=scheduler)
+        await asyncio.gather(
+            runtime.call("SHIP-1", api.navigate_ship, "X1-A1-B2"),
+            runtime.call("SHIP-1", api.dock_ship),
+            runtime.call("SHIP-2", api.orbit_ship),
+        )
+    """
+
+    def __init__(
+        self,
+        mailbox_size: int = 16,
+        scheduler: EventScheduler | None = None,
+    ) -> None:
+        self.mailbox_size = mailbox_size
+        self.scheduler = scheduler
+        self._actors: dict[str, ShipActor] = {}
+
+    def __contains__(self, ship_symbol: str) -> bool:
+        return ship_symbol in self._actors
+
+    def __len__(self) -> int:
+        return len(self._actors)
+
+    def actor(self, ship_symbol: str) -> ShipActor:
+        actor = self._actors.get(ship_symbol)
+        if actor is None:
+            actor = ShipActor(ship_symbol, self.mailbox_size, self.scheduler)
+            self._actors[ship_symbol] = actor
+        return actor
+
+    async def call[T](
+        self,
+        ship_symbol: str,
+        method: Callable[..., Awaitable[T]],
+        *args,
+        **kwargs,
+    ) -> T:
+        return await self.actor(ship_symbol).call(method, *args, **kwargs)
+
+    async def call_when_ready[T](
+        self,
+        ship_symbol: str,
+        method: Callable[..., Awaitable[T]],
+        *args,
+        **kwargs,
+    ) -> T:
+        return await self.actor(ship_symbol).call_when_ready(method, *args, **kwargs)
+
+    async def close(self) -> None:
+        await asyncio.gather(*(actor.close() for actor in self._actors.values()))
+        self._actors.clear()
@@ -1,34 +1,117 @@
+import asyncio
+import contextlib
 import inspect
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable
+from concurrent.futures import Executor
 from types import TracebackType
 from typing import Any
 
-from niquests import AsyncSession
 from niquests._typing import QueryParameterType
 from niquests.exceptions import JSONDecodeError as RequestsJSONDecodeError
 from niquests.models import Response
 
 from aio_space_traders import model, utils
+from aio_space_traders.cache import ShipReadCache, UniverseCache
+from aio_space_traders.diagnostics import Diagnostics
 from aio_space_traders.errors import ERROR_MAPPING, SpaceTradersAPIError
+from aio_space_traders.streaming import JSONStreamDecoder
+from aio_space_traders.tracing import CLIENT, Span, Tracer
+from aio_space_traders.transport import HttpTransport, TransportConfig
+
+
+DEFAULT_BASE_URL = "https://api.spacetraders.io/v2"
+
+
+def _validate_json[T: model.BaseAPIModel](response_model: type[T], content: bytes) -> T:
+    return response_model.model_validate_json(content)
+
+
+def _resend_count(response: Any) -> int:
+    # urllib3 keeps the retries made for a response in its Retry history
+    retries = getattr(getattr(response, "raw", None), "retries", None)
+    history = getattr(retries, "history", None)
+    return len(history) if isinstance(history, tuple) else 0
+
+
+async def _iter_chunks(response: Any, chunk_size: int) -> AsyncIterator[bytes]:
+    iter_content = getattr(response, "iter_content", None)
+    if iter_content is None:
+        yield response.content
+        return
+    chunks = iter_content(chunk_size)
+    if inspect.isawaitable(chunks):
+        chunks = await chunks
+    if hasattr(chunks, "__aiter__"):
+        async for chunk in chunks:
+            yield chunk
+    else:
+        for chunk in chunks:
+            yield chunk
+
+
+async def _close(response: Any) -> None:
+    close = getattr(response, "close", None)
+    if close is None:
+        return
+    closed = close()
+    if inspect.isawaitable(closed):
+        await closed
 
 
 class SpaceTradersApi:
-    def __init__(self, token: str | None = None) -> None:
-        self.session: AsyncSession = AsyncSession(
-            base_url="https://api.spacetraders.io/v2",
+    def __init__(
+        self,
+        token: str | None = None,
+        *,
+        base_url: str = DEFAULT_BASE_URL,
+        rate_limiter: utils.RateLimiter | None = None,
+        session: utils.HttpSession | None = None,
+        transport: TransportConfig | None = None,
+        cache: UniverseCache | None = None,
+        ship_cache: ShipReadCache | None = None,
+        request_slot: contextlib.AbstractAsyncContextManager | None = None,
+        executor: Executor | None = None,
+        offload_threshold: int = 64 * 1024,
+        diagnostics: Diagnostics | None = None,
+        tracer: Tracer | None = None,
+    ) -> None:
+        # An injected session may be shared with other clients, so the token
+        # is sent per request rather than set on the session.
+        self._owns_session = session is None
+        self.session: utils.HttpSession = session or HttpTransport(
+            base_url,
+            transport,
         )
-        self.token = token
         self.session.headers.update(
             {
                 "Accept": "application/json",
                 "Content-Type": "application/json",
             },
         )
+        self.headers: dict[str, str] = {}
+        self.token = token
         if self.token:
-            self.session.headers.update({"Authorization": f"Bearer {self.token}"})
-        self.rate_limiter = utils.AsyncRateLimit()
+            self.update_token(self.token)
+        self.rate_limiter = rate_limiter or utils.AsyncRateLimit()
+        self.request_slot = request_slot or contextlib.nullcontext()
+        self.response_hooks: list[Callable[[str, str, Any], None]] = []
+        self.cache = cache
+        if cache is not None:
+            self.add_response_hook(cache.observe)
+        self.ship_cache = ship_cache
+        if ship_cache is not None:
+            self.add_response_hook(ship_cache.observe)
+        # Bodies of at least `offload_threshold` bytes are decoded and
+        # validated in `executor`, keeping large list responses off the loop
+        self.executor = executor
+        self.offload_threshold = offload_threshold
+        self.diagnostics = diagnostics
+        self.tracer = tracer
 
     async def close(self):
-        await self.session.close()
+        if self._owns_session:
+            await self.session.close()
 
     async def __aenter__(self):
         return self
@@ -50,28 +133,240 @@ class SpaceTradersApi:
         params: QueryParameterType | None = None,
         data: dict[str, Any] | None = None,
     ) -> T:
+        with self._span(method, url) as span:
+            return await self._send(response_model, method, url, params, data, span)
+
+    def _span(self, method: str, url: str) -> contextlib.AbstractContextManager[Span | None]:
+        """The span for one call, or no span without a tracer."""
+        if self.tracer is None:
+            return contextlib.nullcontext()
+        template = utils.route_template(url)
+        attributes: dict[str, Any] = {
+            "http.request.method": method,
+            "url.template": template,
+            "url.path": url,
+        }
+        ship_symbol = utils.ship_symbol_from_url(url)
+        if ship_symbol is not None:
+            attributes["spacetraders.ship_symbol"] = ship_symbol
+        return self.tracer.start_as_current_span(
+            f"{method} {template}",
+            kind=CLIENT,
+            attributes=attributes,
+        )
+
+    async def _check_response(
+        self,
+        response: Response,
+        span: Span | None,
+        rate_limit_wait: float,
+    ) -> None:
+        if span is not None:
+            span.set_attribute("spacetraders.rate_limit.wait", rate_limit_wait)
+            span.set_attribute("http.response.status_code", response.status_code)
+            resend_count = _resend_count(response)
+            if resend_count:
+                span.set_attribute("http.request.resend_count", resend_count)
+        if not response.ok:
+            try:
+                await self._handle_error(response)
+            except SpaceTradersAPIError as error:
+                if span is not None:
+                    span.set_attribute("spacetraders.error_code", error.error_code)
+                raise
+
+    async def _send[T](
+        self,
+        response_model: type[T],
+        method: str,
+        url: str,
+        params: QueryParameterType | None,
+        data: dict[str, Any] | None,
+        span: Span | None,
+    ) -> T:
+        started = time.perf_counter()
         # Verifies the request isn't going to exceed the rate limit
         await self.rate_limiter.acquire()
+        allowed = time.perf_counter()
+
+        async with self.request_slot:
+            sent = time.perf_counter()
+            response = await self.session.request(
+                method,
+                url,
+                params=params,
+                json=data,
+                headers=self.headers,
+            )
+        received = time.perf_counter()
+        await self._check_response(response, span, allowed - started)
+
+        diagnostics = self.diagnostics
+        endpoint = f"{method} {url}"
+        try:
+            content = getattr(response, "content", None) if self.executor else None
+            if isinstance(content, bytes) and len(content) >= self.offload_threshold:
+                result = await asyncio.get_running_loop().run_in_executor(
+                    self.executor,
+                    _validate_json,
+                    response_model,
+                    content,
+                )
+            else:
+                json_data = response.json()
+                if inspect.isawaitable(json_data):
+                    json_data = await json_data
+                if diagnostics is not None:
+                    diagnostics.current = endpoint
+                result = response_model(**json_data)
+
+            if diagnostics is not None:
+                diagnostics.current = endpoint
+            for hook in self.response_hooks:
+                hook(method, url, result)
+        finally:
+            if diagnostics is not None:
+                diagnostics.current = None
+                diagnostics.record_request(
+                    method,
+                    url,
+                    rate_limit=allowed - started,
+                    slot=sent - allowed,
+                    network=received - sent,
+                    processing=time.perf_counter() - received,
+                )
+        return result
+
+    async def _stream(
+        self,
+        item_response_model: type[model.BaseAPIModel],
+        method: str,
+        url: str,
+        *,
+        params: QueryParameterType | None = None,
+        chunk_size: int = 1 << 16,
+    ) -> AsyncIterator[Any]:
+        """Yields the ``data`` items of a list response as they arrive.
+
+        Each item is validated as soon as it has been read, without waiting
+        for the rest of the body. Hooks see every item wrapped in
+        ``item_response_model``, as if it had been fetched on its own.
+        Sessions that can't stream fall back to decoding the whole body.
+        The response is closed if the caller stops iterating early; use
+        ``contextlib.aclosing`` to have that happen right away.
+
+        The call's span ends once the response status is known: a span kept
+        current across ``yield`` would adopt the caller's own calls.
+        """
+        started = time.perf_counter()
+        with self._span(method, url) as span:
+            await self.rate_limiter.acquire()
+            allowed = time.perf_counter()
+
+            async with self.request_slot:
+                sent = time.perf_counter()
+                response = await self.session.request(
+                    method,
+                    url,
+                    params=params,
+                    headers=self.headers,
+                    stream=True,
+                )
+            received = time.perf_counter()
+            try:
+                await self._check_response(response, span, allowed - started)
+            except BaseException:
+                await _close(response)
+                raise
+
+        # Time the caller spends between items isn't ours to record
+        paused = 0.0
+        try:
+            items = self._iter_items(item_response_model, method, url, response, chunk_size)
+            async with contextlib.aclosing(items):
+                async for item in items:
+                    yielded = time.perf_counter()
+                    yield item
+                    paused += time.perf_counter() - yielded
+        finally:
+            await _close(response)
+            if self.diagnostics is not None:
+                self.diagnostics.record_request(
+                    method,
+                    url,
+                    rate_limit=allowed - started,
+                    slot=sent - allowed,
+                    network=received - sent,
+                    processing=time.perf_counter() - received - paused,
+                )
+
+    async def _iter_items(
+        self,
+        item_response_model: type[model.BaseAPIModel],
+        method: str,
+        url: str,
+        response: Response,
+        chunk_size: int,
+    ) -> AsyncIterator[Any]:
+        item_model = item_response_model.model_fields["data"].annotation
+        decoder = JSONStreamDecoder()
+        async for chunk in _iter_chunks(response, chunk_size):
+            for key, data in decoder.feed(chunk):
+                if key == "data":
+                    yield self._streamed(item_response_model, item_model, method, url, data)
+        for key, data in decoder.close():
+            if key == "data":
+                yield self._streamed(item_response_model, item_model, method, url, data)
+
+    def _streamed(
+        self,
+        item_response_model: type[model.BaseAPIModel],
+        item_model: Any,
+        method: str,
+        url: str,
+        data: Any,
+    ) -> Any:
+        diagnostics = self.diagnostics
+        if diagnostics is not None:
+            diagnostics.current = f"{method} {url}"
+        try:
+            item = item_model.model_validate(data)
+            if self.response_hooks:
+                result = item_response_model(data=item)
+                for hook in self.response_hooks:
+                    hook(method, url, result)
+        finally:
+            if diagnostics is not None:
+                diagnostics.current = None
+        return item
+
+    async def _read_ship[T](
+        self,
+        ship_symbol: str,
+        resource: str,
+        fetch: Callable[[], Awaitable[T]],
+    ) -> T:
+        if self.ship_cache is None:
+            return await fetch()
+        return await self.ship_cache.read(ship_symbol, resource, fetch)
 
-        response = await self.session.request(
-            method,
-            url,
-            params=params,
-            json=data,
-        )
-        if not response.ok:
-            await self._handle_error(response)
+    def add_response_hook(self, hook: Callable[[str, str, Any], None]) -> None:
+        """Registers a callable to receive every validated response.
 
-        json_data = response.json()
-        if inspect.isawaitable(json_data):
-            json_data = await json_data
+        Hooks are called with the request method, the request url and the
+        parsed response model, in the order they were registered.
+        """
+        self.response_hooks.append(hook)
 
-        return response_model(**json_data)
+    def remove_response_hook(self, hook: Callable[[str, str, Any], None]) -> None:
+        self.response_hooks.remove(hook)
 
     async def _handle_error(self, response: Response):
         response_json = {}
         try:
             response_json = response.json()
+            if inspect.isawaitable(response_json):
+                response_json = await response_json
         except RequestsJSONDecodeError:
             response.raise_for_status()
 
@@ -237,6 +532,21 @@ class SpaceTradersApi:
             params=pagination_params.model_dump(),
         )
 
+    async def stream_ships(
+        self,
+        pagination_params: model.PaginationParameters,
+    ) -> AsyncIterator[model.Ship]:
+        """Like ``list_ships``, yielding each ship as soon as it is read."""
+        ships = self._stream(
+            model.GetShipResponse,
+            "GET",
+            "/my/ships",
+            params=pagination_params.model_dump(),
+        )
+        async with contextlib.aclosing(ships):
+            async for ship in ships:
+                yield ship
+
     async def purchase_ship(
         self,
         ship_type: model.ShipType,
@@ -257,20 +567,28 @@ class SpaceTradersApi:
         self,
         ship_symbol: str,
     ) -> model.GetShipResponse:
-        return await self._request(
-            model.GetShipResponse,
-            "GET",
-            f"/my/ships/{ship_symbol}",
+        return await self._read_ship(
+            ship_symbol,
+            "ship",
+            lambda: self._request(
+                model.GetShipResponse,
+                "GET",
+                f"/my/ships/{ship_symbol}",
+            ),
         )
 
     async def get_ship_cargo(
         self,
         ship_symbol: str,
     ) -> model.GetShipCargoResponse:
-        return await self._request(
-            model.GetShipCargoResponse,
-            "GET",
-            f"/my/ships/{ship_symbol}/cargo",
+        return await self._read_ship(
+            ship_symbol,
+            "cargo",
+            lambda: self._request(
+                model.GetShipCargoResponse,
+                "GET",
+                f"/my/ships/{ship_symbol}/cargo",
+            ),
         )
 
     async def orbit_ship(
@@ -339,9 +657,11 @@ class SpaceTradersApi:
     async def extract_resources(
         self,
         ship_symbol: str,
-        survey: model.Survey,
+        survey: model.Survey | None = None,
     ) -> model.ExtractResourcesResponse:
-        data = {"survey": survey.model_dump()}
+        data = None
+        if survey is not None:
+            data = {"survey": survey.model_dump(mode="json", by_alias=True)}
         return await self._request(
             model.ExtractResourcesResponse,
             "POST",
@@ -368,7 +688,7 @@ class SpaceTradersApi:
             model.ExtractResourcesWithSurveyResponse,
             "POST",
             f"/my/ships/{ship_symbol}/extract/survey",
-            data=survey.model_dump(),
+            data=survey.model_dump(mode="json", by_alias=True),
         )
 
     async def jettison_cargo(
@@ -380,7 +700,7 @@ class SpaceTradersApi:
             model.JettisonCargoResponse,
             "POST",
             f"/my/ships/{ship_symbol}/jettison",
-            data=cargo_to_jettison.model_dump(),
+            data=cargo_to_jettison.model_dump(mode="json", by_alias=True),
         )
 
     async def jump_ship(
@@ -423,10 +743,14 @@ class SpaceTradersApi:
         self,
         ship_symbol: str,
     ) -> model.GetShipNavResponse:
-        return await self._request(
-            model.GetShipNavResponse,
-            "GET",
-            f"/my/ships/{ship_symbol}/nav",
+        return await self._read_ship(
+            ship_symbol,
+            "nav",
+            lambda: self._request(
+                model.GetShipNavResponse,
+                "GET",
+                f"/my/ships/{ship_symbol}/nav",
+            ),
         )
 
     async def warp_ship(
@@ -450,7 +774,7 @@ class SpaceTradersApi:
             model.SellCargoResponse,
             "POST",
             f"/my/ships/{ship_symbol}/sell",
-            data=cargo_to_sell.model_dump(),
+            data=cargo_to_sell.model_dump(mode="json", by_alias=True),
         )
 
     async def scan_systems(
@@ -492,7 +816,7 @@ class SpaceTradersApi:
             model.RefuelShipResponse,
             "POST",
             f"/my/ships/{ship_symbol}/refuel",
-            data=refuel_object.model_dump(),
+            data=refuel_object.model_dump(mode="json", by_alias=True),
         )
 
     async def purchase_cargo(
@@ -504,7 +828,7 @@ class SpaceTradersApi:
             model.PurchaseCargoResponse,
             "POST",
             f"/my/ships/{ship_symbol}/purchase",
-            data=purchase_object.model_dump(),
+            data=purchase_object.model_dump(mode="json", by_alias=True),
         )
 
     async def transfer_cargo(
@@ -516,7 +840,7 @@ class SpaceTradersApi:
             model.TransferCargoResponse,
             "POST",
             f"/my/ships/{ship_symbol}/transfer",
-            data=transfer_object.model_dump(),
+            data=transfer_object.model_dump(mode="json", by_alias=True),
         )
 
     async def negotiate_contract(
@@ -614,10 +938,27 @@ class SpaceTradersApi:
             params=pagination_params.model_dump(),
         )
 
+    async def stream_systems(
+        self,
+        pagination_params: model.PaginationParameters,
+    ) -> AsyncIterator[model.System]:
+        """Like ``list_systems``, yielding each system as soon as it is read."""
+        systems = self._stream(
+            model.GetSystemResponse,
+            "GET",
+            "/systems",
+            params=pagination_params.model_dump(),
+        )
+        async with contextlib.aclosing(systems):
+            async for system in systems:
+                yield system
+
     async def get_system(
         self,
         system_symbol: str,
     ) -> model.GetSystemResponse:
+        if self.cache is not None and (system := self.cache.system(system_symbol)):
+            return model.GetSystemResponse(data=system)
         return await self._request(
             model.GetSystemResponse,
             "GET",
@@ -636,11 +977,34 @@ class SpaceTradersApi:
             params=params.model_dump(),
         )
 
+    async def stream_waypoints_in_system(
+        self,
+        system_symbol: str,
+        params: model.ListWaypointsInSystemParameters,
+    ) -> AsyncIterator[model.Waypoint]:
+        """Like ``list_waypoints_in_system``, yielding waypoints as they are read."""
+        waypoints = self._stream(
+            model.GetWaypointResponse,
+            "GET",
+            f"/systems/{system_symbol}/waypoints",
+            params=params.model_dump(),
+        )
+        async with contextlib.aclosing(waypoints):
+            async for waypoint in waypoints:
+                yield waypoint
+
     async def get_waypoint(
         self,
         system_symbol: str,
         waypoint_symbol: str,
+        *,
+        cached: bool = True,
     ) -> model.GetWaypointResponse:
+        # The cache expires waypoints, ``cached=False`` skips it altogether
+        if cached and self.cache is not None and (
+            waypoint := self.cache.waypoint(waypoint_symbol)
+        ):
+            return model.GetWaypointResponse(data=waypoint)
         return await self._request(
             model.GetWaypointResponse,
             "GET",
@@ -674,10 +1038,14 @@ class SpaceTradersApi:
         system_symbol: str,
         waypoint_symbol: str,
     ) -> model.GetJumpGateResponse:
+        if self.cache is not None and (
+            jump_gate := self.cache.jump_gate(waypoint_symbol)
+        ):
+            return model.GetJumpGateResponse(data=jump_gate)
         return await self._request(
             model.GetJumpGateResponse,
             "GET",
-            f"/systems/{system_symbol}/waypoints/{waypoint_symbol}/shipyard",
+            f"/systems/{system_symbol}/waypoints/{waypoint_symbol}/jump-gate",
         )
 
     async def get_construction_site(
@@ -701,7 +1069,7 @@ class SpaceTradersApi:
             model.SupplyConstructionSiteResponse,
             "POST",
             f"/systems/{system_symbol}/waypoints/{waypoint_symbol}/construction/supply",
-            data=data.model_dump(),
+            data=data.model_dump(mode="json", by_alias=True),
         )
 
     def update_token(
@@ -709,4 +1077,4 @@ class SpaceTradersApi:
         token: str,
     ) -> None:
         self.token = token
-        self.session.headers.update({"Authorization": f"Bearer {self.token}"})
+        self.headers["Authorization"] = f"Bearer {self.token}"
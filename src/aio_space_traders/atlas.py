@@ -0,0 +1,389 @@
+"""A compact, memory-mapped file of systems and waypoints.
+
+Loading hundreds of thousands of ``Waypoint`` models takes seconds and a
+lot of memory in every process. An atlas stores the same data as
+fixed-width records in one file: every symbol is interned once in a string
+table, and records refer to strings by index. Opening an atlas maps the
+file and reads nothing up front; ``WaypointView`` and ``SystemView`` read
+their fields straight from the mapping when accessed. Processes that open
+the same atlas share one copy in the page cache.
+
+Build one from anything that yields models, for example a filled
+``UniverseCache``::
+
+    write_atlas("universe.atlas", cache.systems.values(), cache.waypoints.values())
+
+    with Atlas("universe.atlas") as atlas:
+        atlas.waypoint("X1-DF55-20250Z").traits
+
+``Atlas.systems`` and ``Atlas.waypoints`` are read-only mappings keyed by
+symbol, like the dicts on ``UniverseCache``, so planners that only look up
+coordinates can take an atlas in place of a cache.
+
+Layout, all little-endian::
+
+    header     magic, version and the four counts below
+    systems    SYSTEM records sorted by symbol
+    waypoints  WAYPOINT records sorted by symbol
+    refs       uint32 string ids for factions, traits and orbitals
+    strings    uint32 offsets (count + 1), then the UTF-8 bytes
+"""
+
+import mmap
+import struct
+from collections.abc import Iterable, Iterator, Mapping
+from pathlib import Path
+from types import TracebackType
+
+from aio_space_traders import model
+
+MAGIC = b"STATLAS\0"
+VERSION = 1
+NONE = 0xFFFFFFFF
+
+HEADER = struct.Struct("<8sIIIII")
+# symbol, sector, type, x, y, factions start, factions count
+SYSTEM = struct.Struct("<IIIiiII")
+# symbol, type, system, x, y, orbits, faction, traits start, traits count,
+# orbitals start, orbitals count, flags
+WAYPOINT = struct.Struct("<IIIiiIIIIIIB3x")
+UNDER_CONSTRUCTION = 1
+
+_ID = struct.Struct("<I")
+# A string's start and end offsets
+_SPAN = struct.Struct("<II")
+
+
+class _Strings:
+    def __init__(self) -> None:
+        self.ids: dict[str, int] = {}
+        self.values: list[bytes] = []
+
+    def intern(self, value: str | None) -> int:
+        if value is None:
+            return NONE
+        string_id = self.ids.get(value)
+        if string_id is None:
+            string_id = self.ids[value] = len(self.values)
+            self.values.append(value.encode())
+        return string_id
+
+
+def write_atlas(
+    path: str | Path,
+    systems: Iterable[model.System],
+    waypoints: Iterable[model.Waypoint],
+) -> None:
+    """Writes systems and waypoints to an atlas file, replacing it."""
+    strings = _Strings()
+    refs: list[int] = []
+
+    def add_refs(values: Iterable[str]) -> tuple[int, int]:
+        start = len(refs)
+        refs.extend(strings.intern(value) for value in values)
+        return start, len(refs) - start
+
+    system_records = []
+    for system in sorted(systems, key=lambda system: system.symbol.encode()):
+        factions = add_refs(faction.symbol for faction in system.factions)
+        system_records.append(
+            SYSTEM.pack(
+                strings.intern(system.symbol),
+                strings.intern(system.sector_symbol),
+                strings.intern(system.type),
+                system.x,
+                system.y,
+                *factions,
+            ),
+        )
+
+    waypoint_records = []
+    for waypoint in sorted(waypoints, key=lambda waypoint: waypoint.symbol.root.encode()):
+        traits = add_refs(trait.symbol for trait in waypoint.traits)
+        orbitals = add_refs(orbital.symbol for orbital in waypoint.orbitals)
+        waypoint_records.append(
+            WAYPOINT.pack(
+                strings.intern(waypoint.symbol.root),
+                strings.intern(waypoint.type),
+                strings.intern(waypoint.system_symbol.root),
+                waypoint.x,
+                waypoint.y,
+                strings.intern(waypoint.orbits),
+                strings.intern(waypoint.faction.symbol if waypoint.faction else None),
+                *traits,
+                *orbitals,
+                UNDER_CONSTRUCTION if waypoint.is_under_construction else 0,
+            ),
+        )
+
+    offsets = [0]
+    for value in strings.values:
+        offsets.append(offsets[-1] + len(value))
+
+    path = Path(path)
+    partial = path.with_name(path.name + ".partial")
+    with partial.open("wb") as file:
+        file.write(
+            HEADER.pack(
+                MAGIC,
+                VERSION,
+                len(system_records),
+                len(waypoint_records),
+                len(refs),
+                len(strings.values),
+            ),
+        )
+        file.writelines(system_records)
+        file.writelines(waypoint_records)
+        file.write(struct.pack(f"<{len(refs)}I", *refs))
+        file.write(struct.pack(f"<{len(offsets)}I", *offsets))
+        file.writelines(strings.values)
+    partial.replace(path)
+
+
+class SystemView:
+    """A system read lazily from an atlas."""
+
+    __slots__ = ("atlas", "index", "_offset")
+
+    def __init__(self, atlas: "Atlas", index: int) -> None:
+        self.atlas = atlas
+        self.index = index
+        self._offset = atlas._systems_at + index * SYSTEM.size
+
+    def _field(self, position: int) -> int:
+        return struct.unpack_from("<I", self.atlas._map, self._offset + 4 * position)[0]
+
+    @property
+    def symbol(self) -> str:
+        return self.atlas._string(self._field(0))
+
+    @property
+    def sector_symbol(self) -> str:
+        return self.atlas._string(self._field(1))
+
+    @property
+    def type(self) -> model.SystemType:
+        return model.SystemType(self.atlas._string(self._field(2)))
+
+    @property
+    def x(self) -> int:
+        return struct.unpack_from("<i", self.atlas._map, self._offset + 12)[0]
+
+    @property
+    def y(self) -> int:
+        return struct.unpack_from("<i", self.atlas._map, self._offset + 16)[0]
+
+    @property
+    def factions(self) -> list[str]:
+        return self.atlas._refs(self._field(5), self._field(6))
+
+    @property
+    def waypoints(self) -> list["WaypointView"]:
+        return self.atlas.waypoints_in_system(self.symbol)
+
+    def __repr__(self) -> str:
+        return f"SystemView({self.symbol!r})"
+
+
+class WaypointView:
+    """A waypoint read lazily from an atlas."""
+
+    __slots__ = ("atlas", "index", "_offset")
+
+    def __init__(self, atlas: "Atlas", index: int) -> None:
+        self.atlas = atlas
+        self.index = index
+        self._offset = atlas._waypoints_at + index * WAYPOINT.size
+
+    def _field(self, position: int) -> int:
+        return struct.unpack_from("<I", self.atlas._map, self._offset + 4 * position)[0]
+
+    @property
+    def symbol(self) -> str:
+        return self.atlas._string(self._field(0))
+
+    @property
+    def type(self) -> model.WaypointType:
+        return model.WaypointType(self.atlas._string(self._field(1)))
+
+    @property
+    def system_symbol(self) -> str:
+        return self.atlas._string(self._field(2))
+
+    @property
+    def x(self) -> int:
+        return struct.unpack_from("<i", self.atlas._map, self._offset + 12)[0]
+
+    @property
+    def y(self) -> int:
+        return struct.unpack_from("<i", self.atlas._map, self._offset + 16)[0]
+
+    @property
+    def orbits(self) -> str | None:
+        string_id = self._field(5)
+        return None if string_id == NONE else self.atlas._string(string_id)
+
+    @property
+    def faction(self) -> str | None:
+        string_id = self._field(6)
+        return None if string_id == NONE else self.atlas._string(string_id)
+
+    @property
+    def traits(self) -> list[model.WaypointTraitSymbol]:
+        return [
+            model.WaypointTraitSymbol(trait)
+            for trait in self.atlas._refs(self._field(7), self._field(8))
+        ]
+
+    @property
+    def orbitals(self) -> list[str]:
+        return self.atlas._refs(self._field(9), self._field(10))
+
+    @property
+    def is_under_construction(self) -> bool:
+        flags = self.atlas._map[self._offset + 44]
+        return bool(flags & UNDER_CONSTRUCTION)
+
+    def __repr__(self) -> str:
+        return f"WaypointView({self.symbol!r})"
+
+
+class _Table[V](Mapping[str, V]):
+    def __init__(
+        self,
+        atlas: "Atlas",
+        count: int,
+        view: type[V],
+        at: int,
+        size: int,
+    ) -> None:
+        self.atlas = atlas
+        self.count = count
+        self.view = view
+        self.at = at
+        self.size = size
+
+    def _symbol(self, index: int) -> bytes:
+        string_id = _ID.unpack_from(self.atlas._map, self.at + index * self.size)[0]
+        return self.atlas._bytes(string_id)
+
+    def find(self, key: bytes) -> int | None:
+        """Index of the record whose symbol is ``key``, None if there is none."""
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            symbol = self._symbol(middle)
+            if symbol < key:
+                low = middle + 1
+            elif symbol == key:
+                return middle
+            else:
+                high = middle
+        return None
+
+    def bisect(self, key: bytes) -> int:
+        """Index of the first record whose symbol is not below ``key``."""
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            if self._symbol(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def __getitem__(self, symbol: str) -> V:
+        index = self.find(symbol.encode())
+        if index is None:
+            raise KeyError(symbol)
+        return self.view(self.atlas, index)
+
+    def __iter__(self) -> Iterator[str]:
+        for index in range(self.count):
+            yield self._symbol(index).decode()
+
+    def __len__(self) -> int:
+        return self.count
+
+
+class Atlas:
+    """A memory-mapped atlas file, see the module docstring."""
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        with self.path.open("rb") as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._map) < HEADER.size or self._map[: len(MAGIC)] != MAGIC:
+            self._map.close()
+            raise ValueError(f"{self.path} is not an atlas")
+        _, version, systems, waypoints, refs, strings = HEADER.unpack_from(self._map)
+        if version != VERSION:
+            self._map.close()
+            raise ValueError(f"{self.path} is not a version {VERSION} atlas")
+
+        self._systems_at = HEADER.size
+        self._waypoints_at = self._systems_at + systems * SYSTEM.size
+        self._refs_at = self._waypoints_at + waypoints * WAYPOINT.size
+        self._offsets_at = self._refs_at + refs * 4
+        self._strings_at = self._offsets_at + (strings + 1) * 4
+
+        self.systems: Mapping[str, SystemView] = _Table(
+            self,
+            systems,
+            SystemView,
+            self._systems_at,
+            SYSTEM.size,
+        )
+        self._waypoint_table = _Table(
+            self,
+            waypoints,
+            WaypointView,
+            self._waypoints_at,
+            WAYPOINT.size,
+        )
+        self.waypoints: Mapping[str, WaypointView] = self._waypoint_table
+
+    def _bytes(self, string_id: int) -> bytes:
+        # Copying a symbol's few bytes out of the map is cheaper than taking
+        # a memoryview of it, which can't be ordered against a key anyway
+        start, end = _SPAN.unpack_from(self._map, self._offsets_at + 4 * string_id)
+        return self._map[self._strings_at + start : self._strings_at + end]
+
+    def _string(self, string_id: int) -> str:
+        return self._bytes(string_id).decode()
+
+    def _refs(self, start: int, count: int) -> list[str]:
+        ids = struct.unpack_from(f"<{count}I", self._map, self._refs_at + 4 * start)
+        return [self._string(string_id) for string_id in ids]
+
+    def system(self, system_symbol: str) -> SystemView | None:
+        return self.systems.get(system_symbol)
+
+    def waypoint(self, waypoint_symbol: str) -> WaypointView | None:
+        return self.waypoints.get(waypoint_symbol)
+
+    def waypoints_in_system(self, system_symbol: str) -> list[WaypointView]:
+        # Waypoint symbols start with their system's, so they sort together
+        table = self._waypoint_table
+        prefix = f"{system_symbol}-".encode()
+        views = []
+        index = table.bisect(prefix)
+        while index < table.count and table._symbol(index).startswith(prefix):
+            views.append(WaypointView(self, index))
+            index += 1
+        return views
+
+    def close(self) -> None:
+        self._map.close()
+
+    def __enter__(self) -> "Atlas":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
@@ -0,0 +1,292 @@
+import asyncio
+import time
+from collections.abc import Awaitable, Callable
+from datetime import UTC, datetime
+from typing import Any
+
+from aio_space_traders import model, utils
+
+
+class UniverseCache:
+    """Systems, waypoints and jump gates seen in api responses.
+
+    This data barely changes within a reset, so one cache can be shared by
+    every agent in a process. Register ``observe`` as a response hook (or
+    pass the cache to ``SpaceTradersApi``) to fill it from every response;
+    ``SpaceTradersApi`` answers ``get_system``, ``get_waypoint`` and
+    ``get_jump_gate`` from it without a request.
+
+    Entries older than ``max_age`` seconds are treated as missing. Waypoints
+    expire after ``waypoint_max_age`` instead, five minutes by default, as
+    their modifiers, traits and construction change during a reset. The
+    ``waypoints`` dict keeps them after that for their coordinates.
+    """
+
+    def __init__(
+        self,
+        max_age: float | None = None,
+        waypoint_max_age: float | None = 300.0,
+    ) -> None:
+        self.max_age = max_age
+        self.waypoint_max_age = waypoint_max_age
+        self.systems: dict[str, model.System] = {}
+        self.waypoints: dict[str, model.Waypoint] = {}
+        self.jump_gates: dict[str, model.JumpGate] = {}
+        self._system_waypoints: dict[str, set[str]] = {}
+        self._seen: dict[tuple[str, str], float] = {}
+
+    def _fresh(self, kind: str, symbol: str) -> bool:
+        seen = self._seen.get((kind, symbol))
+        if seen is None:
+            return False
+        max_age = self.waypoint_max_age if kind == "waypoint" else self.max_age
+        return max_age is None or time.monotonic() - seen <= max_age
+
+    def add_system(self, system: model.System) -> None:
+        self.systems[system.symbol] = system
+        self._seen[("system", system.symbol)] = time.monotonic()
+
+    def add_waypoint(self, waypoint: model.Waypoint) -> None:
+        symbol = waypoint.symbol.root
+        self.waypoints[symbol] = waypoint
+        self._system_waypoints.setdefault(waypoint.system_symbol.root, set()).add(symbol)
+        self._seen[("waypoint", symbol)] = time.monotonic()
+
+    def add_jump_gate(self, jump_gate: model.JumpGate) -> None:
+        symbol = jump_gate.symbol.root
+        self.jump_gates[symbol] = jump_gate
+        self._seen[("jump_gate", symbol)] = time.monotonic()
+
+    def system(self, system_symbol: str) -> model.System | None:
+        if not self._fresh("system", system_symbol):
+            return None
+        return self.systems[system_symbol]
+
+    def waypoint(self, waypoint_symbol: str) -> model.Waypoint | None:
+        if not self._fresh("waypoint", waypoint_symbol):
+            return None
+        return self.waypoints[waypoint_symbol]
+
+    def jump_gate(self, waypoint_symbol: str) -> model.JumpGate | None:
+        if not self._fresh("jump_gate", waypoint_symbol):
+            return None
+        return self.jump_gates[waypoint_symbol]
+
+    def waypoints_in_system(self, system_symbol: str) -> list[model.Waypoint]:
+        return [
+            self.waypoints[symbol]
+            for symbol in sorted(self._system_waypoints.get(system_symbol, ()))
+        ]
+
+    def observe(self, method: str, url: str, response: Any) -> None:
+        data = getattr(response, "data", None)
+        match data:
+            case model.System():
+                self.add_system(data)
+            case model.Waypoint():
+                self.add_waypoint(data)
+            case model.JumpGate():
+                self.add_jump_gate(data)
+            case model.CreateChartData():
+                self.add_waypoint(data.waypoint)
+            case model.ScanWaypointsData():
+                for waypoint in data.waypoints:
+                    self.add_waypoint(waypoint)
+            case model.ScanSystemsData():
+                for system in data.systems:
+                    self.add_system(system)
+            case list():
+                for item in data:
+                    if isinstance(item, model.System):
+                        self.add_system(item)
+                    elif isinstance(item, model.Waypoint):
+                        self.add_waypoint(item)
+
+
+class MarketCache:
+    """The latest prices seen at every market, indexed by trade good.
+
+    Markets only report ``trade_goods`` while one of our ships is present,
+    so a market fetched from afar updates its import/export lists but
+    keeps the last prices we saw. ``priced_at`` records when those prices
+    were observed.
+    """
+
+    def __init__(self) -> None:
+        self.markets: dict[str, model.Market] = {}
+        self.priced_at: dict[str, datetime] = {}
+        self._by_good: dict[str, dict[str, model.MarketTradeGood]] = {}
+
+    def __contains__(self, waypoint_symbol: str) -> bool:
+        return waypoint_symbol in self.markets
+
+    def add(self, market: model.Market, observed_at: datetime | None = None) -> None:
+        previous = self.markets.get(market.symbol)
+        if market.trade_goods is None:
+            if previous is not None and previous.trade_goods is not None:
+                market = market.model_copy(update={"trade_goods": previous.trade_goods})
+            self.markets[market.symbol] = market
+            return
+
+        if previous is not None and previous.trade_goods:
+            for good in previous.trade_goods:
+                self._by_good.get(good.symbol, {}).pop(market.symbol, None)
+        self.markets[market.symbol] = market
+        self.priced_at[market.symbol] = observed_at or datetime.now(UTC)
+        for good in market.trade_goods:
+            self._by_good.setdefault(good.symbol, {})[market.symbol] = good
+
+    def observe(self, method: str, url: str, response: Any) -> None:
+        if isinstance(response, model.GetMarketResponse):
+            self.add(response.data)
+
+    def age(self, waypoint_symbol: str, now: datetime | None = None) -> float | None:
+        """Seconds since prices were seen at a market, None if never."""
+        priced_at = self.priced_at.get(waypoint_symbol)
+        if priced_at is None:
+            return None
+        return ((now or datetime.now(UTC)) - priced_at).total_seconds()
+
+    def good(self, waypoint_symbol: str, trade_symbol: str) -> model.MarketTradeGood | None:
+        return self._by_good.get(trade_symbol, {}).get(waypoint_symbol)
+
+    def listings(self, trade_symbol: str) -> dict[str, model.MarketTradeGood]:
+        """Every priced market trading a good, keyed by waypoint symbol."""
+        return dict(self._by_good.get(trade_symbol, {}))
+
+    def cheapest(self, trade_symbol: str) -> tuple[str, model.MarketTradeGood] | None:
+        """Where a good can be bought for the least."""
+        listings = self._by_good.get(trade_symbol)
+        if not listings:
+            return None
+        return min(listings.items(), key=lambda listing: listing[1].purchase_price)
+
+    def best_sale(self, trade_symbol: str) -> tuple[str, model.MarketTradeGood] | None:
+        """Where a good sells for the most."""
+        listings = self._by_good.get(trade_symbol)
+        if not listings:
+            return None
+        return max(listings.items(), key=lambda listing: listing[1].sell_price)
+
+
+class _Abandoned(Exception):
+    """Raised to callers waiting on a read whose caller was cancelled."""
+
+
+_SHIP_RESOURCES: dict[type, tuple[str, type]] = {
+    model.Ship: ("ship", model.GetShipResponse),
+    model.ShipNav: ("nav", model.GetShipNavResponse),
+    model.ShipCargo: ("cargo", model.GetShipCargoResponse),
+}
+
+
+class ShipReadCache:
+    """Short-lived answers for ``get_ship``, ``get_ship_nav`` and ``get_ship_cargo``.
+
+    A response read within the last ``max_age`` seconds is returned again
+    instead of asking the server, and concurrent reads of the same resource
+    share one request. Register ``observe`` as a response hook (or pass the
+    cache to ``SpaceTradersApi``) so that a successful mutating call for a
+    ship drops what was cached for it; the ship state in the mutation's
+    response is cached in its place, so a read after a write sees the write.
+    Mutating calls that don't name a ship in the url, like delivering a
+    contract, clear the whole cache.
+
+    Cached responses are shared between callers and must not be modified.
+    """
+
+    def __init__(self, max_age: float = 1.0) -> None:
+        self.max_age = max_age
+        self.hits = 0
+        self.misses = 0
+        self._entries: dict[tuple[str, str], tuple[float, Any]] = {}
+        self._in_flight: dict[tuple[str, str], asyncio.Future[Any]] = {}
+        self._generations: dict[str, int] = {}
+
+    def get(self, ship_symbol: str, resource: str) -> Any | None:
+        entry = self._entries.get((ship_symbol, resource))
+        if entry is None or time.monotonic() - entry[0] > self.max_age:
+            return None
+        return entry[1]
+
+    async def read[T](
+        self,
+        ship_symbol: str,
+        resource: str,
+        fetch: Callable[[], Awaitable[T]],
+    ) -> T:
+        """Returns a fresh cached response, joins a read in flight or fetches."""
+        key = (ship_symbol, resource)
+        while True:
+            cached = self.get(ship_symbol, resource)
+            if cached is not None:
+                self.hits += 1
+                return cached
+            in_flight = self._in_flight.get(key)
+            if in_flight is None:
+                break
+            try:
+                response = await asyncio.shield(in_flight)
+            except _Abandoned:
+                # The caller that started the read was cancelled, read again
+                continue
+            self.hits += 1
+            return response
+
+        self.misses += 1
+        generation = self._generations.get(ship_symbol, 0)
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            response = await fetch()
+        except asyncio.CancelledError:
+            # Callers that joined weren't cancelled, so they fetch for themselves
+            self._settle(future, _Abandoned())
+            raise
+        except BaseException as error:
+            self._settle(future, error)
+            raise
+        else:
+            future.set_result(response)
+            # A write that completed meanwhile makes this response stale
+            if self._generations.get(ship_symbol, 0) == generation:
+                self._entries[key] = (time.monotonic(), response)
+            return response
+        finally:
+            if self._in_flight.get(key) is future:
+                del self._in_flight[key]
+
+    @staticmethod
+    def _settle(future: asyncio.Future[Any], error: BaseException) -> None:
+        future.set_exception(error)
+        # Only waiters that joined see the error, don't warn if there are none
+        future.exception()
+
+    def invalidate(self, ship_symbol: str | None = None) -> None:
+        """Forgets one ship's cached and in-flight reads, or every ship's."""
+        ships = (
+            {ship for ship, _ in self._entries} | {ship for ship, _ in self._in_flight}
+            if ship_symbol is None
+            else {ship_symbol}
+        )
+        for ship in ships:
+            self._generations[ship] = self._generations.get(ship, 0) + 1
+            for resource in ("ship", "nav", "cargo"):
+                self._entries.pop((ship, resource), None)
+                self._in_flight.pop((ship, resource), None)
+
+    def observe(self, method: str, url: str, response: Any) -> None:
+        if method.upper() == "GET":
+            return
+        ship_symbol = utils.ship_symbol_from_url(url)
+        if ship_symbol is None:
+            self.invalidate()
+        else:
+            self.invalidate(ship_symbol)
+
+        now = time.monotonic()
+        for ship, component in utils.iter_ship_state(url, response):
+            resource = _SHIP_RESOURCES.get(type(component))
+            if resource is not None:
+                name, response_model = resource
+                self._entries[(ship, name)] = (now, response_model(data=component))
@@ -0,0 +1,296 @@
+import math
+from collections.abc import Iterable
+from dataclasses import dataclass
+from typing import Any
+
+from aio_space_traders import model, navigation, trading, utils
+from aio_space_traders.actions import ShipActions
+from aio_space_traders.cache import MarketCache, UniverseCache
+from aio_space_traders.errors import (
+    ConstructionMaterialFulfilled,
+    ConstructionMaterialNotRequired,
+)
+
+
+@dataclass
+class SupplyAssignment:
+    """One hauler trip: buy ``units`` at ``source`` and supply a site.
+
+    ``source`` is None when the goods are already in the ship's hold.
+    """
+
+    ship_symbol: str
+    site: str
+    trade_symbol: model.TradeSymbol
+    units: int
+    origin: str
+    source: str | None = None
+    # Credits for the goods and the fuel burned on the trip
+    cost: int = 0
+    seconds: int = 0
+
+
+class ConstructionSupply:
+    """Tracks the materials construction sites still need and assigns haulers.
+
+    Sites are added from ``get_construction_site`` and supply responses
+    (register ``observe`` as a response hook to keep them current). Units
+    handed out in an assignment are reserved until the assignment is
+    released, so haulers working the same site never carry more than it
+    still needs and supplying never runs into ``ConstructionMaterialFulfilled``
+    from a competing delivery.
+
+    Trips are ranked by what they cost in all: the goods at the prices in
+    a ``MarketCache`` plus the fuel burned getting them to the site, with
+    distances from a ``UniverseCache``, so a far source has to be cheap
+    enough to pay for the flight.
+    """
+
+    def __init__(
+        self,
+        universe: UniverseCache,
+        markets: MarketCache,
+        flight_mode: model.ShipNavFlightMode = model.ShipNavFlightMode.CRUISE,
+        fuel_price: int | None = None,
+    ) -> None:
+        self.universe = universe
+        self.markets = markets
+        self.flight_mode = flight_mode
+        self.fuel_price = fuel_price
+        self.sites: dict[str, model.Construction] = {}
+        self._reserved: dict[tuple[str, str], int] = {}
+
+    def add(self, construction: model.Construction) -> None:
+        self.sites[construction.symbol] = construction
+
+    def observe(self, method: str, url: str, response: Any) -> None:
+        if isinstance(response, model.GetConstructionSiteResponse):
+            self.add(response.data)
+        elif isinstance(response, model.SupplyConstructionSiteResponse):
+            self.add(response.data.construction)
+
+    def remaining(self, site: str, trade_symbol: str) -> int:
+        """Units a site still needs, ignoring assignments in progress."""
+        construction = self.sites.get(site)
+        if construction is None or construction.is_complete:
+            return 0
+        for material in construction.materials:
+            if material.trade_symbol == trade_symbol:
+                return max(0, material.required - material.fulfilled)
+        return 0
+
+    def unassigned(self, site: str, trade_symbol: str) -> int:
+        """Units a site still needs that no hauler is carrying yet."""
+        reserved = self._reserved.get((site, trade_symbol), 0)
+        return max(0, self.remaining(site, trade_symbol) - reserved)
+
+    def outstanding(self) -> dict[tuple[str, model.TradeSymbol], int]:
+        """Unassigned units across all sites, keyed by ``(site, good)``."""
+        needed = {}
+        for site, construction in self.sites.items():
+            for material in construction.materials:
+                units = self.unassigned(site, material.trade_symbol)
+                if units:
+                    needed[(site, material.trade_symbol)] = units
+        return needed
+
+    def _fuel_price(self) -> int:
+        if self.fuel_price is not None:
+            return self.fuel_price
+        cheapest = self.markets.cheapest(model.TradeSymbol.FUEL)
+        return cheapest[1].purchase_price if cheapest else 0
+
+    def _leg(self, origin: str, destination: str, speed: int) -> tuple[int, int] | None:
+        """Seconds and fuel units between two waypoints, if both are known."""
+        if origin == destination:
+            return 0, 0
+        start = self.universe.waypoints.get(origin)
+        end = self.universe.waypoints.get(destination)
+        if start is None or end is None:
+            return None
+        distance = navigation.distance(start, end)
+        return (
+            navigation.travel_time(distance, speed, self.flight_mode),
+            navigation.fuel_cost(distance, self.flight_mode),
+        )
+
+    def _fuel_credits(self, fuel: int, fuel_price: int) -> int:
+        return math.ceil(fuel / navigation.FUEL_PER_MARKET_UNIT) * fuel_price
+
+    def _purchase_trip(
+        self,
+        ship: model.Ship,
+        site: str,
+        trade_symbol: model.TradeSymbol,
+        units: int,
+        fuel_price: int,
+    ) -> SupplyAssignment | None:
+        location = ship.nav.waypoint_symbol.root
+        best = None
+        for source, listing in self.markets.listings(trade_symbol).items():
+            outbound = self._leg(location, source, ship.engine.speed)
+            delivery = self._leg(source, site, ship.engine.speed)
+            if outbound is None or delivery is None:
+                continue
+            trip = SupplyAssignment(
+                ship.symbol,
+                site,
+                trade_symbol,
+                units,
+                location,
+                source,
+                units * listing.purchase_price
+                + self._fuel_credits(outbound[1] + delivery[1], fuel_price),
+                outbound[0] + delivery[0],
+            )
+            if best is None or (trip.cost, trip.seconds) < (best.cost, best.seconds):
+                best = trip
+        return best
+
+    def assign(self, ship: model.Ship) -> SupplyAssignment | None:
+        """Reserves the best trip for a ship, or None if nothing is needed.
+
+        Cargo already in the hold is delivered first. Otherwise the ship
+        fills its free space on the trip that costs least, goods and fuel
+        together.
+        """
+        location = ship.nav.waypoint_symbol.root
+        on_board = {
+            item.symbol: item.units for item in ship.cargo.inventory if item is not None
+        }
+        free = ship.cargo.capacity - ship.cargo.units
+        fuel_price = self._fuel_price()
+
+        best: tuple[tuple[bool, int, int], SupplyAssignment] | None = None
+        for (site, symbol), units in self.outstanding().items():
+            if on_board.get(symbol):
+                leg = self._leg(location, site, ship.engine.speed)
+                if leg is None:
+                    continue
+                trip = SupplyAssignment(
+                    ship.symbol,
+                    site,
+                    symbol,
+                    min(units, on_board[symbol]),
+                    location,
+                    cost=self._fuel_credits(leg[1], fuel_price),
+                    seconds=leg[0],
+                )
+            elif free > 0:
+                trip = self._purchase_trip(ship, site, symbol, min(units, free), fuel_price)
+                if trip is None:
+                    continue
+            else:
+                continue
+            key = (trip.source is not None, trip.cost, trip.seconds)
+            if best is None or key < best[0]:
+                best = (key, trip)
+
+        if best is None:
+            return None
+        assignment = best[1]
+        reservation = (assignment.site, assignment.trade_symbol)
+        self._reserved[reservation] = self._reserved.get(reservation, 0) + assignment.units
+        return assignment
+
+    def assign_all(self, ships: Iterable[model.Ship]) -> list[SupplyAssignment]:
+        """Assigns a trip to every ship that has one available."""
+        assignments = []
+        for ship in ships:
+            assignment = self.assign(ship)
+            if assignment is not None:
+                assignments.append(assignment)
+        return assignments
+
+    def release(self, assignment: SupplyAssignment) -> None:
+        """Frees the units an assignment reserved."""
+        reservation = (assignment.site, assignment.trade_symbol)
+        units = self._reserved.get(reservation, 0) - assignment.units
+        if units > 0:
+            self._reserved[reservation] = units
+        else:
+            self._reserved.pop(reservation, None)
+
+    async def supply(
+        self,
+        actions: ShipActions,
+        ship_symbol: str,
+        site: str,
+        trade_symbol: str,
+        units: int,
+    ) -> model.SupplyConstructionSiteResponse | None:
+        """Supplies no more than a site still needs.
+
+        If the server reports the material as already fulfilled or not
+        required, the site is fetched again and the delivery retried once
+        with the fresh count. Returns None when nothing was supplied.
+        """
+        system = utils.system_symbol(site)
+        for attempt in range(2):
+            units = min(units, self.remaining(site, trade_symbol))
+            if units <= 0:
+                return None
+            try:
+                response = await actions.supply_construction(
+                    system,
+                    site,
+                    model.SupplyConstructionSiteObject(
+                        ship_symbol=ship_symbol,
+                        trade_symbol=trade_symbol,
+                        units=units,
+                    ),
+                )
+            except (ConstructionMaterialFulfilled, ConstructionMaterialNotRequired):
+                if attempt:
+                    raise
+                self.add((await actions.api.get_construction_site(system, site)).data)
+                continue
+            self.add(response.data.construction)
+            return response
+        return None
+
+    async def _travel(self, actions: ShipActions, ship_symbol: str, waypoint: str) -> None:
+        await actions.navigate(ship_symbol, waypoint)
+        await actions.wait_for_arrival(ship_symbol)
+
+    async def haul(
+        self,
+        actions: ShipActions,
+        assignment: SupplyAssignment,
+        cargo: model.ShipCargo,
+    ) -> model.SupplyConstructionSiteResponse | None:
+        """Runs an assignment: buy, fly to the site and supply.
+
+        The reservation is released however the trip ends. Only the units
+        actually bought are supplied, so slipped or failed purchases never
+        over-supply.
+        """
+        ship = assignment.ship_symbol
+        units = assignment.units
+        try:
+            if assignment.source is not None:
+                if assignment.source != assignment.origin:
+                    await self._travel(actions, ship, assignment.source)
+                result = await trading.purchase_all(
+                    actions,
+                    ship,
+                    {assignment.trade_symbol: units},
+                    cargo,
+                    self.markets.markets[assignment.source],
+                )
+                units = result.units
+                if not units:
+                    return None
+                if assignment.site != assignment.source:
+                    await self._travel(actions, ship, assignment.site)
+            elif assignment.site != assignment.origin:
+                await self._travel(actions, ship, assignment.site)
+            return await self.supply(
+                actions,
+                ship,
+                assignment.site,
+                assignment.trade_symbol,
+                units,
+            )
+        finally:
+            self.release(assignment)
@@ -0,0 +1,219 @@
+import math
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+
+from aio_space_traders import model, navigation
+from aio_space_traders.cache import MarketCache, UniverseCache
+
+
+@dataclass
+class DeliveryBatch:
+    """One trip: buy ``units`` at ``source`` and deliver them.
+
+    ``source`` is None for cargo that is already in the ship's hold.
+    """
+
+    trade_symbol: str
+    source: str | None
+    destination: str
+    units: int
+
+
+@dataclass
+class ContractPlan:
+    contract: model.Contract
+    batches: list[DeliveryBatch] = field(default_factory=list)
+    payment: int = 0
+    cost: int = 0
+    seconds: int = 0
+    problem: str | None = None
+
+    @property
+    def feasible(self) -> bool:
+        return self.problem is None
+
+    @property
+    def profit(self) -> int:
+        return self.payment - self.cost
+
+    @property
+    def score(self) -> float:
+        """Profit per hour; infeasible plans score ``-inf``."""
+        if not self.feasible:
+            return -math.inf
+        return self.profit / (max(self.seconds, 1) / 3600)
+
+
+class ContractPlanner:
+    """Costs contracts from cached market prices and waypoint positions.
+
+    No requests are made: sourcing, travel time, fuel and deadlines are all
+    worked out from a ``UniverseCache`` and a ``MarketCache``, so every open
+    and negotiable contract can be compared in one pass. Each delivery is
+    split into hold-sized batches, each batch being one trip from a
+    market to the contract destination. Each good comes from the market
+    that leaves the plan with the best profit per hour, counting fuel and
+    flight time as well as its price.
+    """
+
+    def __init__(
+        self,
+        universe: UniverseCache,
+        markets: MarketCache,
+        flight_mode: model.ShipNavFlightMode = model.ShipNavFlightMode.CRUISE,
+        fuel_price: int | None = None,
+    ) -> None:
+        self.universe = universe
+        self.markets = markets
+        self.flight_mode = flight_mode
+        self.fuel_price = fuel_price
+
+    def _fuel_price(self) -> int:
+        if self.fuel_price is not None:
+            return self.fuel_price
+        cheapest = self.markets.cheapest(model.TradeSymbol.FUEL)
+        return cheapest[1].purchase_price if cheapest else 0
+
+    def _leg(
+        self,
+        origin: str,
+        destination: str,
+        speed: int,
+        legs: dict[tuple[str, str, int], tuple[int, int] | None],
+    ) -> tuple[int, int] | None:
+        """Seconds and fuel units between two waypoints, if both are known."""
+        if origin == destination:
+            return 0, 0
+        key = (origin, destination, speed)
+        if key not in legs:
+            start = self.universe.waypoints.get(origin)
+            end = self.universe.waypoints.get(destination)
+            if start is None or end is None:
+                legs[key] = None
+            else:
+                distance = navigation.distance(start, end)
+                legs[key] = (
+                    navigation.travel_time(distance, speed, self.flight_mode),
+                    navigation.fuel_cost(distance, self.flight_mode),
+                )
+        return legs[key]
+
+    def plan(
+        self,
+        contract: model.Contract,
+        ship: model.Ship,
+        now: datetime | None = None,
+        legs: dict[tuple[str, str, int], tuple[int, int] | None] | None = None,
+    ) -> ContractPlan:
+        now = now or datetime.now(UTC)
+        legs = {} if legs is None else legs
+        terms = contract.terms
+        plan = ContractPlan(
+            contract,
+            payment=terms.payment.on_fulfilled
+            + (0 if contract.accepted else terms.payment.on_accepted),
+        )
+        if contract.fulfilled:
+            plan.problem = "already fulfilled"
+            return plan
+        if not contract.accepted and (
+            contract.deadline_to_accept or contract.expiration
+        ) <= now:
+            plan.problem = "can no longer be accepted"
+            return plan
+
+        speed = ship.engine.speed
+        goods = [
+            good
+            for good in terms.deliver or []
+            if good.units_required > good.units_fulfilled
+        ]
+        wanted = {good.trade_symbol for good in goods}
+        on_board = {
+            item.symbol: item.units
+            for item in ship.cargo.inventory
+            if item is not None and item.symbol in wanted
+        }
+        other_cargo = ship.cargo.units - sum(on_board.values())
+        capacity = max(1, ship.cargo.capacity - other_cargo)
+        location = ship.nav.waypoint_symbol.root
+        fuel = 0
+        fuel_price = self._fuel_price()
+
+        for good in goods:
+            remaining = good.units_required - good.units_fulfilled
+            destination = good.destination_symbol
+
+            carried = min(on_board.pop(good.trade_symbol, 0), remaining)
+            if carried:
+                leg = self._leg(location, destination, speed, legs)
+                if leg is None:
+                    plan.problem = f"unknown route to {destination}"
+                    return plan
+                plan.seconds += leg[0]
+                fuel += leg[1]
+                plan.batches.append(
+                    DeliveryBatch(good.trade_symbol, None, destination, carried),
+                )
+                location = destination
+                remaining -= carried
+            if not remaining:
+                continue
+
+            trips = math.ceil(remaining / capacity)
+            best = None
+            for source, listing in self.markets.listings(good.trade_symbol).items():
+                outbound = self._leg(location, source, speed, legs)
+                delivery = self._leg(source, destination, speed, legs)
+                back = self._leg(destination, source, speed, legs)
+                if outbound is None or delivery is None or back is None:
+                    continue
+                seconds = outbound[0] + trips * delivery[0] + (trips - 1) * back[0]
+                trip_fuel = outbound[1] + trips * delivery[1] + (trips - 1) * back[1]
+                cost = remaining * listing.purchase_price
+                fuel_cost = (
+                    math.ceil((fuel + trip_fuel) / navigation.FUEL_PER_MARKET_UNIT) * fuel_price
+                )
+                profit = plan.payment - plan.cost - cost - fuel_cost
+                # Judged like ``ContractPlan.score``, but a loss is kept small
+                # rather than spread over a longer trip
+                rank = (
+                    profit > 0,
+                    profit / max(plan.seconds + seconds, 1) if profit > 0 else profit,
+                )
+                candidate = (rank, cost, seconds, source, trip_fuel)
+                if best is None or candidate[0] > best[0]:
+                    best = candidate
+            if best is None:
+                plan.problem = f"no known market sells {good.trade_symbol}"
+                return plan
+
+            _, cost, seconds, source, trip_fuel = best
+            plan.cost += cost
+            plan.seconds += seconds
+            fuel += trip_fuel
+            while remaining:
+                units = min(remaining, capacity)
+                plan.batches.append(
+                    DeliveryBatch(good.trade_symbol, source, destination, units),
+                )
+                remaining -= units
+            location = destination
+
+        plan.cost += math.ceil(fuel / navigation.FUEL_PER_MARKET_UNIT) * fuel_price
+        if now.timestamp() + plan.seconds > terms.deadline.timestamp():
+            plan.problem = "can't be delivered before the deadline"
+        return plan
+
+    def plan_all(
+        self,
+        contracts: Iterable[model.Contract],
+        ship: model.Ship,
+        now: datetime | None = None,
+    ) -> list[ContractPlan]:
+        """Plans every contract for a ship, best score first."""
+        now = now or datetime.now(UTC)
+        legs: dict[tuple[str, str, int], tuple[int, int] | None] = {}
+        plans = [self.plan(contract, ship, now, legs) for contract in contracts]
+        return sorted(plans, key=lambda plan: plan.score, reverse=True)
@@ -0,0 +1,233 @@
+"""Find out where a slow bot spends its time, without an external profiler.
+
+``Diagnostics`` measures three things while it runs:
+
+* event loop lag, from a heartbeat task that notes how late its sleeps
+  wake up;
+* where every request's time goes, per endpoint: waiting for the rate
+  limiter, waiting for a request slot, the network, and decoding,
+  validating and running hooks on the response;
+* stalls, when the loop doesn't run the heartbeat for ``stall_threshold``
+  seconds. A watchdog thread then samples the loop thread's stack and
+  notes the endpoint whose response was being processed, if any.
+
+Pass it to ``SpaceTradersApi`` (or ``AgentPool``) and read ``report()``
+whenever latency looks wrong::
+
+    async with Diagnostics() as diagnostics:
+        api = SpaceTradersApi(token, diagnostics=diagnostics)
+        diagnostics.dump_on_signal()  # kill -USR1 <pid> prints a report
+        ...
+"""
+
+import asyncio
+import signal
+import statistics
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from types import TracebackType
+from typing import TextIO
+
+from aio_space_traders import utils
+
+
+@dataclass
+class Stall:
+    started: datetime
+    duration: float
+    endpoint: str | None
+    stack: list[str] = field(default_factory=list)
+
+
+@dataclass
+class EndpointStats:
+    """Seconds spent in each phase of an endpoint's requests, summed."""
+
+    count: int = 0
+    rate_limit: float = 0.0
+    slot: float = 0.0
+    network: float = 0.0
+    processing: float = 0.0
+    slowest: float = 0.0
+
+    @property
+    def total(self) -> float:
+        return self.rate_limit + self.slot + self.network + self.processing
+
+
+class Diagnostics:
+    def __init__(
+        self,
+        interval: float = 0.05,
+        stall_threshold: float = 0.25,
+        max_stalls: int = 50,
+        max_lag_samples: int = 10_000,
+    ) -> None:
+        self.interval = interval
+        self.stall_threshold = stall_threshold
+        self.lags: deque[float] = deque(maxlen=max_lag_samples)
+        self.max_lag = 0.0
+        self.stalls: deque[Stall] = deque(maxlen=max_stalls)
+        self.endpoints: dict[str, EndpointStats] = {}
+        # The endpoint whose response the loop is processing right now
+        self.current: str | None = None
+
+        self._task: asyncio.Task[None] | None = None
+        self._watchdog: threading.Thread | None = None
+        self._stopped = threading.Event()
+        self._loop_thread: int | None = None
+        self._heartbeat = time.monotonic()
+        self._pending: Stall | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """Starts the heartbeat and the watchdog; needs a running loop."""
+        if self.running:
+            return
+        self._loop_thread = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stopped.clear()
+        self._task = asyncio.get_running_loop().create_task(self._beat())
+        self._watchdog = threading.Thread(
+            target=self._watch,
+            name="diagnostics-watchdog",
+            daemon=True,
+        )
+        self._watchdog.start()
+
+    async def stop(self) -> None:
+        self._stopped.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._watchdog is not None:
+            self._watchdog.join()
+            self._watchdog = None
+
+    async def _beat(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            self._heartbeat = time.monotonic()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - expected)
+            self._heartbeat = time.monotonic()
+            self.lags.append(lag)
+            self.max_lag = max(self.max_lag, lag)
+            with self._lock:
+                stall, self._pending = self._pending, None
+            if stall is not None:
+                stall.duration = lag
+                self.stalls.append(stall)
+
+    def _watch(self) -> None:
+        sampled = None
+        while not self._stopped.wait(self.stall_threshold / 4):
+            heartbeat = self._heartbeat
+            late = time.monotonic() - heartbeat - self.interval
+            if late < self.stall_threshold or heartbeat == sampled:
+                continue
+            # One stack sample per stall, taken while the loop is still stuck
+            sampled = heartbeat
+            frame = sys._current_frames().get(self._loop_thread or 0)
+            stall = Stall(
+                started=datetime.now(UTC),
+                duration=late,
+                endpoint=self.current,
+                stack=traceback.format_stack(frame) if frame is not None else [],
+            )
+            with self._lock:
+                self._pending = stall
+
+    def record_request(
+        self,
+        method: str,
+        url: str,
+        rate_limit: float,
+        slot: float,
+        network: float,
+        processing: float,
+    ) -> None:
+        endpoint = f"{method} {utils.route_template(url)}"
+        stats = self.endpoints.setdefault(endpoint, EndpointStats())
+        stats.count += 1
+        stats.rate_limit += rate_limit
+        stats.slot += slot
+        stats.network += network
+        stats.processing += processing
+        stats.slowest = max(stats.slowest, rate_limit + slot + network + processing)
+
+    def report(self) -> str:
+        lines = []
+        if self.lags:
+            lags = sorted(self.lags)
+            p99 = lags[min(len(lags) - 1, int(len(lags) * 0.99))]
+            lines.append(
+                f"event loop lag over {len(lags)} samples: "
+                f"mean {statistics.fmean(lags) * 1000:.1f} ms, "
+                f"p99 {p99 * 1000:.1f} ms, max {self.max_lag * 1000:.1f} ms",
+            )
+        else:
+            lines.append("event loop lag: no samples")
+
+        lines.append("")
+        lines.append(
+            f"{'endpoint':<50} {'count':>6} {'rate limit':>11} {'slot':>8} "
+            f"{'network':>8} {'process':>8} {'slowest':>8}  (mean ms)",
+        )
+        ranked = sorted(self.endpoints.items(), key=lambda item: -item[1].total)
+        for endpoint, stats in ranked:
+            mean = 1000 / stats.count
+            lines.append(
+                f"{endpoint:<50} {stats.count:>6} {stats.rate_limit * mean:>11.1f} "
+                f"{stats.slot * mean:>8.1f} {stats.network * mean:>8.1f} "
+                f"{stats.processing * mean:>8.1f} {stats.slowest * 1000:>8.1f}",
+            )
+
+        lines.append("")
+        lines.append(f"stalls over {self.stall_threshold * 1000:.0f} ms: {len(self.stalls)}")
+        for stall in self.stalls:
+            serving = f" while processing {stall.endpoint}" if stall.endpoint else ""
+            lines.append(
+                f"  {stall.started:%H:%M:%S} {stall.duration * 1000:.0f} ms{serving}",
+            )
+            lines.extend(
+                "    " + line for frame in stall.stack for line in frame.rstrip().splitlines()
+            )
+        return "\n".join(lines)
+
+    def dump(self, file: TextIO | None = None) -> None:
+        print(self.report(), file=file or sys.stderr, flush=True)
+
+    def dump_on_signal(
+        self,
+        signum: int = signal.SIGUSR1,
+        file: TextIO | None = None,
+    ) -> None:
+        """Prints a report whenever the process receives ``signum``."""
+        asyncio.get_running_loop().add_signal_handler(signum, self.dump, file)
+
+    async def __aenter__(self) -> "Diagnostics":
+        self.start()
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        await self.stop()
@@ -0,0 +1,183 @@
+import asyncio
+import math
+import time
+from collections.abc import Collection
+from dataclasses import dataclass, field
+from typing import Any
+
+from aio_space_traders import model, utils
+from aio_space_traders.api import SpaceTradersApi
+from aio_space_traders.errors import SpaceTradersAPIError
+
+# The largest page ``list_ships`` returns
+PAGE_SIZE = 20
+
+
+@dataclass
+class RefreshPlan:
+    """The requests a refresh makes: ``list_ships`` pages and ``get_ship`` calls."""
+
+    pages: list[int] = field(default_factory=list)
+    ships: list[str] = field(default_factory=list)
+
+    @property
+    def requests(self) -> int:
+        return len(self.pages) + len(self.ships)
+
+
+class FleetView:
+    """The latest known state of every ship, refreshed in as few requests as possible.
+
+    Every ship, nav, cargo, fuel and cooldown seen in any api response is
+    merged in through a response hook. ``refresh`` brings stale ships up to
+    date: ships are listed in purchase order, so once a ship has been seen
+    on a ``list_ships`` page we know which page to fetch it from again, and
+    one page refreshes up to ``PAGE_SIZE`` ships for the cost of one
+    ``get_ship``. Ships never seen on a page are fetched on their own unless
+    listing the pages not already being fetched is cheaper.
+    """
+
+    def __init__(self, api: SpaceTradersApi, max_age: float = 60.0) -> None:
+        self.api = api
+        self.max_age = max_age
+        self.ships: dict[str, model.Ship] = {}
+        self.refreshed_at: dict[str, float] = {}
+        self.positions: dict[str, int] = {}
+        self.total: int | None = None
+        api.add_response_hook(self.observe)
+
+    def __getitem__(self, ship_symbol: str) -> model.Ship:
+        return self.ships[ship_symbol]
+
+    def __contains__(self, ship_symbol: str) -> bool:
+        return ship_symbol in self.ships
+
+    def __len__(self) -> int:
+        return len(self.ships)
+
+    def observe(self, method: str, url: str, response: Any) -> None:
+        now = time.monotonic()
+        for ship_symbol, component in utils.iter_ship_state(url, response):
+            if isinstance(component, model.Ship):
+                self.ships[ship_symbol] = component
+                self.refreshed_at[ship_symbol] = now
+                continue
+            ship = self.ships.get(ship_symbol)
+            if ship is None:
+                continue
+            match component:
+                case model.ShipNav():
+                    update = {"nav": component}
+                case model.ShipCargo():
+                    update = {"cargo": component}
+                case model.ShipFuel():
+                    update = {"fuel": component}
+                case model.Cooldown():
+                    update = {"cooldown": component}
+                case _:
+                    continue
+            # Ships may be held elsewhere, so they're replaced rather than changed
+            self.ships[ship_symbol] = ship.model_copy(update=update)
+
+    def stale(self, now: float | None = None) -> list[str]:
+        now = time.monotonic() if now is None else now
+        return [
+            ship_symbol
+            for ship_symbol in self.ships
+            if now - self.refreshed_at.get(ship_symbol, -math.inf) > self.max_age
+        ]
+
+    def plan(self, ship_symbols: Collection[str]) -> RefreshPlan:
+        """Chooses the cheapest mix of pages and single ship requests."""
+        pages: dict[int, list[str]] = {}
+        unplaced = []
+        for ship_symbol in ship_symbols:
+            position = self.positions.get(ship_symbol)
+            if position is None:
+                unplaced.append(ship_symbol)
+            else:
+                pages.setdefault(position // PAGE_SIZE + 1, []).append(ship_symbol)
+
+        plan = RefreshPlan()
+        for page, ships in sorted(pages.items()):
+            # A page costs as much as one ship and has a bigger response
+            if len(ships) == 1:
+                plan.ships.extend(ships)
+            else:
+                plan.pages.append(page)
+
+        if len(unplaced) > 1 and self.total is None:
+            # The first page tells us how many pages there are
+            return RefreshPlan(pages=[1])
+        if unplaced:
+            page_count = math.ceil((self.total or 0) / PAGE_SIZE)
+            if page_count < plan.requests + len(unplaced):
+                return RefreshPlan(pages=list(range(1, page_count + 1)))
+            plan.ships.extend(unplaced)
+        return plan
+
+    async def _fetch_page(self, page: int) -> list[model.Ship]:
+        response = await self.api.list_ships(
+            model.PaginationParameters(limit=PAGE_SIZE, page=page),
+        )
+        self.total = response.meta.total
+        start = (page - 1) * PAGE_SIZE
+        for index, ship in enumerate(response.data):
+            self.positions[ship.symbol] = start + index
+        return response.data
+
+    async def _fetch_ship(self, ship_symbol: str) -> None:
+        try:
+            await self.api.get_ship(ship_symbol)
+        except SpaceTradersAPIError as error:
+            # Scrapped ships are gone for good
+            if error.status_code != 404:
+                raise
+            self.forget(ship_symbol)
+
+    async def _list_all(self) -> RefreshPlan:
+        made = RefreshPlan(pages=[1])
+        await self._fetch_page(1)
+        made.pages.extend(range(2, math.ceil((self.total or 0) / PAGE_SIZE) + 1))
+        await asyncio.gather(*(self._fetch_page(page) for page in made.pages[1:]))
+        return made
+
+    async def refresh(
+        self,
+        ship_symbols: Collection[str] | None = None,
+    ) -> RefreshPlan:
+        """Refreshes the given ships, or every stale one.
+
+        The first refresh without ship symbols lists the whole fleet.
+        Returns the requests that were made.
+        """
+        if ship_symbols is None:
+            if self.total is None:
+                return await self._list_all()
+            ship_symbols = self.stale()
+
+        made = RefreshPlan()
+        wanted = set(ship_symbols)
+        while wanted:
+            plan = self.plan(wanted)
+            plan.pages = [page for page in plan.pages if page not in made.pages]
+            plan.ships = [ship for ship in plan.ships if ship not in made.ships]
+            if not plan.requests:
+                # Pages already fetched didn't have these ships where expected
+                plan.ships = sorted(wanted - set(made.ships))
+                if not plan.ships:
+                    break
+
+            made.pages.extend(plan.pages)
+            made.ships.extend(plan.ships)
+            pages = await asyncio.gather(*(self._fetch_page(page) for page in plan.pages))
+            await asyncio.gather(*(self._fetch_ship(ship) for ship in plan.ships))
+            for ships in pages:
+                wanted.difference_update(ship.symbol for ship in ships)
+            wanted.difference_update(plan.ships)
+        return made
+
+    def forget(self, ship_symbol: str) -> None:
+        self.ships.pop(ship_symbol, None)
+        self.refreshed_at.pop(ship_symbol, None)
+        self.positions.pop(ship_symbol, None)
@@ -0,0 +1,234 @@
+"""Spread a siphon fleet over the gas giants of a system.
+
+Siphoning one gas giant too hard destabilizes it, and every siphon there
+fails with ``ShipExtractDestabilizedError`` until it recovers.
+``SiphonCoordinator`` keeps one ``SiphonSwarm`` per gas giant and sends
+each siphoner to the site with the fewest ships. A site is avoided for
+``backoff`` seconds after it destabilizes, or after a waypoint response
+lists an ``UNSTABLE`` or ``CRITICAL_LIMIT`` modifier for it; its ships
+move to the other sites and its idle haulers follow them. Only ``check``
+can end the backoff early, as it fetches the waypoint past the
+``UniverseCache`` and so knows its modifiers are current::
+
+    coordinator = SiphonCoordinator.for_system(
+        actions, scheduler, universe, "X1-A1", values, unload=sell,
+    )
+    await coordinator.run(siphoners, haulers)
+"""
+
+import asyncio
+import time
+from collections.abc import Awaitable, Callable, Iterable, Mapping
+from typing import Any
+
+from aio_space_traders import model, utils
+from aio_space_traders.actions import ShipActions
+from aio_space_traders.cache import UniverseCache
+from aio_space_traders.mining import MiningSwarm
+from aio_space_traders.scheduler import EventScheduler
+
+# Modifiers that mean a site is being over-exploited
+HOT_MODIFIERS = {
+    model.WaypointModifierSymbol.UNSTABLE,
+    model.WaypointModifierSymbol.CRITICAL_LIMIT,
+}
+
+
+class SiphonSwarm(MiningSwarm):
+    """A ``MiningSwarm`` that siphons gas instead of extracting ore."""
+
+    async def _extract(self, ship_symbol: str) -> tuple[model.Cooldown, int]:
+        response = await self.actions.siphon(ship_symbol)
+        return response.data.cooldown, response.data.siphon.yield_.units
+
+
+class SiphonCoordinator:
+    def __init__(
+        self,
+        actions: ShipActions,
+        scheduler: EventScheduler,
+        sites: Iterable[str],
+        values: Mapping[str, float],
+        *,
+        min_value: float = 1.0,
+        unload: Callable[[str], Awaitable[None]] | None = None,
+        backoff: float = 900.0,
+    ) -> None:
+        self.api = actions.api
+        self.unload = unload
+        self.backoff = backoff
+        self.swarms: dict[str, SiphonSwarm] = {
+            site: SiphonSwarm(
+                actions,
+                scheduler,
+                site,
+                values,
+                min_value=min_value,
+                unload=self._unload if unload is not None else None,
+            )
+            for site in sites
+        }
+        self.assigned: dict[str, set[str]] = {site: set() for site in self.swarms}
+        # Monotonic time until which each site is left alone
+        self.hot_until: dict[str, float] = {}
+        # Monotonic time each site's backoff last started
+        self.cooled_at: dict[str, float] = {}
+        self._group: asyncio.TaskGroup | None = None
+
+    @classmethod
+    def for_system(
+        cls,
+        actions: ShipActions,
+        scheduler: EventScheduler,
+        universe: UniverseCache,
+        system_symbol: str,
+        values: Mapping[str, float],
+        **kwargs: Any,
+    ) -> "SiphonCoordinator":
+        """A coordinator for every gas giant in a cached system.
+
+        Sites the cache lists as unstable start out hot, even if they have
+        recovered since; ``check`` them to find out.
+        """
+        coordinator = cls(
+            actions,
+            scheduler,
+            [
+                waypoint.symbol.root
+                for waypoint in universe.waypoints_in_system(system_symbol)
+                if waypoint.type == model.WaypointType.GAS_GIANT
+            ],
+            values,
+            **kwargs,
+        )
+        for waypoint in universe.waypoints_in_system(system_symbol):
+            coordinator.observe_waypoint(waypoint)
+        return coordinator
+
+    def observe(self, method: str, url: str, response: Any) -> None:
+        data = getattr(response, "data", None)
+        for item in data if isinstance(data, list) else [data]:
+            if isinstance(item, model.Waypoint):
+                self.observe_waypoint(item)
+
+    def observe_waypoint(
+        self,
+        waypoint: model.Waypoint,
+        fetched_at: float | None = None,
+    ) -> None:
+        """Cools off a site listed as unstable.
+
+        A site listed as stable is only cleared if ``fetched_at``, the
+        monotonic time the waypoint was requested, is after its backoff
+        started; otherwise the listing may predate the destabilization.
+        """
+        site = waypoint.symbol.root
+        if site not in self.swarms or waypoint.modifiers is None:
+            return
+        if any(modifier.symbol in HOT_MODIFIERS for modifier in waypoint.modifiers):
+            self.cool_off(site)
+        elif fetched_at is not None and fetched_at >= self.cooled_at.get(site, 0.0):
+            self.hot_until.pop(site, None)
+
+    def cool_off(self, site: str) -> None:
+        now = time.monotonic()
+        self.cooled_at[site] = now
+        self.hot_until[site] = max(self.hot_until.get(site, 0.0), now + self.backoff)
+
+    async def check(self, site: str) -> bool:
+        """Fetches a site's modifiers, returning whether it's still hot."""
+        fetched_at = time.monotonic()
+        response = await self.api.get_waypoint(
+            utils.system_symbol(site),
+            site,
+            cached=False,
+        )
+        self.observe_waypoint(response.data, fetched_at)
+        return self.is_hot(site)
+
+    def is_hot(self, site: str) -> bool:
+        return self.hot_until.get(site, 0.0) > time.monotonic()
+
+    def allocate(self) -> str | None:
+        """The cool site with the fewest siphoners, None if every site is hot."""
+        cool = [site for site in self.swarms if not self.is_hot(site)]
+        if not cool:
+            return None
+        return min(cool, key=lambda site: (len(self.assigned[site]), site))
+
+    def hauler_site(self) -> str | None:
+        """The cool site with the most siphoners per hauler."""
+        cool = [site for site in self.swarms if self.assigned[site] and not self.is_hot(site)]
+        if not cool:
+            return None
+        return max(
+            cool,
+            key=lambda site: (
+                len(self.assigned[site]) / (len(self.swarms[site].haulers) + 1),
+                site,
+            ),
+        )
+
+    async def run(self, siphoners: Iterable[str], haulers: Iterable[str] = ()) -> None:
+        """Siphons until cancelled."""
+        if not self.swarms:
+            raise ValueError("There are no gas giants to siphon.")
+        self.api.add_response_hook(self.observe)
+        try:
+            async with asyncio.TaskGroup() as group:
+                self._group = group
+                for swarm in self.swarms.values():
+                    swarm.start(group)
+                for ship_symbol in siphoners:
+                    site = self.allocate()
+                    if site is not None:
+                        self.assigned[site].add(ship_symbol)
+                    group.create_task(self._siphon(ship_symbol, site))
+                for hauler in haulers:
+                    self._place(hauler)
+        finally:
+            self._group = None
+            self.api.remove_response_hook(self.observe)
+            for swarm in self.swarms.values():
+                swarm.stop()
+
+    async def _siphon(self, ship_symbol: str, site: str | None) -> None:
+        while True:
+            if site is None:
+                site = self.allocate()
+                if site is None:
+                    await asyncio.sleep(min(self.hot_until.values()) - time.monotonic())
+                    continue
+                self.assigned[site].add(ship_symbol)
+            try:
+                await self.swarms[site].work(ship_symbol)
+            finally:
+                self.assigned[site].discard(ship_symbol)
+            # `work` only returns once the site has destabilized
+            self.cool_off(site)
+            for hauler in self.swarms[site].release_idle_haulers():
+                self._place(hauler)
+            site = None
+
+    def _place(self, hauler: str) -> None:
+        site = self.hauler_site() or self.allocate() or next(iter(self.swarms))
+        # Counted right away so the next hauler placed sees it
+        self.swarms[site].haulers.add(hauler)
+        if self._group is not None:
+            self._group.create_task(self.swarms[site].join(hauler))
+
+    async def _unload(self, hauler: str) -> None:
+        if self.unload is not None:
+            await self.unload(hauler)
+        # Send the empty hauler to wherever it is needed most
+        current = next(
+            (site for site, swarm in self.swarms.items() if hauler in swarm.haulers),
+            None,
+        )
+        if current is None:
+            # Released from the swarms while it was away
+            return
+        site = self.hauler_site()
+        if site is not None and site != current:
+            self.swarms[current].haulers.discard(hauler)
+            await self.swarms[site].join(hauler)
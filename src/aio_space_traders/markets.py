@@ -0,0 +1,145 @@
+"""Spend market requests where prices are most likely to have moved.
+
+``get_market`` only reports prices while one of our ships is at the market,
+so prices can only be refreshed during visits. ``MarketWatch`` follows
+where every ship is and, whenever ``sample`` is called, fetches the markets
+with a ship present in order of priority::
+
+    markets = MarketCache()
+    api.add_response_hook(markets.observe)
+    watch = MarketWatch(api, markets, budget=10, window=60)
+    ...
+    await watch.sample()  # e.g. after every arrival
+
+A market's priority is the age of its prices times its volatility, the
+mean of ``1 / trade_volume`` over its goods: the api notes that thin
+markets swing the most. Markets we have never priced go first, and no
+more than ``budget`` requests are made in any ``window`` seconds.
+"""
+
+import asyncio
+import math
+import time
+from collections import deque
+from collections.abc import Iterable
+from datetime import UTC, datetime
+from typing import Any
+
+from niquests.exceptions import ConnectionError as RequestsConnectionError
+
+from aio_space_traders import model, utils
+from aio_space_traders.api import SpaceTradersApi
+from aio_space_traders.cache import MarketCache
+from aio_space_traders.errors import SpaceTradersAPIError
+
+
+class MarketWatch:
+    def __init__(
+        self,
+        api: SpaceTradersApi,
+        markets: MarketCache,
+        *,
+        budget: int = 10,
+        window: float = 60.0,
+        min_age: float = 30.0,
+        waypoints: Iterable[str] = (),
+    ) -> None:
+        self.api = api
+        self.markets = markets
+        self.budget = budget
+        self.window = window
+        # Prices younger than this aren't refetched, however volatile
+        self.min_age = min_age
+        # Known marketplaces, besides those already in the cache
+        self.waypoints: set[str] = set(waypoints)
+        self.navs: dict[str, model.ShipNav] = {}
+        self._spent: deque[float] = deque()
+        api.add_response_hook(self.observe)
+
+    def observe(self, method: str, url: str, response: Any) -> None:
+        for ship_symbol, component in utils.iter_ship_state(url, response):
+            if isinstance(component, model.ShipNav):
+                self.navs[ship_symbol] = component
+
+    def watch(self, waypoint_symbol: str) -> None:
+        self.waypoints.add(waypoint_symbol)
+
+    def present(self, now: datetime | None = None) -> dict[str, list[str]]:
+        """The ships at each watched market, keyed by waypoint symbol."""
+        now = now or datetime.now(UTC)
+        present: dict[str, list[str]] = {}
+        for ship_symbol, nav in self.navs.items():
+            if nav.status == model.ShipNavStatus.IN_TRANSIT and nav.route.arrival > now:
+                continue
+            waypoint_symbol = nav.waypoint_symbol.root
+            if waypoint_symbol in self.markets or waypoint_symbol in self.waypoints:
+                present.setdefault(waypoint_symbol, []).append(ship_symbol)
+        return present
+
+    def volatility(self, waypoint_symbol: str) -> float:
+        market = self.markets.markets.get(waypoint_symbol)
+        if market is None or not market.trade_goods:
+            return math.inf
+        return sum(1 / good.trade_volume for good in market.trade_goods) / len(
+            market.trade_goods,
+        )
+
+    def priority(self, waypoint_symbol: str, now: datetime | None = None) -> float:
+        age = self.markets.age(waypoint_symbol, now)
+        if age is None:
+            return math.inf
+        return age * self.volatility(waypoint_symbol)
+
+    def due(self, now: datetime | None = None) -> list[str]:
+        """Markets with a ship present and old enough prices, highest priority first."""
+        now = now or datetime.now(UTC)
+        due = []
+        for waypoint_symbol in self.present(now):
+            age = self.markets.age(waypoint_symbol, now)
+            if age is None or age >= self.min_age:
+                due.append(waypoint_symbol)
+        return sorted(due, key=lambda symbol: self.priority(symbol, now), reverse=True)
+
+    def available(self) -> int:
+        """Requests left in the current window."""
+        now = time.monotonic()
+        while self._spent and now - self._spent[0] >= self.window:
+            self._spent.popleft()
+        return max(0, self.budget - len(self._spent))
+
+    async def sample(self, limit: int | None = None) -> list[str]:
+        """Fetches the most valuable due markets the budget allows.
+
+        Returns the waypoint symbols of the markets that were fetched.
+        Markets the api refuses, for example because the ship has left, are
+        skipped. Any other failure is raised in an ``ExceptionGroup`` once
+        every request has finished; requests that never connected are given
+        back to the budget first.
+        """
+        count = self.available()
+        if limit is not None:
+            count = min(count, limit)
+        chosen = self.due()[:count]
+        # Charged up front so concurrent calls can't overspend
+        now = time.monotonic()
+        self._spent.extend(now for _ in chosen)
+        results = await asyncio.gather(
+            *(
+                self.api.get_market(utils.system_symbol(symbol), symbol)
+                for symbol in chosen
+            ),
+            return_exceptions=True,
+        )
+        fetched = []
+        errors = []
+        for symbol, result in zip(chosen, results, strict=True):
+            if not isinstance(result, BaseException):
+                fetched.append(symbol)
+            elif not isinstance(result, SpaceTradersAPIError):
+                # Anything else may have failed after the server counted it
+                if isinstance(result, RequestsConnectionError):
+                    self._spent.remove(now)
+                errors.append(result)
+        if errors:
+            raise ExceptionGroup(f"{len(errors)} market samples failed", errors)
+        return fetched
@@ -0,0 +1,313 @@
+"""Keep a mining fleet extracting every time a cooldown ends.
+
+``MiningSwarm`` runs one loop per miner at a single waypoint. A miner
+extracts as soon as its cooldown expires. Once its hold can't take
+another full yield, it uses the cooldown to jettison whatever is worth
+less than ``min_value`` and transfer the rest to a hauler waiting in
+orbit, so cargo is handled in a few large batches rather than after
+every extraction. Nothing is ever extracted into a full hold, so no
+request is wasted on ``ShipCargoFullError``::
+
+    swarm = MiningSwarm(actions, scheduler, "X1-A1-B7", values, unload=sell)
+    await swarm.run(miners, haulers)
+
+Full haulers are handed to ``unload``, which should sell their cargo;
+they fly back and rejoin the swarm once it returns. Haulers listed in
+``keepers``, like refineries, work their cargo where they are instead:
+they are parked when full and go back to waiting once ``offer`` finds
+room in their hold again. A swarm without haulers hands full miners to
+``unload`` themselves, or jettisons their cheapest cargo if there is no
+``unload``.
+"""
+
+import asyncio
+from collections.abc import Awaitable, Callable, Iterable, Mapping
+from dataclasses import dataclass
+from typing import Any
+
+from aio_space_traders import model, utils
+from aio_space_traders.actions import ShipActions
+from aio_space_traders.errors import (
+    CooldownConflictError,
+    ShipCargoFullError,
+    ShipExtractDestabilizedError,
+)
+from aio_space_traders.scheduler import EventScheduler
+from aio_space_traders.surveys import SurveyPool
+
+
+@dataclass
+class MiningStats:
+    extractions: int = 0
+    extracted: int = 0
+    jettisoned: int = 0
+    transferred: int = 0
+    # Seconds miners spent with a full hold waiting for a hauler
+    hauler_wait: float = 0.0
+
+
+class MiningSwarm:
+    def __init__(
+        self,
+        actions: ShipActions,
+        scheduler: EventScheduler,
+        waypoint_symbol: str,
+        values: Mapping[str, float],
+        *,
+        min_value: float = 1.0,
+        surveys: SurveyPool | None = None,
+        unload: Callable[[str], Awaitable[None]] | None = None,
+    ) -> None:
+        self.actions = actions
+        self.api = actions.api
+        self.scheduler = scheduler
+        self.waypoint_symbol = waypoint_symbol
+        # Credits a unit of each good is worth; goods not listed are worthless
+        self.values: dict[str, float] = dict(values)
+        self.min_value = min_value
+        self.surveys = surveys
+        self.unload = unload
+        self.stats = MiningStats()
+        self.cargo: dict[str, model.ShipCargo] = {}
+        # The biggest yield seen from each miner, the room it needs to extract
+        self.max_yield: dict[str, int] = {}
+        self.haulers: set[str] = set()
+        # Haulers that are parked rather than unloaded when full
+        self.keepers: set[str] = set()
+        # Full keepers waiting for room in their hold
+        self.parked: set[str] = set()
+        self._waiting: asyncio.Queue[str] = asyncio.Queue()
+        self._group: asyncio.TaskGroup | None = None
+        self._callbacks: list[Callable[[str, model.ShipCargo], None]] = []
+        self._observing = False
+
+    def observe(self, method: str, url: str, response: Any) -> None:
+        for ship_symbol, component in utils.iter_ship_state(url, response):
+            if isinstance(component, model.ShipCargo):
+                self.cargo[ship_symbol] = component
+
+    def subscribe(self, callback: Callable[[str, model.ShipCargo], None]) -> None:
+        """Registers a callable to run with a hauler's hold after every transfer into it."""
+        self._callbacks.append(callback)
+
+    def free(self, ship_symbol: str) -> int:
+        cargo = self.cargo[ship_symbol]
+        return cargo.capacity - cargo.units
+
+    def can_take(self, hauler: str) -> bool:
+        """Whether the hauler has room for any miner's next load."""
+        return self.free(hauler) >= max(self.max_yield.values(), default=1)
+
+    def worth_keeping(self, trade_symbol: str) -> bool:
+        return self.values.get(trade_symbol, 0.0) >= self.min_value
+
+    def start(
+        self,
+        group: asyncio.TaskGroup,
+        miners: Iterable[str] = (),
+        haulers: Iterable[str] = (),
+    ) -> None:
+        """Starts miners and haulers as tasks in ``group``.
+
+        Hauler round trips are started in the same group, so a swarm can
+        share a group with other work. Call ``stop`` once the group is done.
+        """
+        self._group = group
+        if not self._observing:
+            self.api.add_response_hook(self.observe)
+            self._observing = True
+        for hauler in haulers:
+            group.create_task(self.join(hauler))
+        for miner in miners:
+            group.create_task(self.work(miner))
+
+    async def run(self, miners: Iterable[str], haulers: Iterable[str] = ()) -> None:
+        """Mines until cancelled."""
+        try:
+            async with asyncio.TaskGroup() as group:
+                self.start(group, miners, haulers)
+        finally:
+            self.stop()
+
+    def stop(self) -> None:
+        """Stops following API responses after the swarm's tasks have ended."""
+        self._group = None
+        if self._observing:
+            self.api.remove_response_hook(self.observe)
+            self._observing = False
+
+    async def _arrive(self, ship_symbol: str) -> None:
+        nav = self.actions.navs.get(ship_symbol)
+        if nav is None:
+            nav = (await self.api.get_ship_nav(ship_symbol)).data
+        if nav.waypoint_symbol.root != self.waypoint_symbol:
+            await self.actions.navigate(ship_symbol, self.waypoint_symbol)
+        await self.actions.wait_for_arrival(ship_symbol)
+        await self.actions.ensure_in_orbit(ship_symbol)
+        if ship_symbol not in self.cargo:
+            await self.api.get_ship_cargo(ship_symbol)
+
+    async def join(self, hauler: str) -> None:
+        """Brings a hauler to the waypoint and lets miners fill it."""
+        self.haulers.add(hauler)
+        await self._arrive(hauler)
+        self._waiting.put_nowait(hauler)
+
+    async def offer(self, hauler: str) -> None:
+        """Lets miners fill a parked keeper again if its hold has room."""
+        if hauler in self.parked and hauler in self.haulers and self.can_take(hauler):
+            self.parked.discard(hauler)
+            await self.join(hauler)
+
+    def release_idle_haulers(self) -> list[str]:
+        """Takes every hauler that is waiting for cargo out of the swarm."""
+        released = []
+        while not self._waiting.empty():
+            hauler = self._waiting.get_nowait()
+            self.haulers.discard(hauler)
+            released.append(hauler)
+        return released
+
+    async def work(self, ship_symbol: str) -> None:
+        """Mines with one ship until cancelled.
+
+        Returns when the waypoint is destabilized by over-extraction, so
+        the caller can move the ship somewhere else.
+        """
+        await self._arrive(ship_symbol)
+        while True:
+            await self._make_room(ship_symbol)
+            await self.scheduler.wait_ready(ship_symbol)
+            try:
+                cooldown, units = await self._extract(ship_symbol)
+            except CooldownConflictError as error:
+                # Another caller used the ship; wait out the cooldown it reports
+                if "cooldown" not in error.data:
+                    raise
+                self.scheduler.schedule_cooldown(
+                    model.Cooldown.model_validate(error.data["cooldown"]),
+                )
+                continue
+            except ShipCargoFullError:
+                await self.api.get_ship_cargo(ship_symbol)
+                continue
+            except ShipExtractDestabilizedError:
+                return
+            self.scheduler.schedule_cooldown(cooldown)
+            self.max_yield[ship_symbol] = max(self.max_yield.get(ship_symbol, 0), units)
+            self.stats.extractions += 1
+            self.stats.extracted += units
+
+    async def _extract(self, ship_symbol: str) -> tuple[model.Cooldown, int]:
+        """Runs one extraction, returning the cooldown and the units yielded."""
+        if self.surveys is None:
+            response = await self.actions.extract(ship_symbol)
+        else:
+            targets = [symbol for symbol in self.values if self.worth_keeping(symbol)]
+            response = await self.surveys.extract(
+                self.actions,
+                ship_symbol,
+                self.waypoint_symbol,
+                targets,
+            )
+        return response.data.cooldown, response.data.extraction.yield_.units
+
+    async def _jettison(self, ship_symbol: str) -> None:
+        for item in list(self.cargo[ship_symbol].inventory):
+            if item is None or self.worth_keeping(item.symbol):
+                continue
+            await self.api.jettison_cargo(
+                ship_symbol,
+                model.JettisonCargoObject(symbol=item.symbol, units=item.units),
+            )
+            self.stats.jettisoned += item.units
+
+    async def _make_room(self, ship_symbol: str) -> None:
+        """Empties the hold once it can't take another yield."""
+        needed = self.max_yield.get(ship_symbol, 1)
+        if self.free(ship_symbol) < needed:
+            await self._jettison(ship_symbol)
+        while self.free(ship_symbol) < needed and self.cargo[ship_symbol].units:
+            if not self.haulers:
+                await self._shed(ship_symbol, needed)
+                return
+            loop = asyncio.get_running_loop()
+            waited = loop.time()
+            hauler = await self._waiting.get()
+            self.stats.hauler_wait += loop.time() - waited
+            try:
+                await self._transfer(ship_symbol, hauler)
+            finally:
+                self._release(hauler)
+
+    async def _shed(self, ship_symbol: str, needed: int) -> None:
+        """Makes room in a miner's hold without a hauler."""
+        if self.unload is not None:
+            await self.unload(ship_symbol)
+            await self._arrive(ship_symbol)
+            return
+        inventory = [item for item in self.cargo[ship_symbol].inventory if item]
+        inventory.sort(key=lambda item: self.values.get(item.symbol, 0.0))
+        for item in inventory:
+            if self.free(ship_symbol) >= needed:
+                break
+            await self.api.jettison_cargo(
+                ship_symbol,
+                model.JettisonCargoObject(symbol=item.symbol, units=item.units),
+            )
+            self.stats.jettisoned += item.units
+
+    async def _transfer(self, ship_symbol: str, hauler: str) -> None:
+        inventory = [item for item in self.cargo[ship_symbol].inventory if item]
+        inventory.sort(key=lambda item: self.values.get(item.symbol, 0.0), reverse=True)
+        for item in inventory:
+            units = min(item.units, self.free(hauler))
+            if units <= 0:
+                break
+            try:
+                await self.api.transfer_cargo(
+                    ship_symbol,
+                    model.TransferCargoObject(
+                        trade_symbol=item.symbol,
+                        units=units,
+                        ship_symbol=hauler,
+                    ),
+                )
+            except ShipCargoFullError:
+                # The hauler was loaded elsewhere since we last saw its hold
+                await self.api.get_ship_cargo(hauler)
+                break
+            self.cargo[hauler] = _stow(self.cargo[hauler], item, units)
+            self.stats.transferred += units
+            for callback in self._callbacks:
+                callback(hauler, self.cargo[hauler])
+
+    def _release(self, hauler: str) -> None:
+        # A hauler that can't take a miner's next load goes to unload
+        if self.can_take(hauler):
+            self._waiting.put_nowait(hauler)
+        elif hauler in self.keepers:
+            self.parked.add(hauler)
+        elif self.unload is None or self._group is None:
+            self.haulers.discard(hauler)
+        else:
+            self._group.create_task(self._cycle(hauler))
+
+    async def _cycle(self, hauler: str) -> None:
+        if self.unload is not None:
+            await self.unload(hauler)
+        # ``unload`` may have moved the hauler to another swarm
+        if hauler in self.haulers:
+            await self.join(hauler)
+
+
+def _stow(cargo: model.ShipCargo, item: model.ShipCargoItem, units: int) -> model.ShipCargo:
+    """``cargo`` with ``units`` more of ``item``, as the receiving ship sees it."""
+    inventory = [stored for stored in cargo.inventory if stored]
+    for index, stored in enumerate(inventory):
+        if stored.symbol == item.symbol:
+            inventory[index] = stored.model_copy(update={"units": stored.units + units})
+            break
+    else:
+        inventory.append(item.model_copy(update={"units": units}))
+    return cargo.model_copy(update={"units": cargo.units + units, "inventory": inventory})
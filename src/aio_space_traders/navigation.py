@@ -0,0 +1,55 @@
+"""Travel time and fuel estimates for in-system navigation.
+
+These mirror the formulas the server uses, so plans can be costed from
+cached waypoint coordinates without asking the api.
+"""
+
+import math
+from typing import Protocol
+
+from aio_space_traders import model
+
+SPEED_MULTIPLIER: dict[model.ShipNavFlightMode, float] = {
+    model.ShipNavFlightMode.CRUISE: 25,
+    model.ShipNavFlightMode.DRIFT: 250,
+    model.ShipNavFlightMode.BURN: 12.5,
+    model.ShipNavFlightMode.STEALTH: 30,
+}
+
+# One unit of FUEL bought at a market fills 100 units of a ship's tank
+FUEL_PER_MARKET_UNIT = 100
+
+
+class Point(Protocol):
+    @property
+    def x(self) -> int: ...
+
+    @property
+    def y(self) -> int: ...
+
+
+def distance(origin: Point, destination: Point) -> float:
+    return math.hypot(destination.x - origin.x, destination.y - origin.y)
+
+
+def travel_time(
+    distance: float,
+    speed: int,
+    flight_mode: model.ShipNavFlightMode = model.ShipNavFlightMode.CRUISE,
+) -> int:
+    """Seconds a ship with engine ``speed`` takes to cover ``distance``."""
+    multiplier = SPEED_MULTIPLIER[flight_mode]
+    return round(round(max(1, distance)) * (multiplier / speed) + 15)
+
+
+def fuel_cost(
+    distance: float,
+    flight_mode: model.ShipNavFlightMode = model.ShipNavFlightMode.CRUISE,
+) -> int:
+    """Units of ship fuel burned covering ``distance``."""
+    if flight_mode == model.ShipNavFlightMode.DRIFT:
+        return 1
+    fuel = max(1, round(distance))
+    if flight_mode == model.ShipNavFlightMode.BURN:
+        return 2 * fuel
+    return fuel
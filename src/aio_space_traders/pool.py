@@ -0,0 +1,171 @@
+import asyncio
+from collections import deque
+from collections.abc import Callable
+from concurrent.futures import Executor
+from types import TracebackType
+
+from aio_space_traders import utils
+from aio_space_traders.api import DEFAULT_BASE_URL, SpaceTradersApi
+from aio_space_traders.cache import UniverseCache
+from aio_space_traders.diagnostics import Diagnostics
+from aio_space_traders.tracing import Tracer
+from aio_space_traders.transport import HttpTransport, TransportConfig
+
+
+class FairSemaphore:
+    """Limits requests in flight, handing out free slots round-robin by key.
+
+    A key that queues a hundred requests gets one slot, then every other
+    waiting key gets one, and so on; it can't starve keys that only need a
+    request now and then.
+    """
+
+    def __init__(self, limit: int) -> None:
+        self.limit = limit
+        self.active = 0
+        self._waiters: dict[str, deque[asyncio.Future[None]]] = {}
+        self._turns: deque[str] = deque()
+
+    def waiting(self, key: str | None = None) -> int:
+        if key is not None:
+            return sum(not f.done() for f in self._waiters.get(key, ()))
+        return sum(self.waiting(key) for key in self._waiters)
+
+    async def acquire(self, key: str) -> None:
+        if self.active < self.limit and not self._turns:
+            self.active += 1
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        waiters = self._waiters.setdefault(key, deque())
+        if not waiters:
+            self._turns.append(key)
+        waiters.append(future)
+        try:
+            await future
+        except asyncio.CancelledError:
+            # The slot may have been handed over just before the cancellation
+            if future.done() and not future.cancelled():
+                self.release()
+            raise
+
+    def release(self) -> None:
+        while self._turns:
+            key = self._turns.popleft()
+            waiters = self._waiters[key]
+            future = waiters.popleft()
+            if waiters:
+                self._turns.append(key)
+            else:
+                del self._waiters[key]
+            if not future.done():
+                # The slot passes straight to the waiter, `active` is unchanged
+                future.set_result(None)
+                return
+        self.active -= 1
+
+    def lane(self, key: str) -> "FairLane":
+        return FairLane(self, key)
+
+
+class FairLane:
+    """Async context manager holding one ``FairSemaphore`` slot for a key."""
+
+    def __init__(self, semaphore: FairSemaphore, key: str) -> None:
+        self.semaphore = semaphore
+        self.key = key
+
+    async def __aenter__(self) -> None:
+        await self.semaphore.acquire(self.key)
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.semaphore.release()
+
+
+class AgentPool:
+    """Many agents on one event loop, sharing connections and static data.
+
+    Every agent gets its own ``SpaceTradersApi`` with its own token and rate
+    limit bucket, but they all send requests through one session and fill
+    one ``UniverseCache``. Requests in flight are capped at
+    ``max_in_flight`` across the pool and free slots go round-robin between
+    agents::
+
+        async with AgentPool(transport=TransportConfig(multiplexed=True)) as pool:
+            for symbol, token in tokens.items():
+                pool.add(symbol, token)
+            await asyncio.gather(*(pool[s].get_agent() for s in tokens))
+    """
+
+    def __init__(
+        self,
+        *,
+        base_url: str = DEFAULT_BASE_URL,
+        transport: TransportConfig | None = None,
+        session: utils.HttpSession | None = None,
+        cache: UniverseCache | None = None,
+        max_in_flight: int = 10,
+        rate_limiter_factory: Callable[[], utils.RateLimiter] = utils.AsyncRateLimit,
+        executor: Executor | None = None,
+        diagnostics: Diagnostics | None = None,
+        tracer: Tracer | None = None,
+    ) -> None:
+        self._owns_session = session is None
+        self.session: utils.HttpSession = session or HttpTransport(base_url, transport)
+        self.cache = cache or UniverseCache()
+        self.slots = FairSemaphore(max_in_flight)
+        self.rate_limiter_factory = rate_limiter_factory
+        self.executor = executor
+        self.diagnostics = diagnostics
+        self.tracer = tracer
+        self.agents: dict[str, SpaceTradersApi] = {}
+
+    def __getitem__(self, agent_symbol: str) -> SpaceTradersApi:
+        return self.agents[agent_symbol]
+
+    def __contains__(self, agent_symbol: str) -> bool:
+        return agent_symbol in self.agents
+
+    def __len__(self) -> int:
+        return len(self.agents)
+
+    def add(self, agent_symbol: str, token: str) -> SpaceTradersApi:
+        if agent_symbol in self.agents:
+            self.agents[agent_symbol].update_token(token)
+            return self.agents[agent_symbol]
+        api = SpaceTradersApi(
+            token,
+            session=self.session,
+            rate_limiter=self.rate_limiter_factory(),
+            cache=self.cache,
+            request_slot=self.slots.lane(agent_symbol),
+            executor=self.executor,
+            diagnostics=self.diagnostics,
+            tracer=self.tracer,
+        )
+        self.agents[agent_symbol] = api
+        return api
+
+    def remove(self, agent_symbol: str) -> None:
+        del self.agents[agent_symbol]
+
+    async def close(self) -> None:
+        self.agents.clear()
+        if self._owns_session:
+            await self.session.close()
+
+    async def __aenter__(self) -> "AgentPool":
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        await self.close()
@@ -0,0 +1,244 @@
+"""Keep refinery ships refining whatever pays best.
+
+``RefineryPlanner`` runs one loop per refinery ship. Whenever a
+refinery's cooldown has expired it runs the most profitable refine its
+hold has the input for, valued at the best sell prices in a
+``MarketCache``. With nothing worth refining it waits until more input
+arrives.
+
+Refineries are fed by letting them join a ``MiningSwarm`` as haulers;
+``feed_from`` hears about every transfer into them and raises the value
+of ores that are worth more refined, so miners keep them instead of
+jettisoning them. The swarm parks a full refinery rather than unloading
+it, and the planner offers it back after every refine. Once a parked
+refinery has nothing left to refine it is handed to ``sell`` to make
+room::
+
+    planner = RefineryPlanner(actions, scheduler, markets, sell=sell)
+    planner.feed_from(swarm)
+    async with asyncio.TaskGroup() as group:
+        swarm.start(group, miners, refineries)
+        group.create_task(planner.run(refineries))
+"""
+
+import asyncio
+from collections.abc import Awaitable, Callable, Collection, Iterable, Mapping
+from dataclasses import dataclass
+from typing import Any
+
+from aio_space_traders import model, utils
+from aio_space_traders.actions import ShipActions
+from aio_space_traders.cache import MarketCache
+from aio_space_traders.errors import (
+    CooldownConflictError,
+    ShipInvalidRefineryGoodError,
+    ShipMissingRefineryError,
+)
+from aio_space_traders.mining import MiningSwarm
+from aio_space_traders.scheduler import EventScheduler
+
+
+@dataclass(frozen=True)
+class Recipe:
+    produce: str
+    input: str
+    input_units: int
+    output_units: int
+
+
+def _recipe(produce: str, raw: str) -> Recipe:
+    return Recipe(produce, raw, input_units=30, output_units=10)
+
+
+# What one refine consumes and produces
+RECIPES: dict[str, Recipe] = {
+    recipe.produce: recipe
+    for recipe in [
+        _recipe("IRON", "IRON_ORE"),
+        _recipe("COPPER", "COPPER_ORE"),
+        _recipe("SILVER", "SILVER_ORE"),
+        _recipe("GOLD", "GOLD_ORE"),
+        _recipe("ALUMINUM", "ALUMINUM_ORE"),
+        _recipe("PLATINUM", "PLATINUM_ORE"),
+        _recipe("URANITE", "URANITE_ORE"),
+        _recipe("MERITIUM", "MERITIUM_ORE"),
+        _recipe("FUEL", "HYDROCARBON"),
+    ]
+}
+
+
+@dataclass
+class RefiningStats:
+    refines: int = 0
+    produced: int = 0
+    # Seconds refineries were ready but had nothing worth refining
+    idle: float = 0.0
+
+
+class RefineryPlanner:
+    def __init__(
+        self,
+        actions: ShipActions,
+        scheduler: EventScheduler,
+        markets: MarketCache,
+        recipes: Mapping[str, Recipe] = RECIPES,
+        *,
+        poll_interval: float = 60.0,
+        sell: Callable[[str], Awaitable[None]] | None = None,
+    ) -> None:
+        self.actions = actions
+        self.api = actions.api
+        self.scheduler = scheduler
+        self.markets = markets
+        self.recipes = dict(recipes)
+        # How long an idle refinery waits before rereading its hold
+        self.poll_interval = poll_interval
+        self.sell = sell
+        self.stats = RefiningStats()
+        self.cargo: dict[str, model.ShipCargo] = {}
+        # The produce options each refinery's modules support
+        self.produces: dict[str, set[str]] = {}
+        self._fed: dict[str, asyncio.Event] = {}
+        self._swarms: list[MiningSwarm] = []
+
+    def observe(self, method: str, url: str, response: Any) -> None:
+        for ship_symbol, component in utils.iter_ship_state(url, response):
+            if isinstance(component, model.ShipCargo):
+                self.stowed(ship_symbol, component)
+
+    def stowed(self, ship_symbol: str, cargo: model.ShipCargo) -> None:
+        """Records a refinery's hold, waking it if it was waiting for input."""
+        if ship_symbol in self.produces:
+            self.cargo[ship_symbol] = cargo
+            self._fed[ship_symbol].set()
+
+    def feed_from(self, swarm: MiningSwarm) -> None:
+        """Follows the swarm's transfers and teaches it what ores are worth refined."""
+        swarm.subscribe(self.stowed)
+        swarm.keepers.update(self.produces)
+        self._swarms.append(swarm)
+        for symbol, value in self.input_values().items():
+            swarm.values[symbol] = max(swarm.values.get(symbol, 0.0), value)
+
+    def add_refinery(self, ship_symbol: str, produces: Collection[str] | None = None) -> None:
+        self.produces[ship_symbol] = set(self.recipes if produces is None else produces)
+        self._fed.setdefault(ship_symbol, asyncio.Event())
+        for swarm in self._swarms:
+            swarm.keepers.add(ship_symbol)
+
+    def value(self, trade_symbol: str) -> float:
+        """What a unit sells for at the best known market."""
+        sale = self.markets.best_sale(trade_symbol)
+        return 0.0 if sale is None else sale[1].sell_price
+
+    def margin(self, recipe: Recipe) -> float:
+        """Credits one refine adds over selling its input as it is."""
+        return recipe.output_units * self.value(recipe.produce) - (
+            recipe.input_units * self.value(recipe.input)
+        )
+
+    def input_values(self) -> dict[str, float]:
+        """What a unit of each input is worth once refined, for inputs that gain."""
+        values: dict[str, float] = {}
+        for recipe in self.recipes.values():
+            if self.margin(recipe) > 0:
+                value = recipe.output_units * self.value(recipe.produce) / recipe.input_units
+                values[recipe.input] = max(values.get(recipe.input, 0.0), value)
+        return values
+
+    def choose(self, ship_symbol: str) -> Recipe | None:
+        """The most profitable refine the ship's hold has enough input for."""
+        cargo = self.cargo.get(ship_symbol)
+        if cargo is None:
+            return None
+        held = {item.symbol: item.units for item in cargo.inventory if item}
+        candidates = [
+            recipe
+            for produce in self.produces.get(ship_symbol, ())
+            if (recipe := self.recipes.get(produce)) is not None
+            and held.get(recipe.input, 0) >= recipe.input_units
+            and self.margin(recipe) > 0
+        ]
+        return max(candidates, key=self.margin, default=None)
+
+    async def run(self, refineries: Iterable[str]) -> None:
+        """Refines until cancelled, following refinery holds in api responses."""
+        refineries = list(refineries)
+        # Swarms must know these are refineries before they fill one
+        for ship_symbol in refineries:
+            if ship_symbol not in self.produces:
+                self.add_refinery(ship_symbol)
+        self.api.add_response_hook(self.observe)
+        try:
+            async with asyncio.TaskGroup() as group:
+                for ship_symbol in refineries:
+                    group.create_task(self.work(ship_symbol))
+        finally:
+            self.api.remove_response_hook(self.observe)
+
+    async def work(self, ship_symbol: str) -> None:
+        """Refines with one ship until cancelled, or until it turns out to have no refinery.
+
+        Holds are only followed in api responses while ``run`` is running.
+        """
+        if ship_symbol not in self.produces:
+            self.add_refinery(ship_symbol)
+        if ship_symbol not in self.cargo:
+            await self.api.get_ship_cargo(ship_symbol)
+        loop = asyncio.get_running_loop()
+        while self.produces[ship_symbol]:
+            await self.scheduler.wait_ready(ship_symbol)
+            # Cleared before anything that can feed the ship, so no input is missed
+            self._fed[ship_symbol].clear()
+            recipe = self.choose(ship_symbol)
+            if recipe is None:
+                await self._hand_back(ship_symbol)
+                await self._wait_for_input(ship_symbol, loop)
+                continue
+            try:
+                response = await self.api.ship_refine(ship_symbol, recipe.produce)
+            except CooldownConflictError as error:
+                if "cooldown" not in error.data:
+                    raise
+                self.scheduler.schedule_cooldown(
+                    model.Cooldown.model_validate(error.data["cooldown"]),
+                )
+                continue
+            except ShipInvalidRefineryGoodError:
+                self.produces[ship_symbol].discard(recipe.produce)
+                continue
+            except ShipMissingRefineryError:
+                self.produces[ship_symbol].clear()
+                continue
+            self.scheduler.schedule_cooldown(response.data.cooldown)
+            self.stats.refines += 1
+            self.stats.produced += sum(good.units for good in response.data.produced)
+            await self._hand_back(ship_symbol)
+
+    async def _hand_back(self, ship_symbol: str) -> None:
+        """Offers a refinery back to the swarms feeding it, selling if it's still full."""
+        for swarm in self._swarms:
+            if ship_symbol not in swarm.parked:
+                continue
+            if (
+                self.sell is not None
+                and not swarm.can_take(ship_symbol)
+                and self.choose(ship_symbol) is None
+            ):
+                await self.sell(ship_symbol)
+            await swarm.offer(ship_symbol)
+
+    async def _wait_for_input(
+        self,
+        ship_symbol: str,
+        loop: asyncio.AbstractEventLoop,
+    ) -> None:
+        fed = self._fed[ship_symbol]
+        started = loop.time()
+        try:
+            async with asyncio.timeout(self.poll_interval):
+                await fed.wait()
+        except TimeoutError:
+            # Cargo may have arrived in ways we didn't see
+            await self.api.get_ship_cargo(ship_symbol)
+        self.stats.idle += loop.time() - started
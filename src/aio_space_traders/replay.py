@@ -0,0 +1,181 @@
+"""Record api traffic to a file and replay it without the network.
+
+A recording is an append-only JSON lines file, gzip compressed when the
+path ends in ``.gz``. Each line holds one exchange::
+
+    {"t": 1718000000.12, "d": 0.21, "m": "GET", "u": "/my/ships/X-1",
+     "p": null, "b": null, "s": 200, "r": "{\\"data\\": ...}"}
+
+``t`` is the wall clock time the request was sent and ``d`` how long the
+response took. Record live traffic by wrapping the real session::
+
+    api = SpaceTradersApi(token)
+    api.session = RecordingSession(api.session, "traffic.jsonl.gz")
+
+and replay it with ``replay_api("traffic.jsonl.gz")``.
+"""
+
+import asyncio
+import gzip
+import json
+import time
+from collections import deque
+from collections.abc import Iterator
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import IO, Any
+
+from niquests.exceptions import HTTPError
+
+from aio_space_traders import utils
+from aio_space_traders.api import SpaceTradersApi
+
+
+class ReplayMissError(LookupError):
+    """Raised when a replayed request has no recorded response left."""
+
+
+def _open(path: Path, mode: str) -> IO[str]:
+    if path.suffix == ".gz":
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return path.open(mode, encoding="utf-8")
+
+
+def _key(method: str, url: str, params: Any) -> tuple[str, str, str]:
+    return method.upper(), url, json.dumps(params, sort_keys=True, default=str)
+
+
+def read_records(path: str | Path) -> Iterator[dict[str, Any]]:
+    with _open(Path(path), "r") as file:
+        for line in file:
+            if line.strip():
+                yield json.loads(line)
+
+
+class RecordingSession:
+    """Wraps a session and appends every exchange to a recording."""
+
+    def __init__(self, session: utils.HttpSession, path: str | Path) -> None:
+        self.session = session
+        self.path = Path(path)
+        self._file = _open(self.path, "a")
+
+    @property
+    def headers(self) -> Any:
+        return self.session.headers
+
+    async def request(self, method: str, url: str, **kwargs: Any) -> Any:
+        # The whole body is needed for the recording, so it's never streamed
+        kwargs.pop("stream", None)
+        sent = time.time()
+        start = time.perf_counter()
+        response = await self.session.request(method, url, **kwargs)
+        elapsed = time.perf_counter() - start
+
+        record = {
+            "t": round(sent, 3),
+            "d": round(elapsed, 4),
+            "m": method,
+            "u": url,
+            "p": kwargs.get("params"),
+            "b": kwargs.get("json"),
+            "s": response.status_code,
+            "r": response.text,
+        }
+        self._file.write(json.dumps(record, separators=(",", ":"), default=str))
+        self._file.write("\n")
+        self._file.flush()
+        return response
+
+    async def close(self) -> None:
+        self._file.close()
+        await self.session.close()
+
+
+class ReplayResponse:
+    def __init__(self, status_code: int, text: str | None) -> None:
+        self.status_code = status_code
+        self.text = text or ""
+
+    @property
+    def ok(self) -> bool:
+        return self.status_code < 400
+
+    @property
+    def content(self) -> bytes:
+        return self.text.encode()
+
+    def json(self) -> Any:
+        return json.loads(self.text)
+
+    def raise_for_status(self) -> None:
+        if not self.ok:
+            raise HTTPError(f"{self.status_code} replayed error")
+
+
+class ReplaySession:
+    """Answers requests from a recording instead of the network.
+
+    Responses are matched on method, url and query parameters; repeated
+    requests get the recorded responses in order. With ``speed=None`` they
+    come back immediately, otherwise the recorded gaps between requests
+    are replayed ``speed`` times faster than they happened.
+
+    ``now()`` is the virtual clock: the recorded time of the response that
+    was last replayed.
+    """
+
+    def __init__(self, path: str | Path, speed: float | None = None) -> None:
+        self.speed = speed
+        self.headers: dict[str, str] = {}
+        self.replayed = 0
+        self._responses: dict[tuple[str, str, str], deque[dict[str, Any]]] = {}
+        self._start: float | None = None
+        self._clock: float | None = None
+        for record in read_records(path):
+            key = _key(record["m"], record["u"], record["p"])
+            self._responses.setdefault(key, deque()).append(record)
+            if self._start is None:
+                self._start = record["t"]
+
+    def __len__(self) -> int:
+        """Number of recorded responses not replayed yet."""
+        return sum(len(records) for records in self._responses.values())
+
+    def now(self) -> datetime:
+        timestamp = self._clock if self._clock is not None else self._start
+        if timestamp is None:
+            return datetime.now(UTC)
+        return datetime.fromtimestamp(timestamp, UTC)
+
+    async def request(self, method: str, url: str, **kwargs: Any) -> ReplayResponse:
+        records = self._responses.get(_key(method, url, kwargs.get("params")))
+        if not records:
+            raise ReplayMissError(f"No recorded response left for {method} {url}.")
+        record = records.popleft()
+
+        finished = record["t"] + record["d"]
+        if self.speed is not None and self._clock is not None:
+            delay = (finished - self._clock) / self.speed
+            if delay > 0:
+                await asyncio.sleep(delay)
+        if self._clock is None or finished > self._clock:
+            self._clock = finished
+        self.replayed += 1
+        return ReplayResponse(record["s"], record["r"])
+
+    async def close(self) -> None:
+        pass
+
+
+def replay_api(
+    path: str | Path,
+    speed: float | None = None,
+    token: str | None = None,
+) -> SpaceTradersApi:
+    """A ``SpaceTradersApi`` that answers from a recording, with no rate limit."""
+    return SpaceTradersApi(
+        token,
+        rate_limiter=utils.NoRateLimit(),
+        session=ReplaySession(path, speed),
+    )
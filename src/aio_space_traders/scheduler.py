@@ -0,0 +1,152 @@
+import asyncio
+import heapq
+from collections.abc import Callable
+from datetime import UTC, datetime
+from enum import StrEnum
+from typing import Any
+
+from aio_space_traders import model, utils
+
+
+class ShipEvent(StrEnum):
+    ARRIVAL = "ARRIVAL"
+    COOLDOWN = "COOLDOWN"
+
+
+type EventKey = tuple[ShipEvent, str]
+type EventCallback = Callable[[ShipEvent, str], None]
+
+
+class EventScheduler:
+    """Wakes waiters when ships arrive or come off cooldown.
+
+    Deadlines are kept in a single heap and driven by one event loop timer,
+    so the number of ships tracked doesn't change the number of sleeping
+    tasks. A deadline can be rescheduled at any time; stale heap entries
+    are skipped when they come due.
+
+    Register ``observe`` as a response hook on ``SpaceTradersApi`` to pick
+    up deadlines from every nav and cooldown the api returns.
+    """
+
+    def __init__(self) -> None:
+        self._heap: list[tuple[float, int, EventKey]] = []
+        self._deadlines: dict[EventKey, tuple[float, int]] = {}
+        self._waiters: dict[EventKey, list[asyncio.Future[None]]] = {}
+        self._callbacks: list[EventCallback] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._sequence = 0
+
+    def __len__(self) -> int:
+        return len(self._deadlines)
+
+    def subscribe(self, callback: EventCallback) -> None:
+        """Registers a callable to run whenever any event fires."""
+        self._callbacks.append(callback)
+
+    def unsubscribe(self, callback: EventCallback) -> None:
+        self._callbacks.remove(callback)
+
+    def schedule(self, event: ShipEvent, ship_symbol: str, when: datetime) -> None:
+        """Sets (or replaces) the deadline for a ship event."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + (when - datetime.now(UTC)).total_seconds()
+        key = (event, ship_symbol)
+        self._sequence += 1
+        self._deadlines[key] = (deadline, self._sequence)
+        heapq.heappush(self._heap, (deadline, self._sequence, key))
+        self._arm(loop)
+
+    def cancel(self, event: ShipEvent, ship_symbol: str) -> None:
+        """Drops a pending deadline and releases anyone waiting on it."""
+        key = (event, ship_symbol)
+        self._deadlines.pop(key, None)
+        self._release(key)
+
+    def schedule_arrival(self, ship_symbol: str, nav: model.ShipNav) -> None:
+        if nav.status == model.ShipNavStatus.IN_TRANSIT:
+            self.schedule(ShipEvent.ARRIVAL, ship_symbol, nav.route.arrival)
+        else:
+            self.cancel(ShipEvent.ARRIVAL, ship_symbol)
+
+    def schedule_cooldown(self, cooldown: model.Cooldown) -> None:
+        if cooldown.remaining_seconds > 0 and cooldown.expiration is not None:
+            self.schedule(ShipEvent.COOLDOWN, cooldown.ship_symbol, cooldown.expiration)
+        else:
+            self.cancel(ShipEvent.COOLDOWN, cooldown.ship_symbol)
+
+    def observe(self, method: str, url: str, response: Any) -> None:
+        """Response hook that schedules every nav and cooldown it sees."""
+        for ship_symbol, component in utils.iter_ship_state(url, response):
+            if isinstance(component, model.ShipNav):
+                self.schedule_arrival(ship_symbol, component)
+            elif isinstance(component, model.Cooldown):
+                self.schedule_cooldown(component)
+
+    def pending(self, event: ShipEvent, ship_symbol: str) -> bool:
+        return (event, ship_symbol) in self._deadlines
+
+    def remaining(self, event: ShipEvent, ship_symbol: str) -> float:
+        """Seconds until the event fires, or 0 if nothing is scheduled."""
+        entry = self._deadlines.get((event, ship_symbol))
+        if entry is None:
+            return 0.0
+        return max(0.0, entry[0] - asyncio.get_running_loop().time())
+
+    async def wait(self, event: ShipEvent, ship_symbol: str) -> None:
+        """Returns once the event has fired, immediately if none is pending."""
+        key = (event, ship_symbol)
+        if key not in self._deadlines:
+            return
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault(key, []).append(future)
+        await future
+
+    async def wait_ready(self, ship_symbol: str) -> None:
+        """Returns once the ship has arrived and its cooldown has expired."""
+        await self.wait(ShipEvent.ARRIVAL, ship_symbol)
+        await self.wait(ShipEvent.COOLDOWN, ship_symbol)
+
+    def close(self) -> None:
+        """Stops the timer and releases every waiter."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        self._heap.clear()
+        self._deadlines.clear()
+        for key in list(self._waiters):
+            self._release(key)
+
+    def _arm(self, loop: asyncio.AbstractEventLoop) -> None:
+        if not self._heap:
+            return
+        deadline = self._heap[0][0]
+        if self._timer is not None:
+            if self._timer.when() <= deadline:
+                return
+            self._timer.cancel()
+        self._timer = loop.call_at(deadline, self._fire)
+
+    def _fire(self) -> None:
+        self._timer = None
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        fired: list[EventKey] = []
+        while self._heap and self._heap[0][0] <= now:
+            deadline, sequence, key = heapq.heappop(self._heap)
+            # Entries replaced by a later `schedule` call are left in the heap
+            if self._deadlines.get(key) != (deadline, sequence):
+                continue
+            del self._deadlines[key]
+            fired.append(key)
+
+        for key in fired:
+            self._release(key)
+            for callback in self._callbacks:
+                callback(*key)
+        self._arm(loop)
+
+    def _release(self, key: EventKey) -> None:
+        for future in self._waiters.pop(key, []):
+            if not future.done():
+                future.set_result(None)
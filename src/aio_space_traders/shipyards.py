@@ -0,0 +1,214 @@
+"""Where to buy each ship type, counting the flight to where it's needed.
+
+``get_shipyard`` only lists prices while one of our ships is present, so
+``ShipyardCache`` keeps the last prices seen at every shipyard. It also
+keeps, for every ship type, the cheapest offer overall and the cheapest
+offer delivered to each waypoint registered with ``need``. Both indexes
+are updated as listings come in, so answering is a dictionary lookup::
+
+    shipyards = ShipyardCache(universe, fuel_price=72, credits_per_second=5)
+    api.add_response_hook(shipyards.observe)
+    shipyards.need("X1-A1-B7")
+    offer = shipyards.best(model.ShipType.SHIP_MINING_DRONE, "X1-A1-B7")
+    await api.purchase_ship(offer.ship_type, offer.waypoint_symbol)
+
+Delivery is the fuel and flight time of sending the new ship from the
+shipyard to the destination, priced at ``fuel_price`` per market unit of
+fuel and ``credits_per_second`` of flight. Only shipyards in the
+destination's system are considered for a delivered offer.
+"""
+
+import math
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from typing import Any
+
+from aio_space_traders import model, navigation, utils
+from aio_space_traders.cache import UniverseCache
+
+
+@dataclass(frozen=True)
+class ShipOffer:
+    ship_type: model.ShipType
+    waypoint_symbol: str
+    price: int
+    seen_at: datetime
+    delivery: float = 0.0
+
+    @property
+    def total(self) -> float:
+        return self.price + self.delivery
+
+
+class ShipyardCache:
+    def __init__(
+        self,
+        universe: UniverseCache,
+        *,
+        flight_mode: model.ShipNavFlightMode = model.ShipNavFlightMode.CRUISE,
+        fuel_price: float = 0.0,
+        credits_per_second: float = 0.0,
+    ) -> None:
+        self.universe = universe
+        self.flight_mode = flight_mode
+        self.fuel_price = fuel_price
+        self.credits_per_second = credits_per_second
+        self.shipyards: dict[str, model.Shipyard] = {}
+        self.priced_at: dict[str, datetime] = {}
+        self._listings: dict[model.ShipType, dict[str, model.ShipyardShip]] = {}
+        self._cheapest: dict[model.ShipType, ShipOffer] = {}
+        self._destinations: set[str] = set()
+        self._best: dict[tuple[model.ShipType, str], ShipOffer] = {}
+        self._deliveries: dict[tuple[str, str, int], float] = {}
+        # Waypoints a delivery needed that the universe didn't have yet
+        self._missing: set[str] = set()
+
+    def __contains__(self, waypoint_symbol: str) -> bool:
+        return waypoint_symbol in self.shipyards
+
+    def add(self, shipyard: model.Shipyard, observed_at: datetime | None = None) -> None:
+        previous = self.shipyards.get(shipyard.symbol)
+        if shipyard.ships is None:
+            if previous is not None and previous.ships is not None:
+                shipyard = shipyard.model_copy(update={"ships": previous.ships})
+            self.shipyards[shipyard.symbol] = shipyard
+            return
+
+        self.shipyards[shipyard.symbol] = shipyard
+        self.priced_at[shipyard.symbol] = observed_at or datetime.now(UTC)
+        changed = {ship.type for ship in shipyard.ships}
+        if previous is not None and previous.ships:
+            changed.update(ship.type for ship in previous.ships)
+            for ship in previous.ships:
+                self._listings.get(ship.type, {}).pop(shipyard.symbol, None)
+        for ship in shipyard.ships:
+            self._listings.setdefault(ship.type, {})[shipyard.symbol] = ship
+        for ship_type in changed:
+            self._update(ship_type, shipyard.symbol)
+
+    def observe(self, method: str, url: str, response: Any) -> None:
+        if isinstance(response, model.GetShipyardResponse):
+            self.add(response.data)
+
+    def age(self, waypoint_symbol: str, now: datetime | None = None) -> float | None:
+        """Seconds since prices were seen at a shipyard, None if never."""
+        priced_at = self.priced_at.get(waypoint_symbol)
+        if priced_at is None:
+            return None
+        return ((now or datetime.now(UTC)) - priced_at).total_seconds()
+
+    def need(self, destination: str) -> None:
+        """Starts keeping the best delivered offer of every ship type for a waypoint."""
+        if destination in self._destinations:
+            return
+        self._destinations.add(destination)
+        for ship_type in self._listings:
+            self._rank(ship_type, destination)
+
+    def cheapest(self, ship_type: model.ShipType) -> ShipOffer | None:
+        """The lowest price anywhere, ignoring delivery."""
+        return self._cheapest.get(ship_type)
+
+    def best(self, ship_type: model.ShipType, destination: str) -> ShipOffer | None:
+        """The lowest price plus delivery to ``destination``."""
+        if destination not in self._destinations:
+            self.need(destination)
+        elif self._missing:
+            self._place_missing()
+        return self._best.get((ship_type, destination))
+
+    def delivery(self, origin: str, destination: str, speed: int) -> float:
+        """Credits spent flying a new ship between waypoints, inf if unknown."""
+        if origin == destination:
+            return 0.0
+        key = (origin, destination, speed)
+        if key in self._deliveries:
+            return self._deliveries[key]
+        if utils.system_symbol(origin) != utils.system_symbol(destination):
+            self._deliveries[key] = math.inf
+            return math.inf
+        start = self.universe.waypoints.get(origin)
+        end = self.universe.waypoints.get(destination)
+        if start is None or end is None:
+            # Not cached, the universe may learn the waypoints later
+            self._missing.update(
+                symbol
+                for symbol, waypoint in [(origin, start), (destination, end)]
+                if waypoint is None
+            )
+            return math.inf
+        distance = navigation.distance(start, end)
+        seconds = navigation.travel_time(distance, speed, self.flight_mode)
+        fuel = navigation.fuel_cost(distance, self.flight_mode)
+        self._deliveries[key] = (
+            math.ceil(fuel / navigation.FUEL_PER_MARKET_UNIT) * self.fuel_price
+            + seconds * self.credits_per_second
+        )
+        return self._deliveries[key]
+
+    def _place_missing(self) -> None:
+        """Reranks delivered offers once missing waypoints are in the universe."""
+        found = {symbol for symbol in self._missing if symbol in self.universe.waypoints}
+        if not found:
+            return
+        self._missing -= found
+        for ship_type in self._listings:
+            for destination in self._destinations:
+                self._rank(ship_type, destination)
+
+    def _offer(
+        self,
+        ship_type: model.ShipType,
+        waypoint_symbol: str,
+        destination: str | None,
+    ) -> ShipOffer | None:
+        ship = self._listings.get(ship_type, {}).get(waypoint_symbol)
+        if ship is None:
+            return None
+        delivery = 0.0
+        if destination is not None:
+            delivery = self.delivery(waypoint_symbol, destination, ship.engine.speed)
+            if math.isinf(delivery):
+                return None
+        return ShipOffer(
+            ship_type,
+            waypoint_symbol,
+            ship.purchase_price,
+            self.priced_at[waypoint_symbol],
+            delivery,
+        )
+
+    def _rank(self, ship_type: model.ShipType, destination: str | None) -> None:
+        """Rebuilds one index entry from every listing of the ship type."""
+        offers = [
+            offer
+            for waypoint_symbol in self._listings.get(ship_type, {})
+            if (offer := self._offer(ship_type, waypoint_symbol, destination)) is not None
+        ]
+        best = min(offers, key=lambda offer: offer.total, default=None)
+        index: dict[Any, ShipOffer] = self._cheapest if destination is None else self._best
+        key = ship_type if destination is None else (ship_type, destination)
+        if best is None:
+            index.pop(key, None)
+        else:
+            index[key] = best
+
+    def _update(self, ship_type: model.ShipType, waypoint_symbol: str) -> None:
+        """Folds a changed listing into every index entry for its ship type.
+
+        A listing that got cheaper only has to beat the current best; a
+        full rebuild is needed only when the current best got dearer or
+        was delisted.
+        """
+        for destination in [None, *self._destinations]:
+            index: dict[Any, ShipOffer] = self._cheapest if destination is None else self._best
+            key = ship_type if destination is None else (ship_type, destination)
+            current = index.get(key)
+            offer = self._offer(ship_type, waypoint_symbol, destination)
+            if current is not None and current.waypoint_symbol == waypoint_symbol:
+                if offer is not None and offer.total <= current.total:
+                    index[key] = offer
+                else:
+                    self._rank(ship_type, destination)
+            elif offer is not None and (current is None or offer.total < current.total):
+                index[key] = offer
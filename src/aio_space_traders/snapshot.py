@@ -0,0 +1,160 @@
+"""Load systems and waypoints from a bulk dump instead of crawling the api.
+
+A dump is either a JSON document or a JSON lines file, gzip compressed when
+the path ends in ``.gz``. JSON documents may be an array of records or an
+object whose values are arrays of records, such as a saved
+``list_systems`` response ``{"data": [...], "meta": {...}}`` or
+``{"systems": [...], "waypoints": [...]}``. Each JSON lines row is a record
+or an object with a ``data`` array. Records with a ``sectorSymbol`` are
+read as ``System``, everything else as ``Waypoint``::
+
+    cache = UniverseCache()
+    stats = import_universe("universe.jsonl.gz", cache)
+
+The file is parsed incrementally, so only the record being read and a few
+batches waiting for validation are held in memory. Batches are validated
+in worker processes and added to the cache as they come back.
+"""
+
+import gzip
+import json
+import os
+import time
+from collections import deque
+from collections.abc import Iterator
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import IO, Any
+
+from pydantic import ValidationError
+
+from aio_space_traders import model
+from aio_space_traders.cache import UniverseCache
+from aio_space_traders.streaming import JSONStreamDecoder
+
+
+@dataclass
+class ImportStats:
+    systems: int = 0
+    waypoints: int = 0
+    invalid: int = 0
+    seconds: float = 0.0
+
+
+def _open(path: Path) -> IO[str]:
+    if path.suffix == ".gz":
+        return gzip.open(path, "rt", encoding="utf-8")
+    return path.open("r", encoding="utf-8")
+
+
+def iter_records(path: str | Path, chunk_size: int = 1 << 16) -> Iterator[dict[str, Any]]:
+    """Yields the raw records in a dump, one at a time."""
+    path = Path(path)
+    suffixes = path.suffixes[-2:] if path.suffix == ".gz" else path.suffixes[-1:]
+    with _open(path) as file:
+        if ".jsonl" in suffixes:
+            for line in file:
+                if not line.strip():
+                    continue
+                row = json.loads(line)
+                if isinstance(row, dict) and isinstance(row.get("data"), list):
+                    yield from row["data"]
+                else:
+                    yield row
+        else:
+            decoder = JSONStreamDecoder()
+            while chunk := file.read(chunk_size):
+                for _, record in decoder.feed(chunk):
+                    yield record
+            for _, record in decoder.close():
+                yield record
+
+
+def validate_records(
+    records: list[dict[str, Any]],
+) -> tuple[list[model.System | model.Waypoint], int]:
+    """Validates a batch of records, returning the models and the invalid count."""
+    validated: list[model.System | model.Waypoint] = []
+    invalid = 0
+    for record in records:
+        try:
+            if "sectorSymbol" in record:
+                validated.append(model.System.model_validate(record))
+            else:
+                validated.append(model.Waypoint.model_validate(record))
+        except (ValidationError, TypeError):
+            invalid += 1
+    return validated, invalid
+
+
+def _batches(
+    records: Iterator[dict[str, Any]],
+    size: int,
+) -> Iterator[list[dict[str, Any]]]:
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def import_universe(
+    path: str | Path,
+    cache: UniverseCache,
+    *,
+    workers: int | None = None,
+    batch_size: int = 500,
+    executor: Executor | None = None,
+) -> ImportStats:
+    """Streams a dump into a ``UniverseCache``.
+
+    ``workers`` worker processes validate batches of ``batch_size``
+    records, defaulting to one per CPU; with ``workers=0`` everything runs
+    in this process. At most two batches per worker are in flight, which
+    keeps memory bounded however large the dump is. Records that fail
+    validation are counted in ``ImportStats.invalid`` and skipped.
+    """
+    start = time.perf_counter()
+    stats = ImportStats()
+
+    def add(result: tuple[list[model.System | model.Waypoint], int]) -> None:
+        validated, invalid = result
+        stats.invalid += invalid
+        for item in validated:
+            if isinstance(item, model.System):
+                cache.add_system(item)
+                stats.systems += 1
+            else:
+                cache.add_waypoint(item)
+                stats.waypoints += 1
+
+    batches = _batches(iter_records(path), batch_size)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if executor is None and workers == 0:
+        for batch in batches:
+            add(validate_records(batch))
+        stats.seconds = time.perf_counter() - start
+        return stats
+
+    pool = executor or ProcessPoolExecutor(workers)
+    max_pending = 2 * max(1, workers)
+    pending: deque[Future[tuple[list[model.System | model.Waypoint], int]]] = deque()
+    try:
+        for batch in batches:
+            pending.append(pool.submit(validate_records, batch))
+            if len(pending) >= max_pending:
+                add(pending.popleft().result())
+        while pending:
+            add(pending.popleft().result())
+    finally:
+        for future in pending:
+            future.cancel()
+        if executor is None:
+            pool.shutdown()
+    stats.seconds = time.perf_counter() - start
+    return stats
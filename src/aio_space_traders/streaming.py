@@ -0,0 +1,140 @@
+import codecs
+import json
+from typing import Any
+
+_WHITESPACE = " \t\r\n"
+
+
+class JSONStreamDecoder:
+    """Decodes a JSON document fed in chunks, one array element at a time.
+
+    The document is either an array or an object. ``feed`` returns the
+    array elements completed so far as ``(key, element)`` pairs, where
+    ``key`` is the object member holding the array, or None for a top
+    level array. Object members that aren't arrays, such as ``meta`` in a
+    list response, are decoded whole into ``fields``.
+
+    Only the element being decoded is buffered, so a response or file of
+    any size is decoded in memory bounded by its largest element::
+
+        decoder = JSONStreamDecoder()
+        async for chunk in chunks:
+            for key, item in decoder.feed(chunk):
+                ...
+        decoder.close()
+    """
+
+    def __init__(self) -> None:
+        self.fields: dict[str, Any] = {}
+        self._decoder = json.JSONDecoder()
+        self._text = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._pos = 0
+        self._state = "start"
+        self._key: str | None = None
+        self._closed = False
+
+    @property
+    def done(self) -> bool:
+        return self._state == "done"
+
+    def feed(self, chunk: str | bytes) -> list[tuple[str | None, Any]]:
+        if isinstance(chunk, bytes):
+            chunk = self._text.decode(chunk)
+        self._buffer = self._buffer[self._pos :] + chunk
+        self._pos = 0
+        return self._parse()
+
+    def close(self) -> list[tuple[str | None, Any]]:
+        """Decodes whatever is left, raising if the document is incomplete."""
+        self._buffer = self._buffer[self._pos :] + self._text.decode(b"", final=True)
+        self._pos = 0
+        self._closed = True
+        items = self._parse()
+        if not self.done:
+            raise ValueError("JSON document ended early")
+        return items
+
+    def _peek(self) -> str:
+        while self._pos < len(self._buffer) and self._buffer[self._pos] in _WHITESPACE:
+            self._pos += 1
+        return self._buffer[self._pos : self._pos + 1]
+
+    def _value(self) -> tuple[bool, Any]:
+        try:
+            value, end = self._decoder.raw_decode(self._buffer, self._pos)
+        except json.JSONDecodeError:
+            if self._closed:
+                raise
+            return False, None
+        # A number at the end of the buffer may continue in the next chunk
+        if end == len(self._buffer) and not self._closed:
+            return False, None
+        self._pos = end
+        return True, value
+
+    def _expect(self, char: str, found: str) -> None:
+        if found != char:
+            raise ValueError(f"expected {char!r} in JSON document, found {found!r}")
+        self._pos += 1
+
+    def _parse(self) -> list[tuple[str | None, Any]]:
+        items: list[tuple[str | None, Any]] = []
+        while True:
+            char = self._peek()
+            if not char:
+                return items
+            match self._state:
+                case "start" if char == "[":
+                    self._pos += 1
+                    self._state = "first_element"
+                case "start":
+                    self._expect("{", char)
+                    self._state = "first_key"
+                case "first_key" if char == "}":
+                    self._pos += 1
+                    self._state = "done"
+                case "first_key" | "key":
+                    complete, key = self._value()
+                    if not complete:
+                        return items
+                    self._key = key
+                    self._state = "colon"
+                case "colon":
+                    self._expect(":", char)
+                    self._state = "member"
+                case "member" if char == "[":
+                    self._pos += 1
+                    self._state = "first_element"
+                case "member":
+                    complete, value = self._value()
+                    if not complete:
+                        return items
+                    self.fields[self._key] = value
+                    self._state = "next_member"
+                case "next_member" if char == ",":
+                    self._pos += 1
+                    self._state = "key"
+                case "next_member":
+                    self._expect("}", char)
+                    self._state = "done"
+                case "first_element" if char == "]":
+                    self._pos += 1
+                    self._end_array()
+                case "first_element" | "element":
+                    complete, value = self._value()
+                    if not complete:
+                        return items
+                    items.append((self._key, value))
+                    self._state = "next_element"
+                case "next_element" if char == ",":
+                    self._pos += 1
+                    self._state = "element"
+                case "next_element":
+                    self._expect("]", char)
+                    self._end_array()
+                case "done":
+                    raise ValueError(f"unexpected {char!r} after JSON document")
+
+    def _end_array(self) -> None:
+        self._state = "done" if self._key is None else "next_member"
@@ -0,0 +1,157 @@
+import heapq
+from collections.abc import Collection, Iterable, Mapping
+from datetime import UTC, datetime
+from typing import Any
+
+from aio_space_traders import model
+from aio_space_traders.actions import ShipActions
+from aio_space_traders.errors import (
+    ShipSurveyExhaustedError,
+    ShipSurveyExpirationError,
+    ShipSurveyVerificationError,
+)
+
+# Bigger surveys take more extractions to exhaust, so they break ties
+SIZE_RANK: dict[model.Size, int] = {
+    model.Size.SMALL: 0,
+    model.Size.MODERATE: 1,
+    model.Size.LARGE: 2,
+}
+
+
+class SurveyPool:
+    """Surveys shared by a mining fleet, indexed by waypoint.
+
+    Surveys are ranked by the expected value of one extraction: every
+    deposit listed on a survey is an equally likely yield, so the value is
+    the mean of the deposit values. ``values`` maps trade symbols to what a
+    unit is worth to us (usually a market sell price) and can be updated
+    at any time.
+
+    Expired surveys are dropped through a heap ordered by expiration, and
+    surveys the server reports as expired, exhausted or invalid are retired
+    as soon as the error comes back.
+    """
+
+    def __init__(self, values: Mapping[str, float] | None = None) -> None:
+        self.values: dict[str, float] = dict(values or {})
+        self._by_waypoint: dict[str, dict[str, model.Survey]] = {}
+        self._expiry: list[tuple[datetime, str, str]] = []
+
+    def __len__(self) -> int:
+        self.purge_expired()
+        return sum(len(surveys) for surveys in self._by_waypoint.values())
+
+    def __contains__(self, survey: model.Survey) -> bool:
+        return survey.signature in self._by_waypoint.get(survey.symbol, {})
+
+    def update_values(self, values: Mapping[str, float]) -> None:
+        self.values.update(values)
+
+    def add(self, survey: model.Survey) -> None:
+        if survey.expiration <= datetime.now(UTC):
+            return
+        self._by_waypoint.setdefault(survey.symbol, {})[survey.signature] = survey
+        heapq.heappush(
+            self._expiry,
+            (survey.expiration, survey.symbol, survey.signature),
+        )
+
+    def add_many(self, surveys: Iterable[model.Survey]) -> None:
+        for survey in surveys:
+            self.add(survey)
+
+    def observe(self, method: str, url: str, response: Any) -> None:
+        """Response hook that adds the surveys from ``create_survey``."""
+        if isinstance(response, model.CreateSurveyResponse):
+            self.add_many(response.data.surveys)
+
+    def retire(self, survey: model.Survey) -> None:
+        surveys = self._by_waypoint.get(survey.symbol)
+        if surveys is None:
+            return
+        surveys.pop(survey.signature, None)
+        if not surveys:
+            del self._by_waypoint[survey.symbol]
+
+    def purge_expired(self, now: datetime | None = None) -> int:
+        now = now or datetime.now(UTC)
+        purged = 0
+        while self._expiry and self._expiry[0][0] <= now:
+            _, waypoint_symbol, signature = heapq.heappop(self._expiry)
+            surveys = self._by_waypoint.get(waypoint_symbol)
+            if surveys is None or signature not in surveys:
+                continue
+            self.retire(surveys[signature])
+            purged += 1
+        return purged
+
+    def score(
+        self,
+        survey: model.Survey,
+        targets: Collection[str] | None = None,
+    ) -> float:
+        """Expected value of one extraction using this survey.
+
+        Deposits outside of ``targets`` are counted as worthless.
+        """
+        if not survey.deposits:
+            return 0.0
+        total = 0.0
+        for deposit in survey.deposits:
+            if targets is None or deposit.symbol in targets:
+                total += self.values.get(deposit.symbol, 0.0)
+        return total / len(survey.deposits)
+
+    def surveys(self, waypoint_symbol: str) -> list[model.Survey]:
+        self.purge_expired()
+        return list(self._by_waypoint.get(waypoint_symbol, {}).values())
+
+    def ranked(
+        self,
+        waypoint_symbol: str,
+        targets: Collection[str] | None = None,
+    ) -> list[model.Survey]:
+        """Live surveys at a waypoint, best first."""
+        return sorted(
+            self.surveys(waypoint_symbol),
+            key=lambda survey: (
+                self.score(survey, targets),
+                SIZE_RANK[survey.size],
+                survey.expiration,
+            ),
+            reverse=True,
+        )
+
+    def best(
+        self,
+        waypoint_symbol: str,
+        targets: Collection[str] | None = None,
+    ) -> model.Survey | None:
+        ranked = self.ranked(waypoint_symbol, targets)
+        if not ranked or (targets is not None and self.score(ranked[0], targets) <= 0):
+            return None
+        return ranked[0]
+
+    async def extract(
+        self,
+        actions: ShipActions,
+        ship_symbol: str,
+        waypoint_symbol: str,
+        targets: Collection[str] | None = None,
+    ) -> model.ExtractResourcesResponse | model.ExtractResourcesWithSurveyResponse:
+        """Extracts with the best live survey, falling back to no survey.
+
+        Surveys rejected by the server are retired and the next best one is
+        tried, so a dead survey costs at most the one failed request.
+        """
+        while (survey := self.best(waypoint_symbol, targets)) is not None:
+            try:
+                return await actions.extract_with_survey(ship_symbol, survey)
+            except (
+                ShipSurveyExpirationError,
+                ShipSurveyExhaustedError,
+                ShipSurveyVerificationError,
+            ):
+                self.retire(survey)
+        return await actions.extract(ship_symbol)
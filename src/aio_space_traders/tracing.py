@@ -0,0 +1,211 @@
+"""Tracing spans for api calls.
+
+``SpaceTradersApi`` takes any tracer with OpenTelemetry's
+``start_as_current_span(name, kind=..., attributes=...)``, so an
+OpenTelemetry tracer can be passed in directly and api spans nest under the
+caller's own::
+
+    tracer = opentelemetry.trace.get_tracer("bot")
+    api = SpaceTradersApi(token, tracer=tracer)
+    with tracer.start_as_current_span("mine"):
+        await api.extract_resources("SHIP-1")
+
+Every call gets a span of kind ``CLIENT`` named after its endpoint
+template, such as ``POST /my/ships/{ship_symbol}/navigate``, with these
+attributes:
+
+``http.request.method``, ``url.template``, ``url.path``
+    what was requested
+``http.response.status_code``
+    the response status
+``http.request.resend_count``
+    retries made by the transport, when there were any
+``spacetraders.ship_symbol``
+    the ship the call acts on, for ``/my/ships/{ship_symbol}/...``
+``spacetraders.rate_limit.wait``
+    seconds spent waiting for the rate limiter
+``spacetraders.error_code``
+    the api error code of a failed call
+
+Without a tracer nothing is recorded. ``LocalTracer`` is a small tracer
+with the same interface that hands finished spans to an exporter, such as
+``JSONLinesSpanExporter`` to write them to a file for offline analysis.
+"""
+
+import json
+import secrets
+import time
+from collections.abc import Iterator
+from contextlib import AbstractContextManager, contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Protocol
+
+try:
+    from opentelemetry.trace import SpanKind
+except ImportError:
+    SpanKind = None
+
+# The kind of api spans, OpenTelemetry's enum when it's installed
+CLIENT: Any = "CLIENT" if SpanKind is None else SpanKind.CLIENT
+
+
+class Span(Protocol):
+    def set_attribute(self, key: str, value: Any) -> None: ...
+
+
+class Tracer(Protocol):
+    def start_as_current_span(
+        self,
+        name: str,
+        *,
+        kind: Any = ...,
+        attributes: dict[str, Any] | None = None,
+    ) -> AbstractContextManager[Span]: ...
+
+
+class SpanExporter(Protocol):
+    def export(self, span: "LocalSpan") -> None: ...
+
+
+@dataclass
+class LocalSpan:
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: str | None
+    start_time: int
+    kind: str = "INTERNAL"
+    end_time: int | None = None
+    attributes: dict[str, Any] = field(default_factory=dict)
+    status: str = "UNSET"
+    status_message: str | None = None
+    events: list[dict[str, Any]] = field(default_factory=list)
+
+    @property
+    def duration(self) -> float | None:
+        """Seconds between start and end, None while the span is open."""
+        if self.end_time is None:
+            return None
+        return (self.end_time - self.start_time) / 1e9
+
+    def is_recording(self) -> bool:
+        return self.end_time is None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def set_attributes(self, attributes: dict[str, Any]) -> None:
+        self.attributes.update(attributes)
+
+    def add_event(self, name: str, attributes: dict[str, Any] | None = None) -> None:
+        self.events.append(
+            {"name": name, "time": time.time_ns(), "attributes": attributes or {}},
+        )
+
+    def record_exception(self, exception: BaseException) -> None:
+        self.add_event(
+            "exception",
+            {
+                "exception.type": type(exception).__name__,
+                "exception.message": str(exception),
+            },
+        )
+
+    def set_status(self, status: str, description: str | None = None) -> None:
+        self.status = status
+        self.status_message = description
+
+    def to_dict(self) -> dict[str, Any]:
+        """The span with OTLP JSON field names."""
+        return {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_id,
+            "name": self.name,
+            "kind": f"SPAN_KIND_{self.kind}",
+            "startTimeUnixNano": self.start_time,
+            "endTimeUnixNano": self.end_time,
+            "attributes": self.attributes,
+            "status": {"code": self.status, "message": self.status_message},
+            "events": self.events,
+        }
+
+
+_current_span: ContextVar[LocalSpan | None] = ContextVar("current_span", default=None)
+
+
+class LocalTracer:
+    """A minimal tracer for runs without an OpenTelemetry SDK.
+
+    The current span is kept in a context variable, so spans started in a
+    task nest under the span that was current when the task was created.
+    """
+
+    def __init__(self, exporter: SpanExporter) -> None:
+        self.exporter = exporter
+
+    @property
+    def current_span(self) -> LocalSpan | None:
+        return _current_span.get()
+
+    @contextmanager
+    def start_as_current_span(
+        self,
+        name: str,
+        *,
+        kind: Any = "INTERNAL",
+        attributes: dict[str, Any] | None = None,
+    ) -> Iterator[LocalSpan]:
+        parent = _current_span.get()
+        span = LocalSpan(
+            name=name,
+            trace_id=parent.trace_id if parent else secrets.token_hex(16),
+            span_id=secrets.token_hex(8),
+            parent_id=parent.span_id if parent else None,
+            start_time=time.time_ns(),
+            # Takes OpenTelemetry's SpanKind as well as its name
+            kind=getattr(kind, "name", kind),
+            attributes=dict(attributes or {}),
+        )
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as exception:
+            span.record_exception(exception)
+            span.set_status("ERROR", f"{type(exception).__name__}: {exception}")
+            raise
+        finally:
+            _current_span.reset(token)
+            span.end_time = time.time_ns()
+            self.exporter.export(span)
+
+
+class InMemorySpanExporter:
+    def __init__(self) -> None:
+        self.spans: list[LocalSpan] = []
+
+    def export(self, span: LocalSpan) -> None:
+        self.spans.append(span)
+
+
+class JSONLinesSpanExporter:
+    """Appends every finished span to a JSON lines file."""
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self._file = self.path.open("a", encoding="utf-8")
+
+    def export(self, span: LocalSpan) -> None:
+        self._file.write(json.dumps(span.to_dict(), default=str))
+        self._file.write("\n")
+        self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
+
+
+def read_spans(path: str | Path) -> list[dict[str, Any]]:
+    with Path(path).open(encoding="utf-8") as file:
+        return [json.loads(line) for line in file if line.strip()]
@@ -0,0 +1,226 @@
+from collections.abc import Awaitable, Callable, Collection, Mapping
+from dataclasses import dataclass, field
+
+from aio_space_traders import model
+from aio_space_traders.actions import ShipActions
+from aio_space_traders.errors import (
+    MarketTradeInsufficientCreditsError,
+    MarketTradeNoPurchaseError,
+    MarketTradeNotSoldError,
+    MarketTradeUnitLimitError,
+)
+
+
+@dataclass
+class TradeOrder:
+    symbol: model.TradeSymbol
+    units: int
+    quoted_price: int
+
+
+@dataclass
+class TradeResult:
+    transactions: list[model.MarketTransaction] = field(default_factory=list)
+    unfilled: list[TradeOrder] = field(default_factory=list)
+    agent: model.Agent | None = None
+    cargo: model.ShipCargo | None = None
+
+    @property
+    def units(self) -> int:
+        return sum(transaction.units for transaction in self.transactions)
+
+    @property
+    def total_price(self) -> int:
+        return sum(transaction.total_price for transaction in self.transactions)
+
+
+def _split(
+    symbol: model.TradeSymbol,
+    units: int,
+    volume: int,
+    price: int,
+) -> list[TradeOrder]:
+    orders = []
+    while units > 0:
+        batch = min(units, volume)
+        orders.append(TradeOrder(symbol, batch, price))
+        units -= batch
+    return orders
+
+
+def plan_sale(
+    cargo: model.ShipCargo,
+    market: model.Market,
+    keep: Collection[str] = (),
+) -> list[TradeOrder]:
+    """Splits a hold into orders no larger than each good's trade volume.
+
+    Goods are ordered by the value of the whole stack, so if selling stops
+    early the most valuable cargo has already been sold. Goods the market
+    doesn't trade, and anything in ``keep``, stay in the hold.
+    """
+    goods = {good.symbol: good for good in market.trade_goods or []}
+    stacks = [
+        (item, goods[item.symbol])
+        for item in cargo.inventory
+        if item is not None and item.symbol in goods and item.symbol not in keep
+    ]
+    stacks.sort(key=lambda stack: stack[0].units * stack[1].sell_price, reverse=True)
+
+    orders = []
+    for item, good in stacks:
+        orders.extend(_split(item.symbol, item.units, good.trade_volume, good.sell_price))
+    return orders
+
+
+def plan_purchase(
+    wanted: Mapping[model.TradeSymbol, int],
+    market: model.Market,
+    free_capacity: int,
+    credits: int | None = None,
+) -> list[TradeOrder]:
+    """Splits purchases into orders no larger than each good's trade volume.
+
+    Goods are bought in the order given. Orders are trimmed to fit the free
+    cargo space and, if ``credits`` is given, what we can afford at the
+    quoted prices.
+    """
+    goods = {good.symbol: good for good in market.trade_goods or []}
+    orders = []
+    for symbol, units in wanted.items():
+        good = goods.get(symbol)
+        if good is None:
+            continue
+        units = min(units, free_capacity)
+        if credits is not None and good.purchase_price > 0:
+            units = min(units, credits // good.purchase_price)
+            credits -= units * good.purchase_price
+        free_capacity -= units
+        orders.extend(_split(symbol, units, good.trade_volume, good.purchase_price))
+    return orders
+
+
+type TradeCall = Callable[
+    [model.TradeSymbol, int],
+    Awaitable[model.SellCargoResponse | model.PurchaseCargoResponse],
+]
+
+
+async def _execute(
+    orders: list[TradeOrder],
+    trade: TradeCall,
+    slipped: Callable[[TradeOrder, int], bool],
+) -> TradeResult:
+    result = TradeResult()
+    stopped: set[model.TradeSymbol] = set()
+    queue = list(reversed(orders))
+    while queue:
+        order = queue.pop()
+        if order.symbol in stopped:
+            result.unfilled.append(order)
+            continue
+        try:
+            response = await trade(order.symbol, order.units)
+        except MarketTradeUnitLimitError:
+            # The trade volume shrank since the market was fetched
+            if order.units == 1:
+                stopped.add(order.symbol)
+                result.unfilled.append(order)
+                continue
+            # Rebatch every order left for the good, they'd hit the same limit
+            units = order.units + sum(
+                queued.units for queued in queue if queued.symbol == order.symbol
+            )
+            queue = [queued for queued in queue if queued.symbol != order.symbol]
+            batches = _split(order.symbol, units, order.units // 2, order.quoted_price)
+            queue.extend(reversed(batches))
+            continue
+        except (MarketTradeNotSoldError, MarketTradeNoPurchaseError):
+            stopped.add(order.symbol)
+            result.unfilled.append(order)
+            continue
+        except MarketTradeInsufficientCreditsError:
+            result.unfilled.append(order)
+            result.unfilled.extend(reversed(queue))
+            break
+
+        data = response.data
+        result.transactions.append(data.transaction)
+        result.agent = data.agent
+        result.cargo = data.cargo
+        if slipped(order, data.transaction.price_per_unit):
+            stopped.add(order.symbol)
+    return result
+
+
+async def sell_all(
+    actions: ShipActions,
+    ship_symbol: str,
+    cargo: model.ShipCargo,
+    market: model.Market,
+    *,
+    keep: Collection[str] = (),
+    max_slippage: float = 0.1,
+    min_prices: Mapping[str, int] | None = None,
+) -> TradeResult:
+    """Sells a ship's hold at a market in as few requests as possible.
+
+    The ship is docked once if needed. Selling a good stops as soon as a
+    sale comes back more than ``max_slippage`` below the quoted price, or
+    below its entry in ``min_prices``; the rest of that good is reported in
+    ``TradeResult.unfilled`` and other goods keep selling.
+    """
+    min_prices = min_prices or {}
+
+    def slipped(order: TradeOrder, price: int) -> bool:
+        floor = max(
+            order.quoted_price * (1 - max_slippage),
+            min_prices.get(order.symbol, 0),
+        )
+        return price < floor
+
+    async def trade(symbol: model.TradeSymbol, units: int) -> model.SellCargoResponse:
+        return await actions.sell(
+            ship_symbol,
+            model.SellCargoObject(symbol=symbol, units=units),
+        )
+
+    return await _execute(plan_sale(cargo, market, keep), trade, slipped)
+
+
+async def purchase_all(
+    actions: ShipActions,
+    ship_symbol: str,
+    wanted: Mapping[model.TradeSymbol, int],
+    cargo: model.ShipCargo,
+    market: model.Market,
+    *,
+    credits: int | None = None,
+    max_slippage: float = 0.1,
+    max_prices: Mapping[str, int] | None = None,
+) -> TradeResult:
+    """Buys goods in volume-sized batches, stopping a good if its price climbs.
+
+    The counterpart of ``sell_all``: a good stops being bought once a
+    purchase comes back more than ``max_slippage`` above the quoted price,
+    or above its entry in ``max_prices``.
+    """
+    max_prices = max_prices or {}
+
+    def slipped(order: TradeOrder, price: int) -> bool:
+        ceiling = order.quoted_price * (1 + max_slippage)
+        if order.symbol in max_prices:
+            ceiling = min(ceiling, max_prices[order.symbol])
+        return price > ceiling
+
+    async def trade(
+        symbol: model.TradeSymbol,
+        units: int,
+    ) -> model.PurchaseCargoResponse:
+        return await actions.purchase(
+            ship_symbol,
+            model.PurchaseCargoObject(symbol=symbol, units=units),
+        )
+
+    orders = plan_purchase(wanted, market, cargo.capacity - cargo.units, credits)
+    return await _execute(orders, trade, slipped)
@@ -0,0 +1,74 @@
+from dataclasses import dataclass
+from typing import Any
+
+from niquests import AsyncSession
+
+
+@dataclass
+class TransportConfig:
+    """Connection settings for the session ``SpaceTradersApi`` creates.
+
+    ``multiplexed`` lets concurrent requests share HTTP/2 and HTTP/3
+    connections instead of each waiting for a connection of its own, which
+    avoids head-of-line blocking on the pool under high concurrency.
+    ``pool_maxsize`` bounds the connections kept per host; with
+    multiplexing a handful is usually plenty.
+    """
+
+    pool_connections: int = 10
+    pool_maxsize: int = 10
+    multiplexed: bool = False
+    http2: bool = True
+    http3: bool = True
+    keepalive_delay: float | None = 600.0
+    keepalive_idle_window: float | None = 60.0
+    timeout: float | None = 30.0
+    retries: int = 0
+    happy_eyeballs: bool = False
+
+    def create_session(self, base_url: str) -> AsyncSession:
+        return AsyncSession(
+            base_url=base_url,
+            pool_connections=self.pool_connections,
+            pool_maxsize=self.pool_maxsize,
+            multiplexed=self.multiplexed,
+            disable_http2=not self.http2,
+            disable_http3=not self.http3,
+            keepalive_delay=self.keepalive_delay,
+            keepalive_idle_window=self.keepalive_idle_window,
+            timeout=self.timeout,
+            retries=self.retries,
+            happy_eyeballs=self.happy_eyeballs,
+        )
+
+
+class HttpTransport:
+    """A niquests session configured from a ``TransportConfig``.
+
+    Multiplexed sessions hand back lazy responses that only resolve once
+    gathered; ``request`` gathers each response before returning it, so a
+    request's own coroutine waits for its own response while other
+    requests keep sharing the connection.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        config: TransportConfig | None = None,
+        session: AsyncSession | None = None,
+    ) -> None:
+        self.config = config or TransportConfig()
+        self.session = session or self.config.create_session(base_url)
+
+    @property
+    def headers(self) -> Any:
+        return self.session.headers
+
+    async def request(self, method: str, url: str, **kwargs: Any) -> Any:
+        response = await self.session.request(method, url, **kwargs)
+        if getattr(response, "lazy", False) is True:
+            await self.session.gather(response)
+        return response
+
+    async def close(self) -> None:
+        await self.session.close()
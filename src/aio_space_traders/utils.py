@@ -1,6 +1,10 @@
 import asyncio
 from collections import deque, namedtuple
+from collections.abc import Iterator
 import time
+from typing import Any, Protocol
+
+from aio_space_traders import model
 
 
 class AsyncRateLimit:
@@ -33,8 +37,7 @@ class AsyncRateLimit:
             # Check per-minute limit
             if len(self.minute_requests) >= self.per_minute_limit:
                 wait_time = max(wait_time, 60 - (now - self.minute_requests[0]))
-            
-            print(wait_time)
+
             if wait_time > 0:
                 await asyncio.sleep(wait_time)
                 now = time.monotonic()
@@ -43,3 +46,102 @@ class AsyncRateLimit:
             self.second_requests.append(now)
             self.minute_requests.append(now)
 
+
+class RateLimiter(Protocol):
+    async def acquire(self) -> None: ...
+
+
+class HttpSession(Protocol):
+    """The parts of ``niquests.AsyncSession`` that ``SpaceTradersApi`` uses."""
+
+    headers: Any
+
+    async def request(self, method: str, url: str, **kwargs: Any) -> Any: ...
+
+    async def close(self) -> None: ...
+
+
+class NoRateLimit:
+    """A limiter that never waits, for replays and local test servers."""
+
+    async def acquire(self) -> None:
+        pass
+
+
+def ship_symbol_from_url(url: str) -> str | None:
+    """Returns the ship symbol of a ``/my/ships/{ship_symbol}/...`` url."""
+    parts = url.strip("/").split("/")
+    if len(parts) >= 3 and parts[0] == "my" and parts[1] == "ships":
+        return parts[2]
+    return None
+
+
+# Path segments followed by the symbol or id of one of their items
+_COLLECTIONS = {
+    "agents": "agent_symbol",
+    "contracts": "contract_id",
+    "factions": "faction_symbol",
+    "ships": "ship_symbol",
+    "systems": "system_symbol",
+    "waypoints": "waypoint_symbol",
+}
+
+
+def route_template(url: str) -> str:
+    """Replaces the symbols in a url with the names of the path parameters.
+
+    ``/my/ships/X-1/nav`` becomes ``/my/ships/{ship_symbol}/nav``, so urls
+    for the same endpoint share one template.
+    """
+    segments = url.split("?", 1)[0].split("/")
+    for index in range(1, len(segments)):
+        parameter = _COLLECTIONS.get(segments[index - 1])
+        if parameter is not None and segments[index]:
+            segments[index] = f"{{{parameter}}}"
+    return "/".join(segments)
+
+
+def system_symbol(waypoint_symbol: str) -> str:
+    """Returns the system of a waypoint, ``X1-DF55-20250Z`` -> ``X1-DF55``."""
+    return "-".join(waypoint_symbol.split("-")[:2])
+
+
+def iter_ship_state(url: str, response: Any) -> Iterator[tuple[str, Any]]:
+    """Yields ``(ship_symbol, component)`` pairs found in a response.
+
+    Components are ``Ship``, ``ShipNav``, ``Cooldown``, ``ShipCargo`` and
+    ``ShipFuel`` models belonging to one of our own ships. Nav, cargo and
+    fuel payloads don't carry a ship symbol, so it is taken from the url.
+    """
+    data = getattr(response, "data", None)
+    url_ship = ship_symbol_from_url(url)
+    items = data if isinstance(data, list) else [data]
+    for item in items:
+        if isinstance(item, model.Ship):
+            yield from _iter_ship(item)
+        elif isinstance(item, model.Cooldown):
+            yield item.ship_symbol, item
+        elif isinstance(item, model.ShipNav | model.ShipCargo):
+            if url_ship is not None:
+                yield url_ship, item
+        elif isinstance(item, model.BaseAPIModel):
+            ship = getattr(item, "ship", None)
+            if isinstance(ship, model.Ship):
+                yield from _iter_ship(ship)
+            cooldown = getattr(item, "cooldown", None)
+            if isinstance(cooldown, model.Cooldown):
+                yield cooldown.ship_symbol, cooldown
+            if url_ship is None:
+                continue
+            for name in ("nav", "cargo", "fuel"):
+                component = getattr(item, name, None)
+                if component is not None:
+                    yield url_ship, component
+
+
+def _iter_ship(ship: model.Ship) -> Iterator[tuple[str, Any]]:
+    yield ship.symbol, ship
+    yield ship.symbol, ship.nav
+    yield ship.symbol, ship.cooldown
+    yield ship.symbol, ship.cargo
+    yield ship.symbol, ship.fuel
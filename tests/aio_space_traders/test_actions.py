@@ -0,0 +1,120 @@
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from aio_space_traders import model
+from aio_space_traders.actions import ShipActions
+from aio_space_traders.api import SpaceTradersApi
+from tests import factories
+
+
+def nav_json(status: model.ShipNavStatus) -> dict:
+    return factories.ShipNavFactory.build(status=status).model_dump(
+        mode="json",
+        by_alias=True,
+    )
+
+
+def mock_response(json_data: dict, ok: bool = True, status_code: int = 200):
+    response = AsyncMock()
+    response.ok = ok
+    response.status_code = status_code
+    response.json.return_value = json_data
+    return response
+
+
+def route(method: str, url: str, **kwargs):
+    if url.endswith("/dock"):
+        return mock_response({"data": nav_json(model.ShipNavStatus.DOCKED)})
+    if url.endswith("/orbit"):
+        return mock_response({"data": nav_json(model.ShipNavStatus.IN_ORBIT)})
+    if url.endswith("/nav"):
+        return mock_response({"data": nav_json(model.ShipNavStatus.IN_ORBIT)})
+    if url.endswith("/sell"):
+        return mock_response(
+            {
+                "data": factories.SellCargoDataFactory.build().model_dump(
+                    mode="json",
+                    by_alias=True,
+                ),
+            },
+        )
+    raise AssertionError(f"unexpected request {method} {url}")
+
+
+def urls(request_mock: AsyncMock) -> list[str]:
+    return [call.args[1] for call in request_mock.call_args_list]
+
+
+@pytest.mark.asyncio
+@patch("niquests.AsyncSession.request", new_callable=AsyncMock)
+async def test_sell_docks_only_when_needed(request_mock: AsyncMock):
+    request_mock.side_effect = route
+    api = SpaceTradersApi(token="test_token")
+    api.rate_limiter.per_second_limit = 100
+    actions = ShipActions(api)
+    sell = model.SellCargoObject(symbol=model.TradeSymbol.IRON_ORE, units=1)
+
+    await actions.sell("SHIP-1", sell)
+    await actions.sell("SHIP-1", sell)
+
+    assert urls(request_mock) == [
+        "/my/ships/SHIP-1/dock",
+        "/my/ships/SHIP-1/sell",
+        "/my/ships/SHIP-1/sell",
+    ]
+    assert actions.status("SHIP-1") == model.ShipNavStatus.DOCKED
+
+
+@pytest.mark.asyncio
+@patch("niquests.AsyncSession.request", new_callable=AsyncMock)
+async def test_status_is_learned_from_other_calls(request_mock: AsyncMock):
+    request_mock.side_effect = route
+    api = SpaceTradersApi(token="test_token")
+    api.rate_limiter.per_second_limit = 100
+    actions = ShipActions(api)
+
+    await api.get_ship_nav("SHIP-1")
+    await actions.ensure_in_orbit("SHIP-1")
+    await actions.ensure_docked("SHIP-1")
+
+    assert urls(request_mock) == [
+        "/my/ships/SHIP-1/nav",
+        "/my/ships/SHIP-1/dock",
+    ]
+
+
+@pytest.mark.asyncio
+@patch("niquests.AsyncSession.request", new_callable=AsyncMock)
+async def test_stale_status_is_corrected_and_retried(request_mock: AsyncMock):
+    not_docked = mock_response(
+        {"error": {"code": 4244, "message": "Ship is not docked."}},
+        ok=False,
+        status_code=400,
+    )
+    responses = iter([not_docked])
+
+    def stale_then_route(method: str, url: str, **kwargs):
+        if url.endswith("/sell"):
+            response = next(responses, None)
+            if response is not None:
+                return response
+        return route(method, url, **kwargs)
+
+    request_mock.side_effect = stale_then_route
+    api = SpaceTradersApi(token="test_token")
+    api.rate_limiter.per_second_limit = 100
+    actions = ShipActions(api)
+    actions.navs["SHIP-1"] = factories.ShipNavFactory.build(
+        status=model.ShipNavStatus.DOCKED,
+    )
+
+    await actions.sell(
+        "SHIP-1",
+        model.SellCargoObject(symbol=model.TradeSymbol.IRON_ORE, units=1),
+    )
+
+    assert urls(request_mock) == [
+        "/my/ships/SHIP-1/sell",
+        "/my/ships/SHIP-1/dock",
+        "/my/ships/SHIP-1/sell",
+    ]
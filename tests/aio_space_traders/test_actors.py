@@ -0,0 +1,86 @@
+import asyncio
+
+import pytest
+from aio_space_traders.actors import ActorRuntime, ShipActor
+
+
+class FakeApi:
+    def __init__(self) -> None:
+        self.active: dict[str, int] = {}
+        self.calls: list[tuple[str, str]] = []
+
+    async def command(self, ship_symbol: str, name: str, delay: float = 0.01) -> str:
+        self.active[ship_symbol] = self.active.get(ship_symbol, 0) + 1
+        assert self.active[ship_symbol] == 1, "commands for one ship overlapped"
+        self.calls.append((ship_symbol, name))
+        try:
+            await asyncio.sleep(delay)
+        finally:
+            self.active[ship_symbol] -= 1
+        return name
+
+
+@pytest.mark.asyncio
+async def test_commands_for_one_ship_run_in_order():
+    api = FakeApi()
+    runtime = ActorRuntime()
+
+    results = await asyncio.gather(
+        runtime.call("SHIP-1", api.command, "navigate"),
+        runtime.call("SHIP-1", api.command, "dock"),
+        runtime.call("SHIP-2", api.command, "orbit"),
+    )
+
+    assert results == ["navigate", "dock", "orbit"]
+    assert [name for ship, name in api.calls if ship == "SHIP-1"] == [
+        "navigate",
+        "dock",
+    ]
+    await runtime.close()
+
+
+@pytest.mark.asyncio
+async def test_ships_run_in_parallel():
+    api = FakeApi()
+    runtime = ActorRuntime()
+    ships = [f"SHIP-{n}" for n in range(20)]
+
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    await asyncio.gather(*(runtime.call(s, api.command, "orbit", 0.05) for s in ships))
+
+    assert loop.time() - start < 0.5
+    assert len(runtime) == 20
+
+
+@pytest.mark.asyncio
+async def test_full_mailbox_applies_backpressure():
+    api = FakeApi()
+    actor = ShipActor("SHIP-1", mailbox_size=1)
+
+    first = await actor.submit(lambda: api.command("SHIP-1", "a", 0.05))
+    await asyncio.sleep(0)
+    second = actor.submit_nowait(lambda: api.command("SHIP-1", "b"))
+    with pytest.raises(asyncio.QueueFull):
+        actor.submit_nowait(lambda: api.command("SHIP-1", "c"))
+
+    assert await first == "a"
+    assert await second == "b"
+
+
+@pytest.mark.asyncio
+async def test_cancelled_command_is_skipped_and_in_flight_is_cancelled():
+    api = FakeApi()
+    actor = ShipActor("SHIP-1")
+
+    slow = await actor.submit(lambda: api.command("SHIP-1", "slow", 10))
+    queued = await actor.submit(lambda: api.command("SHIP-1", "queued"))
+    after = await actor.submit(lambda: api.command("SHIP-1", "after"))
+    await asyncio.sleep(0.01)
+
+    queued.cancel()
+    slow.cancel()
+
+    assert await asyncio.wait_for(after, 1) == "after"
+    assert [name for _, name in api.calls] == ["slow", "after"]
+    assert not actor.busy
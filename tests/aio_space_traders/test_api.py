@@ -1,7 +1,7 @@
 from unittest.mock import patch, AsyncMock
 
 import pytest
-from aio_space_traders.api import SpaceTraders
+from aio_space_traders.api import SpaceTradersApi
 from aio_space_traders.errors import SpaceTradersAPIError
 from tests import factories
 
@@ -15,7 +15,7 @@ async def test_get_status_successful_with_token(niquests_mock: AsyncMock):
 
     niquests_mock.return_value = mock_response
 
-    api = SpaceTraders(token="test_token")
+    api = SpaceTradersApi(token="test_token")
     response = await api.get_status()
     assert response.status == mock_data.status
 
@@ -29,7 +29,7 @@ async def test_get_status_successful_without_token(niquests_mock: AsyncMock):
 
     niquests_mock.return_value = mock_response
 
-    api = SpaceTraders()
+    api = SpaceTradersApi()
     response = await api.get_status()
     assert response.status == mock_data.status
 
@@ -48,7 +48,7 @@ async def test_get_status_failure(niquests_mock: AsyncMock):
 
     niquests_mock.return_value = mock_response
 
-    api = SpaceTraders(token="test_token")
+    api = SpaceTradersApi(token="test_token")
 
     with pytest.raises(SpaceTradersAPIError) as exc_info:
         await api.get_status()
@@ -0,0 +1,87 @@
+import pytest
+from aio_space_traders import model
+from aio_space_traders.atlas import Atlas, write_atlas
+from tests import factories
+
+
+def make_waypoint(symbol: str, **kwargs) -> model.Waypoint:
+    return factories.WaypointFactory.build(
+        symbol=symbol,
+        system_symbol=symbol.rsplit("-", 1)[0],
+        **kwargs,
+    )
+
+
+@pytest.fixture
+def universe():
+    systems = [
+        factories.SystemFactory.build(symbol="X1-AB12", x=-5, y=7),
+        factories.SystemFactory.build(symbol="X1-AB1", factions=[]),
+    ]
+    waypoints = [
+        make_waypoint(
+            "X1-AB12-C3",
+            x=-120,
+            y=44,
+            orbits=None,
+            faction=model.WaypointFaction(symbol=model.FactionSymbol.COSMIC),
+            is_under_construction=True,
+            orbitals=[model.WaypointOrbital(symbol="X1-AB12-C3A")],
+        ),
+        make_waypoint("X1-AB12-C3A", orbits="X1-AB12-C3", faction=None),
+        make_waypoint("X1-AB1-Z9"),
+    ]
+    return systems, waypoints
+
+
+def test_views_read_back_what_was_written(tmp_path, universe):
+    systems, waypoints = universe
+    path = tmp_path / "universe.atlas"
+    write_atlas(path, systems, waypoints)
+
+    with Atlas(path) as atlas:
+        assert len(atlas.systems) == 2
+        assert list(atlas.waypoints) == ["X1-AB1-Z9", "X1-AB12-C3", "X1-AB12-C3A"]
+
+        system = atlas.system("X1-AB12")
+        assert (system.x, system.y, system.type) == (-5, 7, systems[0].type)
+        assert system.sector_symbol == systems[0].sector_symbol
+        assert system.factions == [faction.symbol for faction in systems[0].factions]
+
+        gate = atlas.waypoint("X1-AB12-C3")
+        assert (gate.x, gate.y, gate.system_symbol) == (-120, 44, "X1-AB12")
+        assert gate.type == waypoints[0].type
+        assert gate.traits == [trait.symbol for trait in waypoints[0].traits]
+        assert gate.orbitals == ["X1-AB12-C3A"]
+        assert (gate.orbits, gate.faction, gate.is_under_construction) == (
+            None,
+            "COSMIC",
+            True,
+        )
+        moon = atlas.waypoints["X1-AB12-C3A"]
+        assert (moon.orbits, moon.faction) == ("X1-AB12-C3", None)
+
+
+def test_lookups_by_symbol_and_system(tmp_path, universe):
+    path = tmp_path / "universe.atlas"
+    write_atlas(path, *universe)
+
+    with Atlas(path) as atlas:
+        assert atlas.waypoint("X1-AB12-C4") is None
+        assert atlas.waypoint("X1-AB12-C") is None
+        assert atlas.waypoint("X1-AB12-C3A").orbits == "X1-AB12-C3"
+        assert atlas.system("X1-AB") is None
+        assert [w.symbol for w in atlas.waypoints_in_system("X1-AB12")] == [
+            "X1-AB12-C3",
+            "X1-AB12-C3A",
+        ]
+        assert [w.symbol for w in atlas.system("X1-AB1").waypoints] == ["X1-AB1-Z9"]
+        assert atlas.waypoints_in_system("X1-AB") == []
+
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / "universe.atlas"
+    path.write_bytes(b"not an atlas at all, no")
+
+    with pytest.raises(ValueError):
+        Atlas(path)
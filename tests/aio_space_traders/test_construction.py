@@ -0,0 +1,138 @@
+import pytest
+from aio_space_traders import model
+from aio_space_traders.actions import ShipActions
+from aio_space_traders.api import SpaceTradersApi
+from aio_space_traders.cache import MarketCache, UniverseCache
+from aio_space_traders.construction import ConstructionSupply
+from aio_space_traders.utils import AsyncRateLimit
+from tests import factories
+from tests.mock_server import MockSpaceTradersServer
+
+FAB = model.TradeSymbol.FAB_MATS
+CIRCUITS = model.TradeSymbol.ADVANCED_CIRCUITRY
+GATE = "X1-A-GATE"
+
+
+def make_supply(
+    fab_fulfilled: int = 0,
+    near_fab: int = 100,
+    fuel_price: int | None = None,
+) -> ConstructionSupply:
+    universe = UniverseCache()
+    for symbol, x in ((GATE, 0), ("X1-A-NEAR", 10), ("X1-A-FAR", 200)):
+        universe.add_waypoint(
+            factories.WaypointFactory.build(symbol=symbol, system_symbol="X1-A", x=x, y=0),
+        )
+    markets = MarketCache()
+    for waypoint, symbol, price in (
+        ("X1-A-NEAR", FAB, near_fab),
+        ("X1-A-FAR", FAB, 50),
+        ("X1-A-NEAR", CIRCUITS, 500),
+    ):
+        market = markets.markets.get(waypoint)
+        goods = list(market.trade_goods) if market else []
+        goods.append(
+            factories.MarketTradeGoodFactory.build(symbol=symbol, purchase_price=price),
+        )
+        markets.add(factories.MarketFactory.build(symbol=waypoint, trade_goods=goods))
+
+    supply = ConstructionSupply(universe, markets, fuel_price=fuel_price)
+    supply.add(make_site(fab_fulfilled))
+    return supply
+
+
+def make_site(fab_fulfilled: int = 0, steel_fulfilled: int = 0) -> model.Construction:
+    return model.Construction(
+        symbol=GATE,
+        is_complete=False,
+        materials=[
+            model.ConstructionMaterial(trade_symbol=FAB, required=100, fulfilled=fab_fulfilled),
+            model.ConstructionMaterial(
+                trade_symbol=CIRCUITS,
+                required=10,
+                fulfilled=steel_fulfilled,
+            ),
+        ],
+    )
+
+
+def make_ship(symbol: str, capacity: int = 40, *items: tuple[str, int]) -> model.Ship:
+    ship = factories.ShipFactory.build(symbol=symbol)
+    ship.nav.waypoint_symbol = model.WaypointSymbol("X1-A-NEAR")
+    ship.engine.speed = 30
+    ship.cargo = model.ShipCargo(
+        capacity=capacity,
+        units=sum(units for _, units in items),
+        inventory=[
+            model.ShipCargoItem(symbol=s, name=s, description="", units=units)
+            for s, units in items
+        ],
+    )
+    return ship
+
+
+def test_haulers_fill_holds_without_over_assigning():
+    supply = make_supply(fab_fulfilled=30)
+
+    assignments = supply.assign_all(make_ship(f"S-{n}") for n in range(3))
+
+    assert [(a.trade_symbol, a.source, a.units) for a in assignments] == [
+        (FAB, "X1-A-FAR", 40),
+        (FAB, "X1-A-FAR", 30),
+        (CIRCUITS, "X1-A-NEAR", 10),
+    ]
+    assert supply.outstanding() == {}
+    assert supply.assign(make_ship("S-4")) is None
+
+    supply.release(assignments[1])
+    assert supply.outstanding() == {(GATE, FAB): 30}
+
+
+def test_fuel_to_a_far_source_counts_against_its_price():
+    supply = make_supply(near_fab=55, fuel_price=100)
+
+    assignment = supply.assign(make_ship("S-1"))
+
+    assert (assignment.trade_symbol, assignment.source) == (FAB, "X1-A-NEAR")
+    assert assignment.cost == 40 * 55 + 100
+
+
+def test_cargo_already_on_board_is_delivered_first():
+    supply = make_supply()
+
+    assignment = supply.assign(make_ship("S-1", 40, (CIRCUITS, 25)))
+
+    assert assignment.source is None
+    assert (assignment.trade_symbol, assignment.units) == (CIRCUITS, 10)
+
+
+@pytest.mark.asyncio
+async def test_supply_refreshes_site_and_never_over_supplies():
+    async with MockSpaceTradersServer(ship_count=1) as server:
+        ship = server.ships["MOCK-1"]
+        site = ship.nav.waypoint_symbol.root
+        ship.cargo = model.ShipCargo(
+            capacity=40,
+            units=40,
+            inventory=[model.ShipCargoItem(symbol=FAB, name=FAB, description="", units=40)],
+        )
+        server.constructions[site] = make_site(fab_fulfilled=95).model_copy(
+            update={"symbol": site},
+        )
+        supply = ConstructionSupply(UniverseCache(), MarketCache())
+        supply.add(make_site().model_copy(update={"symbol": site}))
+        async with SpaceTradersApi(
+            "token",
+            base_url=server.url,
+            rate_limiter=AsyncRateLimit(10_000, 1_000_000),
+        ) as api:
+            await supply.supply(ShipActions(api), "MOCK-1", site, FAB, 40)
+
+    assert [path for _, path in server.requests if "construction" in path] == [
+        f"/systems/X1-MOCK/waypoints/{site}/construction/supply",
+        f"/systems/X1-MOCK/waypoints/{site}/construction",
+        f"/systems/X1-MOCK/waypoints/{site}/construction/supply",
+    ]
+    assert server.constructions[site].materials[0].fulfilled == 100
+    assert ship.cargo.units == 35
+    assert supply.remaining(site, FAB) == 0
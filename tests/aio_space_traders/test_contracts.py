@@ -0,0 +1,141 @@
+from datetime import UTC, datetime, timedelta
+
+from aio_space_traders import model, navigation
+from aio_space_traders.cache import MarketCache, UniverseCache
+from aio_space_traders.contracts import ContractPlanner
+from tests import factories
+
+IRON = model.TradeSymbol.IRON_ORE
+COPPER = model.TradeSymbol.COPPER_ORE
+NOW = datetime(2026, 1, 1, tzinfo=UTC)
+
+
+def make_universe() -> UniverseCache:
+    universe = UniverseCache()
+    for symbol, x in (("X1-A-HQ", 0), ("X1-A-NEAR", 10), ("X1-A-FAR", 300)):
+        universe.add_waypoint(
+            factories.WaypointFactory.build(symbol=symbol, system_symbol="X1-A", x=x, y=0),
+        )
+    return universe
+
+
+def make_markets(*listings: tuple[str, model.TradeSymbol, int]) -> MarketCache:
+    markets = MarketCache()
+    for waypoint, symbol, price in listings:
+        markets.add(
+            factories.MarketFactory.build(
+                symbol=waypoint,
+                trade_goods=[
+                    factories.MarketTradeGoodFactory.build(
+                        symbol=symbol,
+                        purchase_price=price,
+                    ),
+                ],
+            ),
+        )
+    return markets
+
+
+def make_ship(capacity: int = 40) -> model.Ship:
+    ship = factories.ShipFactory.build()
+    ship.nav.waypoint_symbol = model.WaypointSymbol("X1-A-HQ")
+    ship.engine.speed = 30
+    ship.cargo = model.ShipCargo(capacity=capacity, units=0, inventory=[])
+    return ship
+
+
+def make_contract(
+    symbol: model.TradeSymbol,
+    units: int,
+    payment: int,
+    deadline: timedelta = timedelta(days=1),
+    accepted: bool = False,
+) -> model.Contract:
+    return factories.ContractFactory.build(
+        accepted=accepted,
+        fulfilled=False,
+        expiration=NOW + timedelta(days=1),
+        deadline_to_accept=NOW + timedelta(days=1),
+        terms=model.ContractTerms(
+            deadline=NOW + deadline,
+            payment=model.ContractPayment(on_accepted=0, on_fulfilled=payment),
+            deliver=[
+                model.ContractDeliverGood(
+                    trade_symbol=symbol,
+                    destination_symbol="X1-A-HQ",
+                    units_required=units,
+                    units_fulfilled=0,
+                ),
+            ],
+        ),
+    )
+
+
+def test_navigation_matches_server_formulas():
+    assert navigation.travel_time(100, 30) == 98
+    assert navigation.travel_time(0, 30) == 16
+    assert navigation.fuel_cost(100.4) == 100
+    assert navigation.fuel_cost(100, model.ShipNavFlightMode.BURN) == 200
+    assert navigation.fuel_cost(100, model.ShipNavFlightMode.DRIFT) == 1
+
+
+def test_plan_sources_cheapest_market_and_batches_by_capacity():
+    planner = ContractPlanner(
+        make_universe(),
+        make_markets(("X1-A-NEAR", IRON, 10), ("X1-A-FAR", IRON, 50)),
+        fuel_price=0,
+    )
+
+    plan = planner.plan(make_contract(IRON, 100, 5000), make_ship(capacity=40), NOW)
+
+    assert plan.feasible
+    assert plan.cost == 1000
+    assert plan.profit == 4000
+    assert [(b.source, b.units) for b in plan.batches] == [
+        ("X1-A-NEAR", 40),
+        ("X1-A-NEAR", 40),
+        ("X1-A-NEAR", 20),
+    ]
+    leg = navigation.travel_time(10, 30)
+    assert plan.seconds == leg + 3 * leg + 2 * leg
+
+
+def test_plan_pays_a_little_more_to_source_nearby():
+    planner = ContractPlanner(
+        make_universe(),
+        make_markets(("X1-A-NEAR", IRON, 11), ("X1-A-FAR", IRON, 10)),
+        fuel_price=70,
+    )
+
+    plan = planner.plan(make_contract(IRON, 100, 5000), make_ship(capacity=40), NOW)
+
+    assert {batch.source for batch in plan.batches} == {"X1-A-NEAR"}
+    assert plan.cost > 1100
+
+
+def test_plan_all_ranks_feasible_contracts_first():
+    planner = ContractPlanner(
+        make_universe(),
+        make_markets(("X1-A-NEAR", IRON, 10), ("X1-A-FAR", COPPER, 10)),
+        fuel_price=0,
+    )
+    cheap = make_contract(IRON, 10, 500)
+    rich = make_contract(IRON, 10, 5000)
+    unsourced = make_contract(model.TradeSymbol.GOLD_ORE, 10, 50000)
+    too_late = make_contract(COPPER, 10, 50000, deadline=timedelta(seconds=30))
+
+    plans = planner.plan_all([cheap, unsourced, too_late, rich], make_ship(), NOW)
+
+    assert [plan.contract for plan in plans[:2]] == [rich, cheap]
+    assert {plan.problem for plan in plans[2:]} == {
+        "no known market sells GOLD_ORE",
+        "can't be delivered before the deadline",
+    }
+
+
+def test_market_cache_keeps_prices_when_fetched_from_afar():
+    markets = make_markets(("X1-A-NEAR", IRON, 10))
+    markets.add(factories.MarketFactory.build(symbol="X1-A-NEAR", trade_goods=None))
+
+    assert markets.good("X1-A-NEAR", IRON).purchase_price == 10
+    assert markets.cheapest(IRON)[0] == "X1-A-NEAR"
@@ -0,0 +1,62 @@
+import asyncio
+import io
+import time
+
+import pytest
+from aio_space_traders import utils
+from aio_space_traders.api import SpaceTradersApi
+from aio_space_traders.diagnostics import Diagnostics
+from tests.mock_server import MockSpaceTradersServer
+
+
+def test_route_template_replaces_symbols():
+    assert utils.route_template("/my/ships/MOCK-1/nav") == "/my/ships/{ship_symbol}/nav"
+    assert utils.route_template("/my/ships") == "/my/ships"
+    assert (
+        utils.route_template("/systems/X1-A/waypoints/X1-A-B/jump-gate?page=2")
+        == "/systems/{system_symbol}/waypoints/{waypoint_symbol}/jump-gate"
+    )
+    assert utils.route_template("/my/contracts/cl0abc/accept") == (
+        "/my/contracts/{contract_id}/accept"
+    )
+
+
+@pytest.mark.asyncio
+async def test_stall_is_sampled_and_tagged_with_endpoint():
+    def blocking_hook(method, url, result):
+        if url.endswith("/nav"):
+            time.sleep(0.3)
+
+    async with MockSpaceTradersServer(ship_count=1) as server:
+        async with Diagnostics(interval=0.01, stall_threshold=0.1) as diagnostics:
+            api = SpaceTradersApi(
+                "token",
+                base_url=server.url,
+                rate_limiter=utils.NoRateLimit(),
+                diagnostics=diagnostics,
+            )
+            api.add_response_hook(blocking_hook)
+            async with api:
+                await api.get_agent()
+                await api.get_ship("MOCK-1")
+                await api.get_ship("MOCK-1")
+                await api.get_ship_nav("MOCK-1")
+            await asyncio.sleep(0.05)
+
+    assert diagnostics.endpoints["GET /my/ships/{ship_symbol}"].count == 2
+    nav = diagnostics.endpoints["GET /my/ships/{ship_symbol}/nav"]
+    assert nav.processing >= 0.3
+    assert nav.network < nav.processing
+
+    stall = diagnostics.stalls[-1]
+    assert stall.endpoint == "GET /my/ships/MOCK-1/nav"
+    assert stall.duration >= 0.2
+    assert any("blocking_hook" in frame for frame in stall.stack)
+    assert diagnostics.max_lag >= 0.2
+
+    output = io.StringIO()
+    diagnostics.dump(output)
+    report = output.getvalue()
+    assert "GET /my/ships/{ship_symbol}/nav" in report
+    assert "while processing GET /my/ships/MOCK-1/nav" in report
+    assert not diagnostics.running
@@ -0,0 +1,61 @@
+import pytest
+from aio_space_traders import model
+from aio_space_traders.api import SpaceTradersApi
+from aio_space_traders.fleet import FleetView, RefreshPlan
+from aio_space_traders.utils import NoRateLimit
+from tests.mock_server import MockSpaceTradersServer
+
+
+def make_api(server: MockSpaceTradersServer) -> SpaceTradersApi:
+    return SpaceTradersApi("token", base_url=server.url, rate_limiter=NoRateLimit())
+
+
+@pytest.mark.asyncio
+async def test_first_refresh_lists_the_whole_fleet_in_pages():
+    async with MockSpaceTradersServer(ship_count=45) as server:
+        async with make_api(server) as api:
+            fleet = FleetView(api)
+            made = await fleet.refresh()
+            assert made == RefreshPlan(pages=[1, 2, 3])
+            assert server.request_count == 3
+            assert len(fleet) == 45
+            assert fleet.positions["MOCK-21"] == 20
+            assert fleet.stale() == []
+
+
+@pytest.mark.asyncio
+async def test_stale_ships_are_refreshed_by_page_or_on_their_own():
+    async with MockSpaceTradersServer(ship_count=45) as server:
+        async with make_api(server) as api:
+            fleet = FleetView(api)
+            await fleet.refresh()
+            count = server.request_count
+
+            # Three ships on the first page, one on the last
+            made = await fleet.refresh(["MOCK-2", "MOCK-5", "MOCK-9", "MOCK-44"])
+            assert made == RefreshPlan(pages=[1], ships=["MOCK-44"])
+            assert server.request_count == count + 2
+
+
+def test_plan_lists_every_page_when_cheaper_than_unplaced_ships():
+    fleet = FleetView.__new__(FleetView)
+    fleet.positions = {f"MOCK-{index + 1}": index for index in range(40)}
+    fleet.total = 40
+
+    assert fleet.plan(["MOCK-1", "MOCK-41"]) == RefreshPlan(ships=["MOCK-1", "MOCK-41"])
+    unplaced = [f"MOCK-{index}" for index in range(41, 45)]
+    assert fleet.plan(unplaced) == RefreshPlan(pages=[1, 2])
+
+
+@pytest.mark.asyncio
+async def test_responses_are_merged_and_missing_ships_forgotten():
+    async with MockSpaceTradersServer(ship_count=3) as server:
+        async with make_api(server) as api:
+            fleet = FleetView(api)
+            await fleet.refresh()
+            await api.orbit_ship("MOCK-1")
+            assert fleet["MOCK-1"].nav.status == model.ShipNavStatus.IN_ORBIT
+
+            del server.ships["MOCK-3"]
+            await fleet.refresh(["MOCK-3"])
+            assert "MOCK-3" not in fleet
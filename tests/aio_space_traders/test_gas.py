@@ -0,0 +1,122 @@
+import asyncio
+from unittest.mock import MagicMock
+
+import pytest
+from aio_space_traders import model
+from aio_space_traders.actions import ShipActions
+from aio_space_traders.api import SpaceTradersApi
+from aio_space_traders.cache import UniverseCache
+from aio_space_traders.gas import SiphonCoordinator
+from aio_space_traders.scheduler import EventScheduler
+from aio_space_traders.utils import NoRateLimit
+from tests import factories
+from tests.mock_server import MockSpaceTradersServer
+
+
+@pytest.mark.asyncio
+async def test_siphoners_spread_out_and_leave_destabilized_sites():
+    async with MockSpaceTradersServer(
+        ship_count=5,
+        per_second_limit=10_000,
+        burst_limit=10_000,
+        time_scale=0.002,
+    ) as server:
+        first, second = list(server.waypoints)[:2]
+        for ship in server.ships.values():
+            ship.nav.waypoint_symbol = model.WaypointSymbol(first)
+            ship.nav.status = model.ShipNavStatus.IN_ORBIT
+
+        async with SpaceTradersApi(
+            "token",
+            base_url=server.url,
+            rate_limiter=NoRateLimit(),
+        ) as api:
+
+            async def unload(hauler: str) -> None:
+                server.ships[hauler].cargo.inventory = []
+                server.ships[hauler].cargo.units = 0
+                await api.get_ship_cargo(hauler)
+
+            coordinator = SiphonCoordinator(
+                ShipActions(api),
+                EventScheduler(),
+                [first, second],
+                {"HYDROCARBON": 10, "LIQUID_HYDROGEN": 5},
+                unload=unload,
+            )
+
+            run = asyncio.create_task(
+                coordinator.run(["MOCK-1", "MOCK-2", "MOCK-3", "MOCK-4"], ["MOCK-5"]),
+            )
+            await asyncio.sleep(0.5)
+            assert coordinator.assigned == {
+                first: {"MOCK-1", "MOCK-3"},
+                second: {"MOCK-2", "MOCK-4"},
+            }
+
+            server.destabilized.add(first)
+            await asyncio.sleep(0.7)
+            assert coordinator.is_hot(first)
+            assert coordinator.assigned[second] == {"MOCK-1", "MOCK-2", "MOCK-3", "MOCK-4"}
+            assert coordinator.swarms[second].haulers == {"MOCK-5"}
+            assert coordinator.swarms[second].stats.transferred > 0
+            run.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await run
+            assert coordinator.observe not in api.response_hooks
+
+
+def test_waypoint_modifiers_mark_sites_hot():
+    coordinator = SiphonCoordinator(
+        ShipActions(MagicMock()),
+        EventScheduler(),
+        ["X1-A-GAS"],
+        {},
+        backoff=60,
+    )
+
+    unstable = model.WaypointModifier(
+        symbol=model.WaypointModifierSymbol.UNSTABLE,
+        name="Unstable",
+        description="",
+    )
+    waypoint = factories.WaypointFactory.build(symbol="X1-A-GAS", modifiers=[unstable])
+    coordinator.observe("GET", "/systems/X1-A/waypoints/X1-A-GAS", waypoint)
+    assert not coordinator.is_hot("X1-A-GAS")
+
+    coordinator.observe_waypoint(waypoint)
+    assert coordinator.is_hot("X1-A-GAS")
+
+    # A stable listing fetched before the backoff started may be stale
+    stable = waypoint.model_copy(update={"modifiers": []})
+    coordinator.observe_waypoint(stable)
+    coordinator.observe_waypoint(stable, coordinator.cooled_at["X1-A-GAS"] - 1)
+    assert coordinator.is_hot("X1-A-GAS")
+    coordinator.observe_waypoint(stable, coordinator.cooled_at["X1-A-GAS"])
+    assert not coordinator.is_hot("X1-A-GAS")
+
+
+@pytest.mark.asyncio
+async def test_check_fetches_modifiers_past_the_cache():
+    async with MockSpaceTradersServer(ship_count=1) as server:
+        site = next(iter(server.waypoints))
+        server.waypoints[site] = server.waypoints[site].model_copy(update={"modifiers": []})
+        unstable = model.WaypointModifier(
+            symbol=model.WaypointModifierSymbol.UNSTABLE,
+            name="Unstable",
+            description="",
+        )
+        cache = UniverseCache()
+        cache.add_waypoint(server.waypoints[site].model_copy(update={"modifiers": [unstable]}))
+
+        async with SpaceTradersApi(
+            "token",
+            base_url=server.url,
+            rate_limiter=NoRateLimit(),
+            cache=cache,
+        ) as api:
+            coordinator = SiphonCoordinator(ShipActions(api), EventScheduler(), [site], {})
+            coordinator.cool_off(site)
+            count = server.request_count
+            assert not await coordinator.check(site)
+            assert server.request_count == count + 1
@@ -0,0 +1,101 @@
+from datetime import UTC, datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from aio_space_traders import model
+from aio_space_traders.api import SpaceTradersApi
+from aio_space_traders.cache import MarketCache
+from aio_space_traders.errors import SpaceTradersAPIError
+from aio_space_traders.markets import MarketWatch
+from aio_space_traders.utils import NoRateLimit
+from niquests.exceptions import ConnectionError as RequestsConnectionError
+from tests import factories
+from tests.mock_server import MockSpaceTradersServer
+
+
+def make_api(server: MockSpaceTradersServer, markets: MarketCache) -> SpaceTradersApi:
+    api = SpaceTradersApi("token", base_url=server.url, rate_limiter=NoRateLimit())
+    api.add_response_hook(markets.observe)
+    return api
+
+
+@pytest.mark.asyncio
+async def test_samples_markets_where_ships_are_within_budget():
+    markets = MarketCache()
+    async with MockSpaceTradersServer(ship_count=3, waypoint_count=3) as server:
+        for symbol, market in server.markets.items():
+            goods = [factories.MarketTradeGoodFactory.build()]
+            server.markets[symbol] = market.model_copy(update={"trade_goods": goods})
+        async with make_api(server, markets) as api:
+            watch = MarketWatch(api, markets, budget=2, waypoints=server.waypoints)
+            await api.list_ships(model.PaginationParameters(limit=20, page=1))
+            visited = {ship.nav.waypoint_symbol.root for ship in server.ships.values()}
+
+            count = server.request_count
+            sampled = await watch.sample()
+            assert len(sampled) == min(2, len(visited))
+            assert set(sampled) <= visited
+            assert all(markets.age(symbol) is not None for symbol in sampled)
+            assert server.request_count == count + len(sampled)
+
+            # Fresh prices aren't refetched and the budget is spent
+            assert await watch.sample() == []
+            assert watch.available() == 2 - len(sampled)
+
+
+def test_stale_thin_markets_come_first():
+    markets = MarketCache()
+    now = datetime.now(UTC)
+    for symbol, volume, age in [
+        ("X1-A-THIN", 10, 120),
+        ("X1-A-DEEP", 100, 600),
+        ("X1-A-FRESH", 10, 5),
+    ]:
+        goods = [factories.MarketTradeGoodFactory.build(trade_volume=volume)]
+        market = factories.MarketFactory.build(symbol=symbol, trade_goods=goods)
+        markets.add(market, observed_at=now - timedelta(seconds=age))
+    markets.add(factories.MarketFactory.build(symbol="X1-A-NEW", trade_goods=None))
+
+    watch = MarketWatch.__new__(MarketWatch)
+    watch.markets = markets
+    watch.waypoints = set()
+    watch.min_age = 30
+    watch.navs = {}
+    for index, symbol in enumerate(["X1-A-THIN", "X1-A-DEEP", "X1-A-FRESH", "X1-A-NEW"]):
+        nav = factories.ShipNavFactory.build(status=model.ShipNavStatus.DOCKED)
+        nav.waypoint_symbol = model.WaypointSymbol(symbol)
+        watch.navs[f"SHIP-{index}"] = nav
+
+    assert watch.priority("X1-A-THIN", now) == pytest.approx(12)
+    assert watch.priority("X1-A-DEEP", now) == pytest.approx(6)
+    assert watch.due(now) == ["X1-A-NEW", "X1-A-THIN", "X1-A-DEEP"]
+
+
+@pytest.mark.asyncio
+async def test_failed_samples_dont_stop_the_others():
+    api = MagicMock()
+    refused = RequestsConnectionError("Connection refused.")
+    broken = ValueError("Invalid market.")
+    api.get_market = AsyncMock(
+        side_effect=[
+            refused,
+            SpaceTradersAPIError(404, 4000, "Market not found.", {}),
+            broken,
+            model.GetMarketResponse(data=factories.MarketFactory.build()),
+        ],
+    )
+    watch = MarketWatch(api, MarketCache(), budget=5)
+    watch.due = lambda: ["X1-A-DOWN", "X1-A-GONE", "X1-A-BROKEN", "X1-A-OK"]
+
+    with pytest.raises(ExceptionGroup) as raised:
+        await watch.sample()
+    assert raised.value.exceptions == (refused, broken)
+    # Only the request that never reached the server isn't charged
+    assert watch.available() == 2
+
+    api.get_market.side_effect = None
+    api.get_market.return_value = model.GetMarketResponse(
+        data=factories.MarketFactory.build(),
+    )
+    watch.due = lambda: ["X1-A-OK"]
+    assert await watch.sample() == ["X1-A-OK"]
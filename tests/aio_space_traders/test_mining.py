@@ -0,0 +1,113 @@
+import asyncio
+
+import pytest
+from aio_space_traders import model
+from aio_space_traders.actions import ShipActions
+from aio_space_traders.api import SpaceTradersApi
+from aio_space_traders.mining import MiningSwarm, _stow
+from aio_space_traders.scheduler import EventScheduler
+from aio_space_traders.utils import NoRateLimit
+from tests.mock_server import MockSpaceTradersServer
+
+
+@pytest.mark.asyncio
+async def test_miners_keep_extracting_into_haulers():
+    async with MockSpaceTradersServer(
+        ship_count=3,
+        per_second_limit=10_000,
+        burst_limit=10_000,
+        time_scale=0.002,
+    ) as server:
+        for ship in server.ships.values():
+            ship.nav.waypoint_symbol = server.ships["MOCK-1"].nav.waypoint_symbol
+            ship.nav.status = model.ShipNavStatus.IN_ORBIT
+        waypoint_symbol = server.ships["MOCK-1"].nav.waypoint_symbol.root
+        unloaded = []
+
+        async with SpaceTradersApi(
+            "token",
+            base_url=server.url,
+            rate_limiter=NoRateLimit(),
+        ) as api:
+
+            async def unload(hauler: str) -> None:
+                unloaded.append(dict(server.ships[hauler].cargo.inventory[0]))
+                server.ships[hauler].cargo.inventory = []
+                server.ships[hauler].cargo.units = 0
+                await api.get_ship_cargo(hauler)
+
+            swarm = MiningSwarm(
+                ShipActions(api),
+                EventScheduler(),
+                waypoint_symbol,
+                {"IRON_ORE": 10},
+                unload=unload,
+            )
+            with pytest.raises(TimeoutError):
+                async with asyncio.timeout(1.5):
+                    await swarm.run(["MOCK-1", "MOCK-2"], ["MOCK-3"])
+
+    stats = swarm.stats
+    assert stats.extractions >= 10
+    assert stats.jettisoned > 0
+    assert stats.transferred > 0
+    assert unloaded
+    assert all(item["symbol"] == model.TradeSymbol.IRON_ORE for item in unloaded)
+    assert stats.extracted == (
+        stats.jettisoned
+        + stats.transferred
+        + server.ships["MOCK-1"].cargo.units
+        + server.ships["MOCK-2"].cargo.units
+    )
+
+
+@pytest.mark.asyncio
+async def test_miners_without_haulers_jettison_and_keep_extracting():
+    async with MockSpaceTradersServer(
+        ship_count=1,
+        per_second_limit=10_000,
+        burst_limit=10_000,
+        time_scale=0.002,
+    ) as server:
+        miner = server.ships["MOCK-1"]
+        miner.nav.status = model.ShipNavStatus.IN_ORBIT
+        miner.cargo.capacity = 20
+
+        async with SpaceTradersApi(
+            "token",
+            base_url=server.url,
+            rate_limiter=NoRateLimit(),
+        ) as api:
+            swarm = MiningSwarm(
+                ShipActions(api),
+                EventScheduler(),
+                miner.nav.waypoint_symbol.root,
+                {"IRON_ORE": 10},
+            )
+            with pytest.raises(TimeoutError):
+                async with asyncio.timeout(1):
+                    await swarm.run(["MOCK-1"])
+
+            assert swarm.observe not in api.response_hooks
+
+    assert swarm.stats.extracted > 20
+    assert swarm.stats.jettisoned > 0
+    assert swarm.stats.transferred == 0
+
+
+def test_stow_adds_units_to_the_receiving_hold():
+    iron = model.ShipCargoItem(
+        symbol=model.TradeSymbol.IRON_ORE,
+        name="Iron ore",
+        description="",
+        units=5,
+    )
+    cargo = model.ShipCargo(capacity=40, units=5, inventory=[iron])
+    copper = iron.model_copy(update={"symbol": model.TradeSymbol.COPPER_ORE})
+
+    cargo = _stow(_stow(cargo, iron, 3), copper, 2)
+    assert cargo.units == 10
+    assert [(item.symbol, item.units) for item in cargo.inventory] == [
+        (model.TradeSymbol.IRON_ORE, 8),
+        (model.TradeSymbol.COPPER_ORE, 2),
+    ]
@@ -0,0 +1,153 @@
+import asyncio
+
+import pytest
+from aio_space_traders import errors, model
+from aio_space_traders.actions import ShipActions
+from aio_space_traders.api import SpaceTradersApi
+from aio_space_traders.utils import AsyncRateLimit
+from tests import factories
+from tests.mock_server import MockSpaceTradersServer
+
+
+def make_api(server: MockSpaceTradersServer, token: str = "token") -> SpaceTradersApi:
+    return SpaceTradersApi(
+        token,
+        base_url=server.url,
+        rate_limiter=AsyncRateLimit(10_000, 1_000_000),
+    )
+
+
+@pytest.mark.asyncio
+async def test_serves_the_same_universe_for_a_seed():
+    async with MockSpaceTradersServer(ship_count=25, seed=7) as server:
+        async with make_api(server) as api:
+            page = await api.list_ships(model.PaginationParameters(limit=20, page=2))
+            ship = await api.get_ship("MOCK-21")
+
+    assert page.meta.total == 25
+    assert [s.symbol for s in page.data] == [f"MOCK-{n}" for n in range(21, 26)]
+    assert ship.data == page.data[0]
+    again = MockSpaceTradersServer(ship_count=25, seed=7).ships["MOCK-21"]
+    assert again.model_dump(exclude={"nav"}) == ship.data.model_dump(exclude={"nav"})
+
+
+@pytest.mark.asyncio
+async def test_simulates_nav_rules_cooldowns_and_transit():
+    async with MockSpaceTradersServer(ship_count=1, time_scale=0.001) as server:
+        async with make_api(server) as api:
+            with pytest.raises(errors.ShipNotInOrbitError):
+                await api.extract_resources("MOCK-1")
+
+            await api.orbit_ship("MOCK-1")
+            extraction = await api.extract_resources("MOCK-1")
+            assert extraction.data.cooldown.remaining_seconds > 0
+            with pytest.raises(errors.CooldownConflictError):
+                await api.extract_resources("MOCK-1")
+
+            here = server.ships["MOCK-1"].nav.waypoint_symbol.root
+            there = next(symbol for symbol in server.waypoints if symbol != here)
+            navigation = await api.navigate_ship("MOCK-1", there)
+            assert navigation.data.nav.status == model.ShipNavStatus.IN_TRANSIT
+            with pytest.raises(errors.ShipInTransitError):
+                await api.dock_ship("MOCK-1")
+
+            await asyncio.sleep(0.5)
+            nav = await api.get_ship_nav("MOCK-1")
+            assert nav.data.status == model.ShipNavStatus.IN_ORBIT
+            assert nav.data.waypoint_symbol.root == there
+
+
+@pytest.mark.asyncio
+async def test_injected_errors_and_rate_limits():
+    server = MockSpaceTradersServer(ship_count=1, per_second_limit=1, burst_limit=2)
+    async with server:
+        async with make_api(server) as api:
+            server.fail_next(4604)
+            with pytest.raises(errors.MarketTradeUnitLimitError):
+                await api.get_agent()
+
+            await api.get_agent()
+            with pytest.raises(errors.SpaceTradersAPIError) as exc_info:
+                await api.get_agent()
+            assert exc_info.value.status_code == 429
+            assert exc_info.value.data["error"]["data"]["retryAfter"] > 0
+
+            # Buckets are per token
+            async with make_api(server, token="other") as other:
+                await other.get_agent()
+
+
+@pytest.mark.asyncio
+async def test_actions_against_the_mock_server():
+    async with MockSpaceTradersServer(ship_count=1, time_scale=0.001) as server:
+        async with make_api(server) as api:
+            actions = ShipActions(api)
+            await actions.extract("MOCK-1")
+            cargo = server.ships["MOCK-1"].cargo.inventory[0]
+            await actions.sell(
+                "MOCK-1",
+                model.SellCargoObject(symbol=cargo.symbol, units=cargo.units),
+            )
+
+    assert list(server.requests) == [
+        ("POST", "/my/ships/MOCK-1/orbit"),
+        ("POST", "/my/ships/MOCK-1/extract"),
+        ("POST", "/my/ships/MOCK-1/dock"),
+        ("POST", "/my/ships/MOCK-1/sell"),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_surveys_purchases_and_construction():
+    async with MockSpaceTradersServer(ship_count=1, time_scale=0.001) as server:
+        ship = server.ships["MOCK-1"]
+        here = ship.nav.waypoint_symbol.root
+        good = factories.MarketTradeGoodFactory.build(symbol=model.TradeSymbol.FAB_MATS)
+        server.markets[here].trade_goods = [good]
+        async with make_api(server) as api:
+            actions = ShipActions(api)
+            survey = (await actions.survey("MOCK-1")).data.surveys[0]
+            await asyncio.sleep(0.1)
+            extraction = await actions.extract_with_survey("MOCK-1", survey)
+            deposits = {deposit.symbol for deposit in survey.deposits}
+            assert extraction.data.extraction.yield_.symbol in deposits
+            server.surveys[survey.signature] = (server.surveys[survey.signature][0], 1)
+            await asyncio.sleep(0.1)
+            await actions.extract_with_survey("MOCK-1", survey)
+            await asyncio.sleep(0.1)
+            with pytest.raises(errors.ShipSurveyVerificationError):
+                await actions.extract_with_survey("MOCK-1", survey)
+
+            purchase = await actions.purchase(
+                "MOCK-1",
+                model.PurchaseCargoObject(symbol=good.symbol, units=1),
+            )
+            assert purchase.data.transaction.total_price == good.purchase_price
+
+            server.constructions[here] = model.Construction(
+                symbol=here,
+                is_complete=False,
+                materials=[
+                    model.ConstructionMaterial(trade_symbol=good.symbol, required=1, fulfilled=0),
+                ],
+            )
+            supplied = await actions.supply_construction(
+                "X1-MOCK",
+                here,
+                model.SupplyConstructionSiteObject(
+                    ship_symbol="MOCK-1",
+                    trade_symbol=good.symbol,
+                    units=1,
+                ),
+            )
+            assert supplied.data.construction.is_complete
+            with pytest.raises(errors.ConstructionMaterialFulfilled):
+                await actions.supply_construction(
+                    "X1-MOCK",
+                    here,
+                    model.SupplyConstructionSiteObject(
+                        ship_symbol="MOCK-1",
+                        trade_symbol=good.symbol,
+                        units=1,
+                    ),
+                )
@@ -0,0 +1,69 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pytest
+from aio_space_traders import model
+from aio_space_traders.api import SpaceTradersApi
+from aio_space_traders.utils import NoRateLimit
+from tests.mock_server import SYSTEM_SYMBOL, MockSpaceTradersServer
+
+
+class CountingExecutor(ThreadPoolExecutor):
+    def __init__(self) -> None:
+        super().__init__(max_workers=1)
+        self.submitted = 0
+
+    def submit(self, fn, /, *args, **kwargs):
+        self.submitted += 1
+        return super().submit(fn, *args, **kwargs)
+
+
+async def list_waypoints(api: SpaceTradersApi) -> model.ListWaypointsInSystemResponse:
+    return await api._request(
+        model.ListWaypointsInSystemResponse,
+        "GET",
+        f"/systems/{SYSTEM_SYMBOL}/waypoints",
+        params={"limit": 20, "page": 1},
+    )
+
+
+@pytest.mark.asyncio
+async def test_only_large_bodies_are_offloaded():
+    with CountingExecutor() as executor:
+        async with MockSpaceTradersServer(waypoint_count=20) as server:
+            api = SpaceTradersApi(
+                "token",
+                base_url=server.url,
+                rate_limiter=NoRateLimit(),
+                executor=executor,
+                offload_threshold=4096,
+            )
+            hooked = []
+            api.add_response_hook(lambda method, url, result: hooked.append(result))
+            async with api:
+                await api.get_agent()
+                assert executor.submitted == 0
+
+                waypoints = await list_waypoints(api)
+                assert executor.submitted == 1
+
+    assert isinstance(waypoints, model.ListWaypointsInSystemResponse)
+    assert len(waypoints.data) == 20
+    assert hooked[-1] is waypoints
+
+
+@pytest.mark.asyncio
+async def test_process_pool_returns_the_same_models():
+    spawn = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=1, mp_context=spawn) as executor:
+        async with MockSpaceTradersServer(waypoint_count=20) as server:
+            inline = SpaceTradersApi("token", base_url=server.url, rate_limiter=NoRateLimit())
+            offloaded = SpaceTradersApi(
+                "token",
+                base_url=server.url,
+                rate_limiter=NoRateLimit(),
+                executor=executor,
+                offload_threshold=0,
+            )
+            async with inline, offloaded:
+                assert await list_waypoints(offloaded) == await list_waypoints(inline)
@@ -0,0 +1,92 @@
+import asyncio
+
+import pytest
+from aio_space_traders import cache as cache_module
+from aio_space_traders import model
+from aio_space_traders.cache import UniverseCache
+from aio_space_traders.pool import AgentPool, FairSemaphore
+from aio_space_traders.utils import NoRateLimit
+from tests import factories
+from tests.mock_server import SYSTEM_SYMBOL, MockSpaceTradersServer
+
+
+@pytest.mark.asyncio
+async def test_fair_semaphore_alternates_between_keys():
+    semaphore = FairSemaphore(1)
+    order: list[str] = []
+
+    async def request(key: str) -> None:
+        async with semaphore.lane(key):
+            order.append(key)
+            await asyncio.sleep(0)
+
+    await semaphore.acquire("busy")
+    tasks = [asyncio.create_task(request("busy")) for _ in range(4)]
+    await asyncio.sleep(0)
+    tasks += [asyncio.create_task(request(key)) for key in ("a", "b")]
+    await asyncio.sleep(0)
+    assert semaphore.waiting() == 6
+
+    semaphore.release()
+    await asyncio.gather(*tasks)
+
+    assert order == ["busy", "a", "b", "busy", "busy", "busy"]
+    assert semaphore.active == 0
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_gives_up_its_turn():
+    semaphore = FairSemaphore(1)
+    await semaphore.acquire("a")
+    cancelled = asyncio.create_task(semaphore.acquire("b"))
+    waiting = asyncio.create_task(semaphore.acquire("c"))
+    await asyncio.sleep(0)
+
+    cancelled.cancel()
+    await asyncio.sleep(0)
+    semaphore.release()
+    await asyncio.wait_for(waiting, 1)
+
+    assert semaphore.active == 1
+    semaphore.release()
+    assert semaphore.active == 0
+
+
+@pytest.mark.asyncio
+async def test_agents_share_session_and_cache_with_their_own_tokens():
+    server = MockSpaceTradersServer(ship_count=1, per_second_limit=10**9, burst_limit=10**9)
+    async with server:
+        async with AgentPool(
+            base_url=server.url,
+            rate_limiter_factory=NoRateLimit,
+            max_in_flight=2,
+        ) as pool:
+            first = pool.add("FIRST", "token-1")
+            second = pool.add("SECOND", "token-2")
+            assert first.session is second.session
+            assert first.rate_limiter is not second.rate_limiter
+
+            await asyncio.gather(*(agent.get_agent() for agent in (first, second)))
+            waypoint = next(iter(server.waypoints))
+            await first.get_waypoint(SYSTEM_SYMBOL, waypoint)
+            cached = await second.get_waypoint(SYSTEM_SYMBOL, waypoint)
+
+    assert isinstance(cached, model.GetWaypointResponse)
+    assert server.request_count == 3
+    assert set(server._buckets) == {"Bearer token-1", "Bearer token-2"}
+
+
+def test_shared_cache_expires_waypoints_but_not_systems(monkeypatch):
+    now = 1000.0
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: now)
+    cache = UniverseCache()
+    system = factories.SystemFactory.build(symbol="X1-A")
+    waypoint = factories.WaypointFactory.build(symbol="X1-A-B1", system_symbol="X1-A")
+    cache.add_system(system)
+    cache.add_waypoint(waypoint)
+    assert cache.waypoint("X1-A-B1") is waypoint
+
+    now += 301
+    assert cache.waypoint("X1-A-B1") is None
+    assert cache.waypoints["X1-A-B1"] is waypoint
+    assert cache.system("X1-A") is system
@@ -0,0 +1,190 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from aio_space_traders import model
+from aio_space_traders.actions import ShipActions
+from aio_space_traders.api import SpaceTradersApi
+from aio_space_traders.cache import MarketCache
+from aio_space_traders.errors import ShipMissingRefineryError
+from aio_space_traders.mining import MiningSwarm
+from aio_space_traders.refining import RECIPES, RefineryPlanner
+from aio_space_traders.scheduler import EventScheduler
+from aio_space_traders.utils import NoRateLimit
+from tests import factories
+from tests.mock_server import MockSpaceTradersServer
+
+
+def make_markets(prices: dict[str, int]) -> MarketCache:
+    markets = MarketCache()
+    goods = [
+        factories.MarketTradeGoodFactory.build(symbol=symbol, sell_price=price)
+        for symbol, price in prices.items()
+    ]
+    markets.add(factories.MarketFactory.build(symbol="X1-A-MARKET", trade_goods=goods))
+    return markets
+
+
+def test_chooses_the_most_profitable_refine_in_the_hold():
+    planner = RefineryPlanner.__new__(RefineryPlanner)
+    planner.markets = make_markets(
+        {"IRON": 40, "IRON_ORE": 10, "COPPER": 90, "COPPER_ORE": 20, "GOLD": 10, "GOLD_ORE": 5},
+    )
+    planner.recipes = dict(RECIPES)
+    planner.produces = {"REFINERY": set(RECIPES)}
+    inventory = [
+        model.ShipCargoItem(symbol=symbol, name=symbol, description="", units=units)
+        for symbol, units in [("IRON_ORE", 30), ("COPPER_ORE", 30), ("GOLD_ORE", 60)]
+    ]
+    planner.cargo = {
+        "REFINERY": model.ShipCargo(capacity=200, units=120, inventory=inventory),
+    }
+
+    assert planner.margin(RECIPES["IRON"]) == 100
+    assert planner.margin(RECIPES["GOLD"]) == -50
+    assert planner.choose("REFINERY") == RECIPES["COPPER"]
+    assert planner.input_values() == {"IRON_ORE": pytest.approx(40 / 3), "COPPER_ORE": 30}
+
+    planner.produces["REFINERY"] = {"GOLD"}
+    assert planner.choose("REFINERY") is None
+
+
+@pytest.mark.asyncio
+async def test_miners_keep_a_refinery_busy():
+    async with MockSpaceTradersServer(
+        ship_count=3,
+        per_second_limit=10_000,
+        burst_limit=10_000,
+        time_scale=0.002,
+    ) as server:
+        for ship in server.ships.values():
+            ship.nav.waypoint_symbol = server.ships["MOCK-1"].nav.waypoint_symbol
+            ship.nav.status = model.ShipNavStatus.IN_ORBIT
+        server.ships["MOCK-3"].cargo.capacity = 60
+
+        async with SpaceTradersApi(
+            "token",
+            base_url=server.url,
+            rate_limiter=NoRateLimit(),
+        ) as api:
+            actions = ShipActions(api)
+            scheduler = EventScheduler()
+            swarm = MiningSwarm(
+                actions,
+                scheduler,
+                server.ships["MOCK-1"].nav.waypoint_symbol.root,
+                {},
+            )
+            planner = RefineryPlanner(
+                actions,
+                scheduler,
+                make_markets({"IRON": 40, "IRON_ORE": 10, "COPPER": 1, "COPPER_ORE": 10}),
+            )
+            planner.feed_from(swarm)
+            assert swarm.values == {"IRON_ORE": pytest.approx(40 / 3)}
+
+            with pytest.raises(TimeoutError):
+                async with asyncio.timeout(2):
+                    async with asyncio.TaskGroup() as group:
+                        swarm.start(group, ["MOCK-1", "MOCK-2"], ["MOCK-3"])
+                        group.create_task(planner.run(["MOCK-3"]))
+            assert planner.observe not in api.response_hooks
+
+    assert planner.stats.refines >= 1
+    assert planner.stats.produced == 10 * planner.stats.refines
+    assert swarm.stats.jettisoned > 0
+    held = {item.symbol: item.units for item in server.ships["MOCK-3"].cargo.inventory}
+    assert held[model.TradeSymbol.IRON] == 10 * planner.stats.refines
+    assert model.TradeSymbol.COPPER_ORE not in held
+
+
+@pytest.mark.asyncio
+async def test_full_refineries_refine_sell_and_rejoin():
+    async with MockSpaceTradersServer(
+        ship_count=3,
+        per_second_limit=10_000,
+        burst_limit=10_000,
+        time_scale=0.001,
+    ) as server:
+        for ship in server.ships.values():
+            ship.nav.waypoint_symbol = server.ships["MOCK-1"].nav.waypoint_symbol
+            ship.nav.status = model.ShipNavStatus.IN_ORBIT
+        server.ships["MOCK-1"].cargo.capacity = 20
+        server.ships["MOCK-2"].cargo.capacity = 20
+        server.ships["MOCK-3"].cargo.capacity = 60
+        sold = []
+
+        async with SpaceTradersApi(
+            "token",
+            base_url=server.url,
+            rate_limiter=NoRateLimit(),
+        ) as api:
+
+            async def sell(refinery: str) -> None:
+                held = server.ships[refinery].cargo.inventory
+                sold.append({item.symbol: item.units for item in held})
+                server.ships[refinery].cargo.inventory = []
+                server.ships[refinery].cargo.units = 0
+                await api.get_ship_cargo(refinery)
+
+            actions = ShipActions(api)
+            scheduler = EventScheduler()
+            swarm = MiningSwarm(
+                actions,
+                scheduler,
+                server.ships["MOCK-1"].nav.waypoint_symbol.root,
+                {},
+            )
+            planner = RefineryPlanner(
+                actions,
+                scheduler,
+                make_markets({"IRON": 40, "IRON_ORE": 10, "COPPER": 1, "COPPER_ORE": 10}),
+                sell=sell,
+            )
+            planner.feed_from(swarm)
+
+            with pytest.raises(TimeoutError):
+                async with asyncio.timeout(3):
+                    async with asyncio.TaskGroup() as group:
+                        swarm.start(group, ["MOCK-1", "MOCK-2"], ["MOCK-3"])
+                        group.create_task(planner.run(["MOCK-3"]))
+
+    # Each refine frees room for more ore until iron fills the hold, then
+    # the refinery sells and is filled again
+    assert planner.stats.refines >= 4
+    assert sold
+    held = {item.symbol: item.units for item in server.ships["MOCK-3"].cargo.inventory}
+    iron = sum(sale.get(model.TradeSymbol.IRON, 0) for sale in sold)
+    assert iron + held.get(model.TradeSymbol.IRON, 0) == planner.stats.produced
+    assert held.get(model.TradeSymbol.IRON, 0) > 0
+    assert swarm.haulers == {"MOCK-3"}
+
+
+@pytest.mark.asyncio
+async def test_input_stowed_during_a_hand_back_isnt_missed():
+    api = MagicMock()
+    api.get_ship_cargo = AsyncMock()
+    # Ends the loop once the refinery tries to refine
+    api.ship_refine = AsyncMock(
+        side_effect=ShipMissingRefineryError(400, 4239, "No refinery.", {}),
+    )
+    planner = RefineryPlanner(
+        ShipActions(api),
+        EventScheduler(),
+        make_markets({"IRON": 40, "IRON_ORE": 10}),
+        poll_interval=60,
+    )
+    ore = model.ShipCargoItem(symbol="IRON_ORE", name="Iron ore", description="", units=30)
+
+    async def offer(ship_symbol: str) -> None:
+        await asyncio.sleep(0)
+        planner.stowed(ship_symbol, model.ShipCargo(capacity=60, units=30, inventory=[ore]))
+
+    swarm = MagicMock(values={}, parked={"REFINERY"})
+    swarm.offer = AsyncMock(side_effect=offer)
+    planner.feed_from(swarm)
+
+    async with asyncio.timeout(1):
+        await planner.work("REFINERY")
+
+    api.ship_refine.assert_awaited_once_with("REFINERY", "IRON")
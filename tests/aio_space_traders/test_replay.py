@@ -0,0 +1,69 @@
+import time
+
+import pytest
+from aio_space_traders import errors, model
+from aio_space_traders.api import SpaceTradersApi
+from aio_space_traders.replay import (
+    RecordingSession,
+    ReplayMissError,
+    read_records,
+    replay_api,
+)
+from aio_space_traders.utils import NoRateLimit
+from tests.mock_server import MockSpaceTradersServer
+
+
+async def record(path) -> list[model.Ship]:
+    async with MockSpaceTradersServer(ship_count=3) as server:
+        api = SpaceTradersApi("token", base_url=server.url, rate_limiter=NoRateLimit())
+        api.session = RecordingSession(api.session, path)
+        async with api:
+            ships = await api.list_ships(model.PaginationParameters(limit=2, page=1))
+            await api.get_ship("MOCK-1")
+            await api.get_ship("MOCK-1")
+            server.fail_next(4214)
+            with pytest.raises(errors.ShipInTransitError):
+                await api.dock_ship("MOCK-1")
+    return ships.data
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("name", ["traffic.jsonl", "traffic.jsonl.gz"])
+async def test_replays_recorded_traffic(tmp_path, name):
+    path = tmp_path / name
+    ships = await record(path)
+    assert len(list(read_records(path))) == 4
+
+    async with replay_api(path) as api:
+        replayed = await api.list_ships(model.PaginationParameters(limit=2, page=1))
+        assert replayed.data == ships
+        await api.get_ship("MOCK-1")
+        await api.get_ship("MOCK-1")
+        with pytest.raises(errors.ShipInTransitError):
+            await api.dock_ship("MOCK-1")
+
+        with pytest.raises(ReplayMissError):
+            await api.get_ship("MOCK-1")
+        with pytest.raises(ReplayMissError):
+            await api.list_ships(model.PaginationParameters(limit=2, page=2))
+        assert len(api.session) == 0
+
+
+@pytest.mark.asyncio
+async def test_virtual_time_follows_the_recording(tmp_path):
+    path = tmp_path / "traffic.jsonl"
+    lines = [
+        '{"t":1000.0,"d":0.5,"m":"GET","u":"/my/agent","p":null,"b":null,"s":200,"r":"{}"}',
+        '{"t":1100.0,"d":0.5,"m":"GET","u":"/my/agent","p":null,"b":null,"s":200,"r":"{}"}',
+    ]
+    path.write_text("\n".join(lines) + "\n")
+
+    api = replay_api(path, speed=1000)
+    session = api.session
+    await session.request("GET", "/my/agent")
+    assert session.now().timestamp() == 1000.5
+
+    start = time.perf_counter()
+    await session.request("GET", "/my/agent")
+    assert 0.09 < time.perf_counter() - start < 0.5
+    assert session.now().timestamp() == 1100.5
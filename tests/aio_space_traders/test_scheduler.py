@@ -0,0 +1,66 @@
+import asyncio
+from datetime import UTC, datetime, timedelta
+
+import pytest
+from aio_space_traders import model
+from aio_space_traders.scheduler import EventScheduler, ShipEvent
+from tests import factories
+
+
+def in_seconds(seconds: float) -> datetime:
+    return datetime.now(UTC) + timedelta(seconds=seconds)
+
+
+@pytest.mark.asyncio
+async def test_wait_returns_when_cooldown_expires():
+    scheduler = EventScheduler()
+    cooldown = factories.CooldownFactory.build(
+        ship_symbol="SHIP-1",
+        remaining_seconds=1,
+        expiration=in_seconds(0.05),
+    )
+    scheduler.schedule_cooldown(cooldown)
+    assert scheduler.pending(ShipEvent.COOLDOWN, "SHIP-1")
+
+    await asyncio.wait_for(scheduler.wait(ShipEvent.COOLDOWN, "SHIP-1"), 1)
+    assert not scheduler.pending(ShipEvent.COOLDOWN, "SHIP-1")
+
+
+@pytest.mark.asyncio
+async def test_wait_without_deadline_returns_immediately():
+    scheduler = EventScheduler()
+    await asyncio.wait_for(scheduler.wait(ShipEvent.ARRIVAL, "SHIP-1"), 0.1)
+
+
+@pytest.mark.asyncio
+async def test_events_fire_in_deadline_order_and_reschedule_replaces():
+    scheduler = EventScheduler()
+    fired: list[tuple[ShipEvent, str]] = []
+    scheduler.subscribe(lambda event, ship: fired.append((event, ship)))
+
+    scheduler.schedule(ShipEvent.ARRIVAL, "SHIP-1", in_seconds(0.01))
+    scheduler.schedule(ShipEvent.ARRIVAL, "SHIP-2", in_seconds(0.02))
+    scheduler.schedule(ShipEvent.ARRIVAL, "SHIP-1", in_seconds(0.04))
+
+    await asyncio.wait_for(scheduler.wait(ShipEvent.ARRIVAL, "SHIP-1"), 1)
+    assert fired == [
+        (ShipEvent.ARRIVAL, "SHIP-2"),
+        (ShipEvent.ARRIVAL, "SHIP-1"),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_observe_schedules_arrival_from_nav_response():
+    scheduler = EventScheduler()
+    nav = factories.ShipNavFactory.build(status=model.ShipNavStatus.IN_TRANSIT)
+    nav.route.arrival = in_seconds(60)
+    response = model.NavigateShipResponse.model_construct(
+        data=model.NavigateShipData.model_construct(nav=nav, fuel=None, events=[]),
+    )
+
+    scheduler.observe("POST", "/my/ships/SHIP-1/navigate", response)
+    assert scheduler.pending(ShipEvent.ARRIVAL, "SHIP-1")
+    assert 59 < scheduler.remaining(ShipEvent.ARRIVAL, "SHIP-1") <= 60
+
+    scheduler.close()
+    assert len(scheduler) == 0
@@ -0,0 +1,100 @@
+import asyncio
+
+import pytest
+from aio_space_traders import model
+from aio_space_traders.api import SpaceTradersApi
+from aio_space_traders.cache import ShipReadCache
+from aio_space_traders.utils import NoRateLimit
+from tests import factories
+from tests.mock_server import MockSpaceTradersServer
+
+
+def make_api(server: MockSpaceTradersServer, cache: ShipReadCache) -> SpaceTradersApi:
+    return SpaceTradersApi(
+        "token",
+        base_url=server.url,
+        rate_limiter=NoRateLimit(),
+        ship_cache=cache,
+    )
+
+
+@pytest.mark.asyncio
+async def test_repeated_and_concurrent_reads_share_requests():
+    cache = ShipReadCache(max_age=0.2)
+    async with MockSpaceTradersServer(ship_count=1, latency=0.02) as server:
+        async with make_api(server, cache) as api:
+            first = await api.get_ship("MOCK-1")
+            assert await api.get_ship("MOCK-1") is first
+            navs = await asyncio.gather(*(api.get_ship_nav("MOCK-1") for _ in range(5)))
+            assert server.request_count == 2
+            assert all(nav is navs[0] for nav in navs)
+
+            await asyncio.sleep(0.25)
+            await api.get_ship("MOCK-1")
+            assert server.request_count == 3
+    assert (cache.hits, cache.misses) == (5, 3)
+
+
+@pytest.mark.asyncio
+async def test_writes_replace_cached_state_for_that_ship():
+    cache = ShipReadCache(max_age=60)
+    async with MockSpaceTradersServer(ship_count=2) as server:
+        async with make_api(server, cache) as api:
+            await api.get_ship("MOCK-1")
+            await api.get_ship_nav("MOCK-1")
+            await api.get_ship_nav("MOCK-2")
+            count = server.request_count
+
+            docked = await api.dock_ship("MOCK-1")
+            nav = await api.get_ship_nav("MOCK-1")
+            assert nav.data == docked.data
+            assert nav.data.status == model.ShipNavStatus.DOCKED
+            await api.get_ship_nav("MOCK-2")
+            assert server.request_count == count + 1
+
+            ship = await api.get_ship("MOCK-1")
+            assert ship.data.nav.status == model.ShipNavStatus.DOCKED
+            assert server.request_count == count + 2
+
+
+@pytest.mark.asyncio
+async def test_reads_in_flight_during_a_write_are_not_cached():
+    cache = ShipReadCache(max_age=60)
+    release = asyncio.Event()
+    stale = model.GetShipNavResponse(data=factories.ShipNavFactory.build())
+
+    async def slow_fetch():
+        await release.wait()
+        return stale
+
+    read = asyncio.create_task(cache.read("S-1", "nav", slow_fetch))
+    await asyncio.sleep(0)
+    cache.observe("POST", "/my/ships/S-1/orbit", object())
+    release.set()
+
+    assert await read is stale
+    assert cache.get("S-1", "nav") is None
+
+
+@pytest.mark.asyncio
+async def test_cancelling_the_first_reader_doesnt_cancel_the_others():
+    cache = ShipReadCache(max_age=60)
+    response = model.GetShipNavResponse(data=factories.ShipNavFactory.build())
+    fetches = 0
+
+    async def slow_fetch():
+        nonlocal fetches
+        fetches += 1
+        await asyncio.sleep(0.05)
+        return response
+
+    leader = asyncio.create_task(cache.read("S-1", "nav", slow_fetch))
+    await asyncio.sleep(0)
+    follower = asyncio.create_task(cache.read("S-1", "nav", slow_fetch))
+    await asyncio.sleep(0)
+    leader.cancel()
+
+    assert await follower is response
+    assert leader.cancelled()
+    assert fetches == 2
+    assert cache.get("S-1", "nav") is response
@@ -0,0 +1,79 @@
+from aio_space_traders import model
+from aio_space_traders.cache import UniverseCache
+from aio_space_traders.shipyards import ShipyardCache
+from tests import factories
+
+DRONE = model.ShipType.SHIP_MINING_DRONE
+PROBE = model.ShipType.SHIP_PROBE
+
+
+def make_universe() -> UniverseCache:
+    universe = UniverseCache()
+    for symbol, x in [("X1-A-HOME", 10), ("X1-A-NEAR", 0), ("X1-A-FAR", 300), ("X1-B-AWAY", 0)]:
+        universe.add_waypoint(
+            factories.WaypointFactory.build(
+                symbol=symbol,
+                system_symbol=symbol[:4],
+                x=x,
+                y=0,
+            ),
+        )
+    return universe
+
+
+def shipyard(symbol: str, prices: dict[model.ShipType, int] | None) -> model.Shipyard:
+    ships = None
+    if prices is not None:
+        ships = []
+        for ship_type, price in prices.items():
+            ship = factories.ShipyardShipFactory.build(type=ship_type, purchase_price=price)
+            ship.engine.speed = 30
+            ships.append(ship)
+    return factories.ShipyardFactory.build(symbol=symbol, ships=ships)
+
+
+def test_indexes_cheapest_and_best_delivered_offers():
+    shipyards = ShipyardCache(make_universe(), credits_per_second=1)
+    shipyards.need("X1-A-HOME")
+    shipyards.add(shipyard("X1-A-FAR", {DRONE: 1000, PROBE: 50}))
+    shipyards.add(shipyard("X1-A-NEAR", {DRONE: 1100}))
+    shipyards.add(shipyard("X1-B-AWAY", {DRONE: 500}))
+
+    assert shipyards.cheapest(DRONE).waypoint_symbol == "X1-B-AWAY"
+    best = shipyards.best(DRONE, "X1-A-HOME")
+    assert (best.waypoint_symbol, best.price, best.delivery) == ("X1-A-NEAR", 1100, 23)
+    assert shipyards.best(PROBE, "X1-A-HOME").total == 50 + 257
+
+    # A dearer nearby drone loses to the far one, prices survive remote reads
+    shipyards.add(shipyard("X1-A-NEAR", {DRONE: 1500}))
+    shipyards.add(shipyard("X1-A-NEAR", None))
+    assert shipyards.best(DRONE, "X1-A-HOME").waypoint_symbol == "X1-A-FAR"
+    assert shipyards.age("X1-A-NEAR") is not None
+
+    shipyards.add(shipyard("X1-A-FAR", {PROBE: 50}))
+    assert shipyards.best(DRONE, "X1-A-HOME").waypoint_symbol == "X1-A-NEAR"
+    shipyards.add(shipyard("X1-B-AWAY", {}))
+    assert shipyards.cheapest(DRONE).price == 1500
+
+
+def test_destinations_registered_late_are_ranked():
+    shipyards = ShipyardCache(make_universe())
+    shipyards.add(shipyard("X1-A-FAR", {DRONE: 1000}))
+    shipyards.add(shipyard("X1-B-AWAY", {DRONE: 500}))
+
+    assert shipyards.best(DRONE, "X1-A-NEAR").waypoint_symbol == "X1-A-FAR"
+    assert shipyards.best(DRONE, "X1-B-AWAY").total == 500
+    assert shipyards.best(PROBE, "X1-A-NEAR") is None
+
+
+def test_shipyards_seen_before_their_waypoint_are_ranked_once_it_is_known():
+    universe = make_universe()
+    shipyards = ShipyardCache(universe, credits_per_second=1)
+    shipyards.add(shipyard("X1-A-FAR", {DRONE: 1000}))
+    shipyards.add(shipyard("X1-A-LATE", {DRONE: 1000}))
+    assert shipyards.best(DRONE, "X1-A-HOME").waypoint_symbol == "X1-A-FAR"
+
+    universe.add_waypoint(
+        factories.WaypointFactory.build(symbol="X1-A-LATE", system_symbol="X1-A", x=10, y=0),
+    )
+    assert shipyards.best(DRONE, "X1-A-HOME").waypoint_symbol == "X1-A-LATE"
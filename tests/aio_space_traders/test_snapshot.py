@@ -0,0 +1,48 @@
+import gzip
+import json
+
+import pytest
+from aio_space_traders.cache import UniverseCache
+from aio_space_traders.snapshot import import_universe, iter_records
+from tests import factories
+
+
+def dump(item) -> dict:
+    return item.model_dump(mode="json", by_alias=True)
+
+
+def test_iter_records_streams_across_chunk_boundaries(tmp_path):
+    path = tmp_path / "universe.json"
+    path.write_text(
+        json.dumps({"meta": {"total": 3}, "data": [1234, {"a": [1, 2]}, "x,]"]}),
+    )
+
+    assert list(iter_records(path, chunk_size=3)) == [1234, {"a": [1, 2]}, "x,]"]
+
+
+def test_iter_records_reads_top_level_arrays(tmp_path):
+    path = tmp_path / "universe.json"
+    path.write_text(" [ ] ")
+    assert list(iter_records(path)) == []
+
+    path.write_text('[{"a": 1}, {"b": 2}]')
+    assert list(iter_records(path, chunk_size=4)) == [{"a": 1}, {"b": 2}]
+
+
+@pytest.mark.parametrize("workers", [0, 2])
+def test_import_universe_fills_cache(tmp_path, workers):
+    systems = factories.SystemFactory.batch(3)
+    waypoints = factories.WaypointFactory.batch(20)
+    path = tmp_path / "universe.jsonl.gz"
+    with gzip.open(path, "wt", encoding="utf-8") as file:
+        file.write(json.dumps({"data": [dump(s) for s in systems]}) + "\n")
+        for waypoint in waypoints:
+            file.write(json.dumps(dump(waypoint)) + "\n")
+        file.write(json.dumps({"symbol": "broken"}) + "\n")
+
+    cache = UniverseCache()
+    stats = import_universe(path, cache, workers=workers, batch_size=4)
+
+    assert (stats.systems, stats.waypoints, stats.invalid) == (3, 20, 1)
+    assert cache.system(systems[1].symbol) == systems[1]
+    assert cache.waypoint(waypoints[7].symbol.root) == waypoints[7]
@@ -0,0 +1,123 @@
+import contextlib
+import json
+
+import pytest
+from aio_space_traders import model
+from aio_space_traders.api import SpaceTradersApi
+from aio_space_traders.cache import UniverseCache
+from aio_space_traders.diagnostics import Diagnostics
+from aio_space_traders.streaming import JSONStreamDecoder
+from aio_space_traders.tracing import InMemorySpanExporter, LocalTracer
+from aio_space_traders.utils import NoRateLimit
+from tests.mock_server import SYSTEM_SYMBOL, MockSpaceTradersServer
+
+
+def decode(document: bytes, chunk_size: int) -> tuple[list, JSONStreamDecoder]:
+    decoder = JSONStreamDecoder()
+    items = []
+    for start in range(0, len(document), chunk_size):
+        items.extend(decoder.feed(document[start : start + chunk_size]))
+    items.extend(decoder.close())
+    return items, decoder
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 5, 1000])
+def test_decoder_yields_elements_across_chunks(chunk_size):
+    document = json.dumps(
+        {"data": [{"symbol": "Ωmega"}, 12345, [1, [2]], "a,]}"], "meta": {"total": 4}},
+        ensure_ascii=False,
+    ).encode()
+
+    items, decoder = decode(document, chunk_size)
+
+    assert items == [
+        ("data", {"symbol": "Ωmega"}),
+        ("data", 12345),
+        ("data", [1, [2]]),
+        ("data", "a,]}"),
+    ]
+    assert decoder.fields == {"meta": {"total": 4}}
+
+
+def test_decoder_reads_top_level_arrays_and_empty_documents():
+    assert decode(b" [ 1 , 2 ] ", 3)[0] == [(None, 1), (None, 2)]
+    assert decode(b"[]", 1)[0] == []
+    assert decode(b'{"data": [], "x": null}', 4)[1].fields == {"x": None}
+
+
+@pytest.mark.parametrize("document", [b'{"data": [1, 2', b"[1] 2", b'{"a" 1}'])
+def test_decoder_rejects_broken_documents(document):
+    with pytest.raises(ValueError):
+        decode(document, 3)
+
+
+@pytest.mark.asyncio
+async def test_stream_matches_list_response_and_feeds_hooks():
+    async with MockSpaceTradersServer(ship_count=5, waypoint_count=12) as server:
+        cache = UniverseCache()
+        api = SpaceTradersApi(
+            "token",
+            base_url=server.url,
+            rate_limiter=NoRateLimit(),
+            cache=cache,
+        )
+        async with api:
+            params = model.PaginationParameters(limit=20, page=1)
+            listed = (await api.list_ships(params)).data
+            streamed = [ship async for ship in api.stream_ships(params)]
+            assert [s.model_dump(exclude={"nav"}) for s in streamed] == [
+                s.model_dump(exclude={"nav"}) for s in listed
+            ]
+
+            waypoints = [
+                waypoint
+                async for waypoint in api._stream(
+                    model.GetWaypointResponse,
+                    "GET",
+                    f"/systems/{SYSTEM_SYMBOL}/waypoints",
+                    params={"limit": 20, "page": 1},
+                    chunk_size=64,
+                )
+            ]
+
+    assert len(waypoints) == 12
+    assert cache.waypoints_in_system(SYSTEM_SYMBOL) == sorted(
+        waypoints,
+        key=lambda waypoint: waypoint.symbol.root,
+    )
+
+
+@pytest.mark.asyncio
+async def test_stream_is_traced_recorded_and_closed_when_left_early():
+    exporter = InMemorySpanExporter()
+    diagnostics = Diagnostics()
+    closed = []
+    async with MockSpaceTradersServer(ship_count=5) as server:
+        api = SpaceTradersApi(
+            "token",
+            base_url=server.url,
+            rate_limiter=NoRateLimit(),
+            diagnostics=diagnostics,
+            tracer=LocalTracer(exporter),
+        )
+        request = api.session.request
+
+        async def tracked_request(*args, **kwargs):
+            response = await request(*args, **kwargs)
+            close = response.close
+            response.close = lambda: closed.append(True) or close()
+            return response
+
+        api.session.request = tracked_request
+        async with api:
+            params = model.PaginationParameters(limit=20, page=1)
+            async with contextlib.aclosing(api.stream_ships(params)) as ships:
+                async for _ in ships:
+                    break
+
+    assert closed
+    (span,) = exporter.spans
+    assert span.name == "GET /my/ships"
+    assert span.attributes["http.response.status_code"] == 200
+    assert diagnostics.endpoints["GET /my/ships"].count == 1
+    assert diagnostics.current is None
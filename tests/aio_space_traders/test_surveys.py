@@ -0,0 +1,81 @@
+from datetime import UTC, datetime, timedelta
+from unittest.mock import AsyncMock
+
+import pytest
+from aio_space_traders import model
+from aio_space_traders.errors import ShipSurveyExhaustedError
+from aio_space_traders.surveys import SurveyPool
+from tests import factories
+
+
+def make_survey(
+    signature: str,
+    deposits: list[str],
+    size: model.Size = model.Size.MODERATE,
+    expires_in: float = 600,
+) -> model.Survey:
+    return factories.SurveyFactory.build(
+        signature=signature,
+        symbol="X1-A1-B2",
+        deposits=[model.SurveyDeposit(symbol=symbol) for symbol in deposits],
+        size=size,
+        expiration=datetime.now(UTC) + timedelta(seconds=expires_in),
+    )
+
+
+def test_best_ranks_by_expected_value_of_targets():
+    pool = SurveyPool({"IRON_ORE": 10, "GOLD_ORE": 100, "ICE_WATER": 1})
+    iron = make_survey("IRON", ["IRON_ORE", "IRON_ORE", "ICE_WATER"])
+    gold = make_survey("GOLD", ["GOLD_ORE", "ICE_WATER", "ICE_WATER", "ICE_WATER"])
+    pool.add_many([iron, gold])
+
+    assert pool.best("X1-A1-B2") == gold
+    assert pool.best("X1-A1-B2", targets={"IRON_ORE"}) == iron
+    assert pool.best("X1-A1-B2", targets={"COPPER_ORE"}) is None
+    assert pool.best("X1-Z9-B2") is None
+
+
+def test_size_breaks_ties():
+    pool = SurveyPool({"IRON_ORE": 10})
+    small = make_survey("SMALL", ["IRON_ORE"], size=model.Size.SMALL)
+    large = make_survey("LARGE", ["IRON_ORE"], size=model.Size.LARGE)
+    pool.add_many([small, large])
+
+    assert pool.ranked("X1-A1-B2") == [large, small]
+
+
+def test_expired_surveys_are_purged():
+    pool = SurveyPool({"IRON_ORE": 10})
+    pool.add(make_survey("OLD", ["IRON_ORE"], expires_in=-1))
+    short = make_survey("SHORT", ["IRON_ORE"], expires_in=60)
+    pool.add(short)
+    pool.add(make_survey("LONG", ["IRON_ORE"], expires_in=600))
+    assert len(pool) == 2
+
+    assert pool.purge_expired(datetime.now(UTC) + timedelta(seconds=120)) == 1
+    assert short not in pool
+    assert len(pool) == 1
+
+
+@pytest.mark.asyncio
+async def test_extract_retires_exhausted_surveys():
+    pool = SurveyPool({"IRON_ORE": 10, "GOLD_ORE": 100})
+    gold = make_survey("GOLD", ["GOLD_ORE"])
+    iron = make_survey("IRON", ["IRON_ORE"])
+    pool.add_many([gold, iron])
+
+    actions = AsyncMock()
+    actions.extract_with_survey.side_effect = [
+        ShipSurveyExhaustedError(400, 4224, "Survey exhausted.", {}),
+        "extracted",
+    ]
+
+    result = await pool.extract(actions, "SHIP-1", "X1-A1-B2")
+
+    assert result == "extracted"
+    assert [call.args[1] for call in actions.extract_with_survey.call_args_list] == [
+        gold,
+        iron,
+    ]
+    assert gold not in pool
+    assert iron in pool
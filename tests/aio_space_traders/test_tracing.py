@@ -0,0 +1,70 @@
+import pytest
+from aio_space_traders import errors
+from aio_space_traders.api import SpaceTradersApi
+from aio_space_traders.tracing import (
+    InMemorySpanExporter,
+    JSONLinesSpanExporter,
+    LocalTracer,
+    read_spans,
+)
+from aio_space_traders.utils import NoRateLimit
+from tests.mock_server import MockSpaceTradersServer
+
+
+@pytest.mark.asyncio
+async def test_api_spans_nest_under_caller_spans():
+    exporter = InMemorySpanExporter()
+    tracer = LocalTracer(exporter)
+    async with MockSpaceTradersServer(ship_count=1) as server:
+        api = SpaceTradersApi(
+            "token",
+            base_url=server.url,
+            rate_limiter=NoRateLimit(),
+            tracer=tracer,
+        )
+        async with api:
+            with tracer.start_as_current_span("strategy", attributes={"fleet": 1}):
+                await api.get_ship_nav("MOCK-1")
+                server.fail_next(4214)
+                with pytest.raises(errors.ShipInTransitError):
+                    await api.dock_ship("MOCK-1")
+            await api.get_agent()
+
+    nav, dock, strategy, agent = exporter.spans
+    assert strategy.parent_id is None
+    assert nav.parent_id == dock.parent_id == strategy.span_id
+    assert nav.trace_id == dock.trace_id == strategy.trace_id
+    assert agent.trace_id != strategy.trace_id
+
+    assert nav.name == "GET /my/ships/{ship_symbol}/nav"
+    assert nav.kind == dock.kind == agent.kind == "CLIENT"
+    assert strategy.kind == "INTERNAL"
+    assert nav.attributes["url.template"] == "/my/ships/{ship_symbol}/nav"
+    assert nav.attributes["spacetraders.ship_symbol"] == "MOCK-1"
+    assert nav.attributes["http.response.status_code"] == 200
+    assert nav.attributes["spacetraders.rate_limit.wait"] >= 0
+    assert nav.status == "UNSET"
+    assert nav.duration > 0
+
+    assert dock.name == "POST /my/ships/{ship_symbol}/dock"
+    assert dock.attributes["spacetraders.error_code"] == 4214
+    assert dock.status == "ERROR"
+    assert dock.events[0]["attributes"]["exception.type"] == "ShipInTransitError"
+    assert "spacetraders.ship_symbol" not in agent.attributes
+
+
+def test_json_lines_exporter_writes_otlp_fields(tmp_path):
+    path = tmp_path / "spans.jsonl"
+    exporter = JSONLinesSpanExporter(path)
+    tracer = LocalTracer(exporter)
+    with tracer.start_as_current_span("outer"):
+        with tracer.start_as_current_span("inner", attributes={"n": 1}):
+            pass
+    exporter.close()
+
+    inner, outer = read_spans(path)
+    assert inner["parentSpanId"] == outer["spanId"]
+    assert inner["traceId"] == outer["traceId"]
+    assert inner["attributes"] == {"n": 1}
+    assert inner["kind"] == "SPAN_KIND_INTERNAL"
+    assert inner["endTimeUnixNano"] >= inner["startTimeUnixNano"]
@@ -0,0 +1,118 @@
+from unittest.mock import AsyncMock
+
+import pytest
+from aio_space_traders import model, trading
+from aio_space_traders.errors import MarketTradeUnitLimitError
+from tests import factories
+
+IRON = model.TradeSymbol.IRON_ORE
+GOLD = model.TradeSymbol.GOLD_ORE
+ICE = model.TradeSymbol.ICE_WATER
+
+
+def make_market(*goods: tuple[model.TradeSymbol, int, int]) -> model.Market:
+    return model.Market(
+        symbol="X1-A1-B2",
+        exports=[],
+        imports=[],
+        exchange=[],
+        trade_goods=[
+            factories.MarketTradeGoodFactory.build(
+                symbol=symbol,
+                trade_volume=volume,
+                sell_price=price,
+                purchase_price=price * 2,
+            )
+            for symbol, volume, price in goods
+        ],
+    )
+
+
+def make_cargo(*items: tuple[model.TradeSymbol, int], capacity: int = 100):
+    return model.ShipCargo(
+        capacity=capacity,
+        units=sum(units for _, units in items),
+        inventory=[
+            model.ShipCargoItem(symbol=symbol, name=symbol, description="", units=units)
+            for symbol, units in items
+        ],
+    )
+
+
+def sale(symbol: model.TradeSymbol, units: int, price: int):
+    response = AsyncMock()
+    response.data.transaction = factories.MarketTransactionFactory.build(
+        trade_symbol=symbol,
+        units=units,
+        price_per_unit=price,
+        total_price=units * price,
+    )
+    return response
+
+
+def test_plan_sale_splits_by_trade_volume_and_orders_by_value():
+    market = make_market((IRON, 10, 5), (GOLD, 20, 50))
+    cargo = make_cargo((IRON, 25), (GOLD, 15), (ICE, 5))
+
+    orders = trading.plan_sale(cargo, market)
+
+    assert [(order.symbol, order.units) for order in orders] == [
+        (GOLD, 15),
+        (IRON, 10),
+        (IRON, 10),
+        (IRON, 5),
+    ]
+
+
+def test_plan_purchase_respects_capacity_and_credits():
+    market = make_market((IRON, 10, 5), (GOLD, 20, 50))
+
+    orders = trading.plan_purchase({IRON: 30, GOLD: 30}, market, 35, credits=1000)
+
+    assert [(order.symbol, order.units) for order in orders] == [
+        (IRON, 10),
+        (IRON, 10),
+        (IRON, 10),
+        (GOLD, 5),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_sell_all_stops_a_good_when_price_slips():
+    market = make_market((IRON, 10, 10), (GOLD, 10, 100))
+    cargo = make_cargo((IRON, 30), (GOLD, 10))
+    actions = AsyncMock()
+    actions.sell.side_effect = [
+        sale(GOLD, 10, 100),
+        sale(IRON, 10, 10),
+        sale(IRON, 10, 8),
+    ]
+
+    result = await trading.sell_all(actions, "SHIP-1", cargo, market)
+
+    assert actions.sell.await_count == 3
+    assert result.units == 30
+    assert result.total_price == 1000 + 100 + 80
+    assert [(order.symbol, order.units) for order in result.unfilled] == [(IRON, 10)]
+
+
+@pytest.mark.asyncio
+async def test_sell_all_splits_orders_on_unit_limit_error():
+    market = make_market((IRON, 20, 10))
+    cargo = make_cargo((IRON, 60))
+    actions = AsyncMock()
+
+    # The market quotes a volume of 20 but only takes 10 at a time
+    async def sell(ship_symbol, order):
+        if order.units > 10:
+            raise MarketTradeUnitLimitError(400, 4604, "Trade volume exceeded.", {})
+        return sale(IRON, order.units, 10)
+
+    actions.sell.side_effect = sell
+
+    result = await trading.sell_all(actions, "SHIP-1", cargo, market)
+
+    units = [call.args[1].units for call in actions.sell.call_args_list]
+    assert units == [20, 10, 10, 10, 10, 10, 10]
+    assert result.units == 60
+    assert not result.unfilled
@@ -0,0 +1,49 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from aio_space_traders.api import SpaceTradersApi
+from aio_space_traders.transport import HttpTransport, TransportConfig
+from aio_space_traders.utils import NoRateLimit
+from tests.mock_server import MockSpaceTradersServer
+
+
+@pytest.mark.asyncio
+async def test_lazy_multiplexed_responses_are_gathered():
+    response = MagicMock(lazy=True)
+    session = MagicMock()
+    session.request = AsyncMock(return_value=response)
+    session.gather = AsyncMock()
+
+    transport = HttpTransport("http://localhost/v2", session=session)
+    assert await transport.request("GET", "/my/agent") is response
+    session.gather.assert_awaited_once_with(response)
+
+    response.lazy = False
+    await transport.request("GET", "/my/agent")
+    session.gather.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_configured_transport_serves_concurrent_requests():
+    config = TransportConfig(pool_maxsize=2, multiplexed=True, timeout=5)
+    server = MockSpaceTradersServer(
+        ship_count=5,
+        per_second_limit=10**9,
+        burst_limit=10**9,
+    )
+    async with server:
+        async with SpaceTradersApi(
+            "token",
+            base_url=server.url,
+            rate_limiter=NoRateLimit(),
+            transport=config,
+        ) as api:
+            assert isinstance(api.session, HttpTransport)
+            assert api.session.config is config
+            ships = await asyncio.gather(
+                *(api.get_ship(f"MOCK-{n % 5 + 1}") for n in range(25)),
+            )
+
+    assert len(ships) == 25
+    assert server.request_count == 25
@@ -3,3 +3,45 @@ from aio_space_traders import model
 
 
 class ServerStatusResponseFactory(ModelFactory[model.ServerStatsResponse]): ...
+
+
+class CooldownFactory(ModelFactory[model.Cooldown]): ...
+
+
+class ShipNavFactory(ModelFactory[model.ShipNav]): ...
+
+
+class ShipFactory(ModelFactory[model.Ship]): ...
+
+
+class SellCargoDataFactory(ModelFactory[model.SellCargoData]): ...
+
+
+class SurveyFactory(ModelFactory[model.Survey]): ...
+
+
+class MarketTradeGoodFactory(ModelFactory[model.MarketTradeGood]): ...
+
+
+class MarketTransactionFactory(ModelFactory[model.MarketTransaction]): ...
+
+
+class AgentFactory(ModelFactory[model.Agent]): ...
+
+
+class ContractFactory(ModelFactory[model.Contract]): ...
+
+
+class MarketFactory(ModelFactory[model.Market]): ...
+
+
+class WaypointFactory(ModelFactory[model.Waypoint]): ...
+
+
+class SystemFactory(ModelFactory[model.System]): ...
+
+
+class ShipyardShipFactory(ModelFactory[model.ShipyardShip]): ...
+
+
+class ShipyardFactory(ModelFactory[model.Shipyard]): ...
@@ -0,0 +1,745 @@
+"""A local stand-in for the SpaceTraders ``/v2`` api.
+
+Responses are built from the ``model`` schemas with polyfactory, seeded so
+every run serves the same universe. The server speaks plain HTTP/1.1 with
+keep-alive over a local socket, so the client under test goes through its
+real session, rate limiter and response validation::
+
+    async with MockSpaceTradersServer(ship_count=50) as server:
+        api = SpaceTradersApi(
+            "token",
+            base_url=server.url,
+            rate_limiter=AsyncRateLimit(10_000, 1_000_000),
+        )
+
+Simulated behaviour:
+
+* per token rate limits, answered with a 429 like the real api
+* transit times from waypoint distance and engine speed
+* extraction, siphon, survey and refine cooldowns, rejected with
+  ``CooldownConflictError`` codes
+* surveys that expire and are exhausted after ``SURVEY_USES`` extractions
+* orbit and dock requirements, rejected with the matching error codes
+* buying, selling, jettisoning and transferring cargo
+* supplying construction sites added to ``constructions``
+* injected failures for any code in ``ERROR_MAPPING``
+
+``time_scale`` shrinks every simulated duration so tests don't have to
+wait out real travel times.
+"""
+
+import asyncio
+import json
+import math
+import random
+import re
+import time
+from collections import deque
+from collections.abc import Callable
+from datetime import UTC, datetime, timedelta
+from http import HTTPStatus
+from typing import Any
+from urllib.parse import parse_qs, urlsplit
+
+from aio_space_traders import model
+from aio_space_traders.errors import ERROR_MAPPING
+from polyfactory.factories.pydantic_factory import ModelFactory
+
+from tests import factories
+
+SYSTEM_SYMBOL = "X1-MOCK"
+EXTRACT_COOLDOWN = 70
+REFINE_COOLDOWN = 30
+SURVEY_COOLDOWN = 60
+# Seconds a survey lasts, and the extractions it allows before it's exhausted
+SURVEY_LIFETIME = 900
+SURVEY_USES = 5
+ORES = [model.TradeSymbol.IRON_ORE, model.TradeSymbol.COPPER_ORE]
+# Produce the mock refines, with the ore each refine turns 30 units of into 10
+REFINED = {"IRON": model.TradeSymbol.IRON_ORE, "COPPER": model.TradeSymbol.COPPER_ORE}
+
+type Route = Callable[..., Any]
+
+
+class MockError(Exception):
+    def __init__(
+        self,
+        code: int,
+        message: str,
+        status: int = 400,
+        data: dict[str, Any] | None = None,
+    ) -> None:
+        super().__init__(message)
+        self.code = code
+        self.message = message
+        self.status = status
+        self.data = data or {}
+
+
+class MockSpaceTradersServer:
+    def __init__(
+        self,
+        *,
+        ship_count: int = 10,
+        waypoint_count: int = 20,
+        per_second_limit: float = 2,
+        burst_limit: int = 30,
+        time_scale: float = 1.0,
+        latency: float = 0.0,
+        seed: int = 0,
+    ) -> None:
+        self.per_second_limit = per_second_limit
+        self.burst_limit = burst_limit
+        self.time_scale = time_scale
+        self.latency = latency
+        self.request_count = 0
+        self.requests: deque[tuple[str, str]] = deque(maxlen=1000)
+        # Waypoints where extracting and siphoning fail as over-exploited
+        self.destabilized: set[str] = set()
+        # Construction sites by waypoint; there are none unless a test adds them
+        self.constructions: dict[str, model.Construction] = {}
+        # Live surveys by signature, with the extractions each has left
+        self.surveys: dict[str, tuple[model.Survey, int]] = {}
+        self._buckets: dict[str, tuple[float, float]] = {}
+        self._failures: deque[int] = deque()
+        self._server: asyncio.Server | None = None
+        self._writers: set[asyncio.StreamWriter] = set()
+        self._rng = random.Random(seed)
+        self._build_universe(ship_count, waypoint_count, seed)
+        self._routes: list[tuple[str, re.Pattern[str], Route]] = [
+            ("GET", re.compile(r"/"), self._status),
+            ("GET", re.compile(r"/my/agent"), self._agent),
+            ("GET", re.compile(r"/my/ships"), self._list_ships),
+            ("GET", re.compile(r"/my/ships/(?P<ship>[^/]+)"), self._ship),
+            ("GET", re.compile(r"/my/ships/(?P<ship>[^/]+)/nav"), self._nav),
+            ("GET", re.compile(r"/my/ships/(?P<ship>[^/]+)/cargo"), self._cargo),
+            ("GET", re.compile(r"/my/ships/(?P<ship>[^/]+)/cooldown"), self._cooldown),
+            ("POST", re.compile(r"/my/ships/(?P<ship>[^/]+)/orbit"), self._orbit),
+            ("POST", re.compile(r"/my/ships/(?P<ship>[^/]+)/dock"), self._dock),
+            ("POST", re.compile(r"/my/ships/(?P<ship>[^/]+)/navigate"), self._navigate),
+            ("POST", re.compile(r"/my/ships/(?P<ship>[^/]+)/extract"), self._extract),
+            (
+                "POST",
+                re.compile(r"/my/ships/(?P<ship>[^/]+)/extract/survey"),
+                self._extract_with_survey,
+            ),
+            ("POST", re.compile(r"/my/ships/(?P<ship>[^/]+)/survey"), self._survey),
+            ("POST", re.compile(r"/my/ships/(?P<ship>[^/]+)/siphon"), self._siphon),
+            ("POST", re.compile(r"/my/ships/(?P<ship>[^/]+)/refine"), self._refine),
+            ("POST", re.compile(r"/my/ships/(?P<ship>[^/]+)/purchase"), self._purchase),
+            ("POST", re.compile(r"/my/ships/(?P<ship>[^/]+)/sell"), self._sell),
+            ("POST", re.compile(r"/my/ships/(?P<ship>[^/]+)/jettison"), self._jettison),
+            ("POST", re.compile(r"/my/ships/(?P<ship>[^/]+)/transfer"), self._transfer),
+            (
+                "GET",
+                re.compile(r"/systems/(?P<system>[^/]+)/waypoints"),
+                self._list_waypoints,
+            ),
+            (
+                "GET",
+                re.compile(r"/systems/(?P<system>[^/]+)/waypoints/(?P<waypoint>[^/]+)"),
+                self._waypoint,
+            ),
+            (
+                "GET",
+                re.compile(
+                    r"/systems/(?P<system>[^/]+)/waypoints/(?P<waypoint>[^/]+)/market",
+                ),
+                self._market,
+            ),
+            (
+                "GET",
+                re.compile(
+                    r"/systems/(?P<system>[^/]+)/waypoints/(?P<waypoint>[^/]+)/construction",
+                ),
+                self._construction,
+            ),
+            (
+                "POST",
+                re.compile(
+                    r"/systems/(?P<system>[^/]+)/waypoints/(?P<waypoint>[^/]+)"
+                    r"/construction/supply",
+                ),
+                self._supply_construction,
+            ),
+        ]
+
+    @property
+    def url(self) -> str:
+        if self._server is None:
+            raise RuntimeError("The server hasn't been started.")
+        host, port = self._server.sockets[0].getsockname()[:2]
+        return f"http://{host}:{port}/v2"
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self._serve, "127.0.0.1", 0)
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            for writer in list(self._writers):
+                writer.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def __aenter__(self) -> "MockSpaceTradersServer":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        await self.close()
+
+    def fail_next(self, code: int, times: int = 1) -> None:
+        """Answers the next ``times`` requests with the error for ``code``."""
+        if code not in ERROR_MAPPING:
+            raise ValueError(f"{code} is not a known error code.")
+        self._failures.extend([code] * times)
+
+    # Universe
+
+    def _build_universe(self, ship_count: int, waypoint_count: int, seed: int) -> None:
+        ModelFactory.seed_random(seed)
+        rng = random.Random(seed)
+        self.status = factories.ServerStatusResponseFactory.build()
+        self.agent = factories.AgentFactory.build(symbol="MOCK-AGENT", credits=100_000)
+        self.waypoints: dict[str, model.Waypoint] = {}
+        for index in range(waypoint_count):
+            symbol = f"{SYSTEM_SYMBOL}-W{index}"
+            self.waypoints[symbol] = factories.WaypointFactory.build(
+                symbol=symbol,
+                system_symbol=SYSTEM_SYMBOL,
+                x=rng.randint(-100, 100),
+                y=rng.randint(-100, 100),
+            )
+        self.markets = {
+            symbol: factories.MarketFactory.build(symbol=symbol, transactions=[])
+            for symbol in self.waypoints
+        }
+        self.ships: dict[str, model.Ship] = {}
+        self.cooldowns: dict[str, float] = {}
+        symbols = list(self.waypoints)
+        now = datetime.now(UTC)
+        for index in range(ship_count):
+            ship_symbol = f"MOCK-{index + 1}"
+            waypoint = self.waypoints[rng.choice(symbols)]
+            ship = factories.ShipFactory.build(symbol=ship_symbol)
+            ship.nav.system_symbol = model.SystemSymbol(SYSTEM_SYMBOL)
+            ship.nav.waypoint_symbol = waypoint.symbol
+            ship.nav.status = model.ShipNavStatus.DOCKED
+            ship.nav.route.arrival = now
+            ship.nav.route.departure_time = now
+            ship.cooldown = model.Cooldown(
+                ship_symbol=ship_symbol,
+                total_seconds=0,
+                remaining_seconds=0,
+            )
+            ship.cargo = model.ShipCargo(capacity=40, units=0, inventory=[])
+            ship.engine.speed = 30
+            self.ships[ship_symbol] = ship
+
+    # HTTP
+
+    async def _serve(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+    ) -> None:
+        self._writers.add(writer)
+        try:
+            while request_line := await reader.readline():
+                method, target, _ = request_line.decode("latin-1").split(" ", 2)
+                headers: dict[str, str] = {}
+                while (line := await reader.readline()) not in (b"\r\n", b""):
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+
+                status, payload = await self.handle(method, target, headers, body)
+                content = json.dumps(payload).encode()
+                writer.write(
+                    (
+                        f"HTTP/1.1 {status} {HTTPStatus(status).phrase}\r\n"
+                        "Content-Type: application/json\r\n"
+                        f"Content-Length: {len(content)}\r\n"
+                        "\r\n"
+                    ).encode("latin-1")
+                    + content,
+                )
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+
+    async def handle(
+        self,
+        method: str,
+        target: str,
+        headers: dict[str, str],
+        body: bytes,
+    ) -> tuple[int, Any]:
+        """Answers one request, returning the status code and json payload."""
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        url = urlsplit(target)
+        path = url.path.removeprefix("/v2").rstrip("/") or "/"
+        self.request_count += 1
+        self.requests.append((method, path))
+        try:
+            self._check_rate_limit(headers.get("authorization", ""))
+            if self._failures:
+                code = self._failures.popleft()
+                raise MockError(code, f"Injected {ERROR_MAPPING[code].__name__}.")
+            route, params = self._match(method, path)
+            query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+            data = json.loads(body) if body else {}
+            return 200, route(query=query, data=data, **params)
+        except MockError as error:
+            return error.status, {
+                "error": {
+                    "code": error.code,
+                    "message": error.message,
+                    "data": error.data,
+                },
+            }
+
+    def _match(self, method: str, path: str) -> tuple[Route, dict[str, str]]:
+        for route_method, pattern, route in self._routes:
+            if route_method == method and (match := pattern.fullmatch(path)):
+                return route, match.groupdict()
+        raise MockError(404, f"No route for {method} {path}.", status=404)
+
+    def _check_rate_limit(self, token: str) -> None:
+        # Leaky bucket, like the live api: a burst allowance refilled at
+        # `per_second_limit` requests per second.
+        now = time.monotonic()
+        level, last = self._buckets.get(token, (0.0, now))
+        level = max(0.0, level - (now - last) * self.per_second_limit)
+        if level + 1 > self.burst_limit:
+            retry_after = (level + 1 - self.burst_limit) / self.per_second_limit
+            self._buckets[token] = (level, now)
+            raise MockError(
+                429,
+                "You have reached your API limit.",
+                status=429,
+                data={
+                    "type": "IncreasedRateLimit",
+                    "retryAfter": retry_after,
+                    "limitBurst": self.burst_limit,
+                    "limitPerSecond": self.per_second_limit,
+                },
+            )
+        self._buckets[token] = (level + 1, now)
+
+    # Helpers
+
+    def _dump(self, value: Any) -> Any:
+        if isinstance(value, list):
+            return [self._dump(item) for item in value]
+        return value.model_dump(mode="json", by_alias=True)
+
+    def _get_ship(self, ship: str) -> model.Ship:
+        if ship not in self.ships:
+            raise MockError(404, f"Ship {ship} not found.", status=404)
+        ship_model = self.ships[ship]
+        self._settle(ship_model)
+        return ship_model
+
+    def _settle(self, ship: model.Ship) -> None:
+        now = datetime.now(UTC)
+        nav = ship.nav
+        if nav.status == model.ShipNavStatus.IN_TRANSIT and nav.route.arrival <= now:
+            nav.status = model.ShipNavStatus.IN_ORBIT
+        remaining = self.cooldowns.get(ship.symbol, 0) - time.monotonic()
+        ship.cooldown.remaining_seconds = max(0, math.ceil(remaining / self.time_scale))
+        if ship.cooldown.remaining_seconds == 0:
+            ship.cooldown.expiration = None
+
+    def _require_status(self, ship: model.Ship, status: model.ShipNavStatus) -> None:
+        if ship.nav.status == model.ShipNavStatus.IN_TRANSIT:
+            raise MockError(4214, "Ship is currently in transit.")
+        if status != ship.nav.status:
+            if status == model.ShipNavStatus.DOCKED:
+                raise MockError(4244, "Ship is not docked.")
+            raise MockError(4236, "Ship is not in orbit.")
+
+    def _require_cooldown_over(self, ship: model.Ship) -> None:
+        if ship.cooldown.remaining_seconds > 0:
+            raise MockError(
+                4000,
+                "Ship action is still on cooldown.",
+                status=409,
+                data={"cooldown": self._dump(ship.cooldown)},
+            )
+
+    def _start_cooldown(self, ship: model.Ship, seconds: int) -> None:
+        scaled = seconds * self.time_scale
+        self.cooldowns[ship.symbol] = time.monotonic() + scaled
+        ship.cooldown = model.Cooldown(
+            ship_symbol=ship.symbol,
+            total_seconds=seconds,
+            remaining_seconds=seconds,
+            expiration=datetime.now(UTC) + timedelta(seconds=scaled),
+        )
+
+    def _paginate(self, items: list[Any], query: dict[str, str]) -> dict[str, Any]:
+        limit = int(query.get("limit", 10))
+        page = int(query.get("page", 1))
+        start = (page - 1) * limit
+        return {
+            "data": self._dump(items[start : start + limit]),
+            "meta": {"total": len(items), "page": page, "limit": limit},
+        }
+
+    # Routes
+
+    def _status(self, **_: Any) -> Any:
+        return self._dump(self.status)
+
+    def _agent(self, **_: Any) -> Any:
+        return {"data": self._dump(self.agent)}
+
+    def _list_ships(self, query: dict[str, str], **_: Any) -> Any:
+        for ship in self.ships.values():
+            self._settle(ship)
+        return self._paginate(list(self.ships.values()), query)
+
+    def _ship(self, ship: str, **_: Any) -> Any:
+        return {"data": self._dump(self._get_ship(ship))}
+
+    def _nav(self, ship: str, **_: Any) -> Any:
+        return {"data": self._dump(self._get_ship(ship).nav)}
+
+    def _cargo(self, ship: str, **_: Any) -> Any:
+        return {"data": self._dump(self._get_ship(ship).cargo)}
+
+    def _cooldown(self, ship: str, **_: Any) -> Any:
+        return {"data": self._dump(self._get_ship(ship).cooldown)}
+
+    def _orbit(self, ship: str, **_: Any) -> Any:
+        ship_model = self._get_ship(ship)
+        if ship_model.nav.status == model.ShipNavStatus.IN_TRANSIT:
+            raise MockError(4214, "Ship is currently in transit.")
+        ship_model.nav.status = model.ShipNavStatus.IN_ORBIT
+        return {"data": self._dump(ship_model.nav)}
+
+    def _dock(self, ship: str, **_: Any) -> Any:
+        ship_model = self._get_ship(ship)
+        if ship_model.nav.status == model.ShipNavStatus.IN_TRANSIT:
+            raise MockError(4214, "Ship is currently in transit.")
+        ship_model.nav.status = model.ShipNavStatus.DOCKED
+        return {"data": self._dump(ship_model.nav)}
+
+    def _navigate(self, ship: str, data: dict[str, Any], **_: Any) -> Any:
+        ship_model = self._get_ship(ship)
+        if ship_model.nav.status == model.ShipNavStatus.IN_TRANSIT:
+            raise MockError(4200, "Ship is currently in transit.")
+        self._require_status(ship_model, model.ShipNavStatus.IN_ORBIT)
+        destination = self.waypoints.get(data.get("waypointSymbol", ""))
+        if destination is None:
+            raise MockError(4201, "Invalid destination.")
+        origin = self.waypoints[ship_model.nav.waypoint_symbol.root]
+        if origin.symbol == destination.symbol:
+            raise MockError(4204, "Ship is already at the destination.")
+
+        distance = math.hypot(destination.x - origin.x, destination.y - origin.y)
+        seconds = round(max(1, distance) * (25 / ship_model.engine.speed) + 15)
+        now = datetime.now(UTC)
+        nav = ship_model.nav
+        nav.route = model.ShipNavRoute(
+            origin=model.ShipNavRouteWaypoint(
+                symbol=origin.symbol.root,
+                type=origin.type,
+                system_symbol=SYSTEM_SYMBOL,
+                x=origin.x,
+                y=origin.y,
+            ),
+            destination=model.ShipNavRouteWaypoint(
+                symbol=destination.symbol.root,
+                type=destination.type,
+                system_symbol=SYSTEM_SYMBOL,
+                x=destination.x,
+                y=destination.y,
+            ),
+            departure_time=now,
+            arrival=now + timedelta(seconds=seconds * self.time_scale),
+        )
+        nav.waypoint_symbol = destination.symbol
+        nav.status = model.ShipNavStatus.IN_TRANSIT
+        return {
+            "data": {
+                "fuel": self._dump(ship_model.fuel),
+                "nav": self._dump(nav),
+                "events": [],
+            },
+        }
+
+    def _extract(self, ship: str, data: dict[str, Any], **_: Any) -> Any:
+        if data.get("survey"):
+            return self._extract_with_survey(ship, data["survey"])
+        return self._harvest(ship, "extraction", ORES)
+
+    def _extract_with_survey(self, ship: str, data: dict[str, Any], **_: Any) -> Any:
+        survey = model.Survey.model_validate(data)
+        if survey.signature not in self.surveys:
+            raise MockError(4220, "Survey signature is not valid.")
+        known, uses = self.surveys[survey.signature]
+        if known.expiration <= datetime.now(UTC):
+            del self.surveys[survey.signature]
+            raise MockError(4221, "Survey has expired.")
+        if self._get_ship(ship).nav.waypoint_symbol.root != known.symbol:
+            raise MockError(4220, "Survey is for another waypoint.")
+        symbols = [model.TradeSymbol(deposit.symbol) for deposit in known.deposits]
+        response = self._harvest(ship, "extraction", symbols)
+        if uses > 1:
+            self.surveys[survey.signature] = (known, uses - 1)
+        else:
+            del self.surveys[survey.signature]
+        return response
+
+    def _survey(self, ship: str, **_: Any) -> Any:
+        ship_model = self._get_ship(ship)
+        self._require_status(ship_model, model.ShipNavStatus.IN_ORBIT)
+        self._require_cooldown_over(ship_model)
+        expiration = datetime.now(UTC) + timedelta(seconds=SURVEY_LIFETIME * self.time_scale)
+        surveys = []
+        for _ in range(2):
+            waypoint = ship_model.nav.waypoint_symbol.root
+            survey = model.Survey(
+                signature=f"{waypoint}-{self._rng.getrandbits(32):08X}",
+                symbol=waypoint,
+                deposits=[
+                    model.SurveyDeposit(symbol=self._rng.choice(ORES))
+                    for _ in range(self._rng.randint(3, 6))
+                ],
+                expiration=expiration,
+                size=self._rng.choice(list(model.Size)),
+            )
+            self.surveys[survey.signature] = (survey, SURVEY_USES)
+            surveys.append(survey)
+        self._start_cooldown(ship_model, SURVEY_COOLDOWN)
+        return {
+            "data": {
+                "cooldown": self._dump(ship_model.cooldown),
+                "surveys": self._dump(surveys),
+            },
+        }
+
+    def _siphon(self, ship: str, **_: Any) -> Any:
+        return self._harvest(
+            ship,
+            "siphon",
+            [model.TradeSymbol.HYDROCARBON, model.TradeSymbol.LIQUID_HYDROGEN],
+        )
+
+    def _harvest(self, ship: str, key: str, symbols: list[model.TradeSymbol]) -> Any:
+        ship_model = self._get_ship(ship)
+        self._require_status(ship_model, model.ShipNavStatus.IN_ORBIT)
+        self._require_cooldown_over(ship_model)
+        if ship_model.nav.waypoint_symbol.root in self.destabilized:
+            raise MockError(4253, "The waypoint has been destabilized.")
+        cargo = ship_model.cargo
+        if cargo.units >= cargo.capacity:
+            raise MockError(4228, "Ship cargo is full.")
+
+        units = min(self._rng.randint(1, 10), cargo.capacity - cargo.units)
+        symbol = self._rng.choice(symbols)
+        self._add_cargo(cargo, symbol, units)
+        self._start_cooldown(ship_model, EXTRACT_COOLDOWN)
+        return {
+            "data": {
+                "cooldown": self._dump(ship_model.cooldown),
+                key: {
+                    "shipSymbol": ship,
+                    "yield": {"symbol": symbol, "units": units},
+                },
+                "cargo": self._dump(cargo),
+                "events": [],
+            },
+        }
+
+    def _purchase(self, ship: str, data: dict[str, Any], **_: Any) -> Any:
+        ship_model = self._get_ship(ship)
+        self._require_status(ship_model, model.ShipNavStatus.DOCKED)
+        order = model.PurchaseCargoObject.model_validate(data)
+        market = self.markets.get(ship_model.nav.waypoint_symbol.root)
+        goods = (market.trade_goods or []) if market else []
+        good = next((good for good in goods if good.symbol == order.symbol), None)
+        if good is None:
+            raise MockError(4601, f"{order.symbol} isn't sold here.")
+        total = good.purchase_price * order.units
+        if total > self.agent.credits:
+            raise MockError(4600, "Insufficient credits.")
+        cargo = ship_model.cargo
+        if cargo.units + order.units > cargo.capacity:
+            raise MockError(4217, "Ship cargo can't hold that many units.")
+        self._add_cargo(cargo, order.symbol, order.units)
+        self.agent.credits -= total
+        transaction = model.MarketTransaction(
+            waypoint_symbol=ship_model.nav.waypoint_symbol,
+            ship_symbol=ship,
+            trade_symbol=order.symbol,
+            type=model.Type2.PURCHASE,
+            units=order.units,
+            price_per_unit=good.purchase_price,
+            total_price=total,
+            timestamp=datetime.now(UTC),
+        )
+        return {
+            "data": {
+                "agent": self._dump(self.agent),
+                "cargo": self._dump(cargo),
+                "transaction": self._dump(transaction),
+            },
+        }
+
+    def _sell(self, ship: str, data: dict[str, Any], **_: Any) -> Any:
+        ship_model = self._get_ship(ship)
+        self._require_status(ship_model, model.ShipNavStatus.DOCKED)
+        order = model.SellCargoObject.model_validate(data)
+        cargo = ship_model.cargo
+        price = 10
+        self._remove_cargo(cargo, order.symbol, order.units)
+        self.agent.credits += price * order.units
+        transaction = model.MarketTransaction(
+            waypoint_symbol=ship_model.nav.waypoint_symbol,
+            ship_symbol=ship,
+            trade_symbol=order.symbol,
+            type=model.Type2.SELL,
+            units=order.units,
+            price_per_unit=price,
+            total_price=price * order.units,
+            timestamp=datetime.now(UTC),
+        )
+        return {
+            "data": {
+                "agent": self._dump(self.agent),
+                "cargo": self._dump(cargo),
+                "transaction": self._dump(transaction),
+            },
+        }
+
+    def _refine(self, ship: str, data: dict[str, Any], **_: Any) -> Any:
+        ship_model = self._get_ship(ship)
+        produce = data.get("produce", "")
+        if produce not in REFINED:
+            raise MockError(4237, f"{produce} can't be refined by this ship.")
+        self._require_cooldown_over(ship_model)
+        self._remove_cargo(ship_model.cargo, REFINED[produce], 30)
+        self._add_cargo(ship_model.cargo, model.TradeSymbol(produce), 10)
+        self._start_cooldown(ship_model, REFINE_COOLDOWN)
+        return {
+            "data": {
+                "cargo": self._dump(ship_model.cargo),
+                "cooldown": self._dump(ship_model.cooldown),
+                "produced": [{"tradeSymbol": produce, "units": 10}],
+                "consumed": [{"tradeSymbol": REFINED[produce], "units": 30}],
+            },
+        }
+
+    def _jettison(self, ship: str, data: dict[str, Any], **_: Any) -> Any:
+        ship_model = self._get_ship(ship)
+        order = model.JettisonCargoObject.model_validate(data)
+        self._remove_cargo(ship_model.cargo, order.symbol, order.units)
+        return {"data": self._dump(ship_model.cargo)}
+
+    def _transfer(self, ship: str, data: dict[str, Any], **_: Any) -> Any:
+        ship_model = self._get_ship(ship)
+        order = model.TransferCargoObject.model_validate(data)
+        if order.ship_symbol not in self.ships:
+            raise MockError(4231, f"Ship {order.ship_symbol} not found.")
+        target = self.ships[order.ship_symbol]
+        if (
+            target.nav.waypoint_symbol != ship_model.nav.waypoint_symbol
+            or target.nav.status != ship_model.nav.status
+        ):
+            raise MockError(4234, "Ships must be at the same waypoint and status.")
+        if target.cargo.units + order.units > target.cargo.capacity:
+            raise MockError(4228, f"Ship {order.ship_symbol} cargo is full.")
+        self._remove_cargo(ship_model.cargo, order.trade_symbol, order.units)
+        self._add_cargo(target.cargo, order.trade_symbol, order.units)
+        return {"data": {"cargo": self._dump(ship_model.cargo)}}
+
+    def _remove_cargo(
+        self,
+        cargo: model.ShipCargo,
+        symbol: model.TradeSymbol,
+        units: int,
+    ) -> None:
+        item = next(
+            (item for item in cargo.inventory if item and item.symbol == symbol),
+            None,
+        )
+        if item is None or item.units < units:
+            raise MockError(4219, f"Ship doesn't have {units} units of {symbol}.")
+        item.units -= units
+        cargo.units -= units
+        cargo.inventory = [item for item in cargo.inventory if item and item.units]
+
+    def _add_cargo(
+        self,
+        cargo: model.ShipCargo,
+        symbol: model.TradeSymbol,
+        units: int,
+    ) -> None:
+        cargo.units += units
+        for item in cargo.inventory:
+            if item is not None and item.symbol == symbol:
+                item.units += units
+                return
+        cargo.inventory.append(
+            model.ShipCargoItem(symbol=symbol, name=symbol, description="", units=units),
+        )
+
+    def _list_waypoints(self, system: str, query: dict[str, str], **_: Any) -> Any:
+        waypoints = [w for w in self.waypoints.values() if w.system_symbol.root == system]
+        return self._paginate(waypoints, query)
+
+    def _waypoint(self, waypoint: str, **_: Any) -> Any:
+        if waypoint not in self.waypoints:
+            raise MockError(404, f"Waypoint {waypoint} not found.", status=404)
+        return {"data": self._dump(self.waypoints[waypoint])}
+
+    def _market(self, waypoint: str, **_: Any) -> Any:
+        if waypoint not in self.markets:
+            raise MockError(4603, f"Market {waypoint} not found.", status=404)
+        market = self.markets[waypoint]
+        present = any(
+            ship.nav.waypoint_symbol.root == waypoint
+            and ship.nav.status != model.ShipNavStatus.IN_TRANSIT
+            for ship in self.ships.values()
+        )
+        if not present:
+            market = market.model_copy(update={"trade_goods": None, "transactions": None})
+        return {"data": self._dump(market)}
+
+    def _construction(self, waypoint: str, **_: Any) -> Any:
+        if waypoint not in self.constructions:
+            raise MockError(404, f"Waypoint {waypoint} isn't under construction.", status=404)
+        return {"data": self._dump(self.constructions[waypoint])}
+
+    def _supply_construction(self, waypoint: str, data: dict[str, Any], **_: Any) -> Any:
+        order = model.SupplyConstructionSiteObject.model_validate(data)
+        ship_model = self._get_ship(order.ship_symbol)
+        construction = self.constructions.get(waypoint)
+        if construction is None or ship_model.nav.waypoint_symbol.root != waypoint:
+            raise MockError(4802, "Ship must be at the construction site.")
+        self._require_status(ship_model, model.ShipNavStatus.DOCKED)
+        material = next(
+            (m for m in construction.materials if m.trade_symbol == order.trade_symbol),
+            None,
+        )
+        if material is None:
+            raise MockError(4800, f"{order.trade_symbol} isn't required.")
+        if material.fulfilled + order.units > material.required:
+            raise MockError(4801, f"{order.trade_symbol} is already fulfilled.")
+        self._remove_cargo(ship_model.cargo, model.TradeSymbol(order.trade_symbol), order.units)
+        material.fulfilled += order.units
+        construction.is_complete = all(m.fulfilled >= m.required for m in construction.materials)
+        return {
+            "data": {
+                "construction": self._dump(construction),
+                "cargo": self._dump(ship_model.cargo),
+            },
+        }